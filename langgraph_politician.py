@@ -57,18 +57,13 @@ def check_rag_availability():
         
     # Try to initialize the database connection
     try:
-        from src.data.db.chroma.schema import connect_to_chroma, DEFAULT_DB_PATH, get_collection
+        from src.data.db.chroma.schema import DEFAULT_DB_PATH, get_pooled_collection
         
-        # Connect to ChromaDB
-        client = connect_to_chroma(db_path=DEFAULT_DB_PATH)
-        if not client:
-            print("RAG database system not available: Failed to connect to ChromaDB.")
-            return False
-            
-        # Check if collection exists
-        collection = get_collection(client)
+        # Connect and open the collection through the pooled registry, which
+        # also warms the handle reused by every chat and debate turn
+        collection = get_pooled_collection(db_path=DEFAULT_DB_PATH)
         if not collection:
-            print("RAG database system not available: Politicians collection not found in database.")
+            print("RAG database system not available: Failed to open the politicians collection in ChromaDB.")
             return False
             
         # Check if the embeddings work
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Importing this module puts the project root on ``sys.path``, so scripts can
+import ``src`` after it. It also holds the fixture inputs, the latency
+percentile, and the reporting convention every benchmark follows: results
+are printed (and optionally written) as JSON, followed by one PASS line, or a
+FAIL line and exit status 1.
+"""
+import sys
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent.parent.absolute()
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Chat inputs, from plain policy questions to outright attacks
+FIXTURE_PROMPTS = [
+    "What is your position on climate change?",
+    "Why did you fail so badly on the border, you incompetent liar?",
+    "Tell me about your infrastructure plan.",
+    "Your economic policies have been a total disaster for working families.",
+    "How would you handle the situation in Ukraine?",
+    "I really admire the work you've done on healthcare.",
+    "Isn't it true that your administration is completely corrupt?",
+    "What do you think about tariffs on Chinese imports and what they mean for farmers in the Midwest?",
+    "Thank you for standing up for veterans.",
+    "Gun control and the Second Amendment",
+    "Everyone knows you lied about the election. Why should anyone trust you?",
+    "What's your plan to bring down prescription drug prices for seniors on Medicare?",
+    "This is the best jobs report we've had in years!",
+    "Inflation is crushing families and you don't seem to care.",
+    "Can you explain the Inflation Reduction Act?",
+    "You're a disgrace to the office.",
+    "Who are you?",
+    "Do you support raising the minimum wage?",
+    "Explain your approach to border security.",
+    "Can you talk about student loan forgiveness?",
+    "You're a pathetic, corrupt criminal and a disgrace to the country.",
+    "Inflation is still too high and people are struggling to pay rent.",
+    "Some people say your foreign policy made us look weak. How do you respond?",
+    "The withdrawal from Afghanistan was handled terribly.",
+    "I think the economy is doing fine under your leadership.",
+    "Is it true you want to ban gas stoves?",
+    "Why won't you admit your trade war hurt American farmers?",
+    "How are you today?",
+]
+
+# Retrieval queries: full questions, keyword queries and topic headings
+FIXTURE_QUERIES = [
+    "What is Biden's position on climate change?",
+    "border wall funding",
+    "IRA",
+    "How would you handle the situation in Ukraine?",
+    "Tell me about your infrastructure plan",
+    "What do you think about tariffs on Chinese imports?",
+    "Medicare and prescription drug prices",
+    "Immigration: Path to Citizenship",
+    "What's your plan for the economy and inflation?",
+    "Why did you withdraw from the Paris Climate Agreement?",
+    "Gun control and the Second Amendment",
+    "Student loan forgiveness",
+    "NATO Alliances",
+    "Are you going to raise taxes on the middle class?",
+    "Foreign Policy: Relations with China",
+    "What is Trump's record on job creation?",
+]
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linearly interpolated percentile (numpy's default method); 0.0 without samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return float(ordered[low] + (ordered[high] - ordered[low]) * (rank - low))
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50, p99, mean and max of latencies in milliseconds."""
+    return {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": sum(samples) / len(samples) if samples else 0.0,
+        "max_ms": max(samples) if samples else 0.0,
+    }
+
+def write_results(results: Dict[str, Any], output: Optional[str] = None):
+    """Print results as JSON, and write them to ``output`` when given."""
+    print(json.dumps(results, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+def fail(message: str):
+    """Report a failed check and exit with status 1."""
+    print(f"\nFAIL: {message}")
+    sys.exit(1)
+
+def succeed(message: str):
+    """Report that every check passed."""
+    print(f"\nPASS: {message}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load test for the chat API: health endpoints must stay responsive under chat load.
+
+Sends --chats chat requests from --concurrency threads to a running API
+server while a separate thread polls the health endpoints ("/" and
+"/api/politician/identities") every --probe-interval seconds. Reports chat
+latency and status codes (200, 503 when the server is at capacity, 504 on
+timeout), health-probe p50/p99/max latency, and the server's /api/capacity
+counters. Exits non-zero if the health p99 exceeds --max-health-ms or a
+health probe fails.
+
+Start the server first, e.g.:
+  python langgraph_politician.py api
+
+Usage:
+  python scripts/benchmarks/api_load.py
+  python scripts/benchmarks/api_load.py --url http://127.0.0.1:8000 --chats 32 --concurrency 8 --output results.json
+"""
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import FIXTURE_PROMPTS, latency_summary, write_results, fail, succeed
+
+HEALTH_PATHS = ["/", "/api/politician/identities"]
+
+def request(url, payload=None, timeout=None):
+    """Send a GET (or a JSON POST when payload is given); returns (status, latency ms)."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that health endpoints stay responsive while chats run")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running API server")
+    parser.add_argument("--chats", type=int, default=16, help="Chat requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent chat clients")
+    parser.add_argument("--politician", default="biden", choices=["biden", "trump"], help="Politician to chat with")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between health probes")
+    parser.add_argument("--max-health-ms", type=float, default=250.0, help="Maximum allowed health-probe p99")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    if request(base + "/", timeout=5)[0] != 200:
+        fail(f"API server is not reachable at {base}")
+
+    health = {"latencies": [], "failures": 0}
+    done = threading.Event()
+
+    def probe():
+        i = 0
+        while not done.is_set():
+            status, latency = request(base + HEALTH_PATHS[i % len(HEALTH_PATHS)], timeout=30)
+            health["latencies"].append(latency)
+            health["failures"] += status != 200
+            i += 1
+            done.wait(args.probe_interval)
+
+    def chat(i):
+        payload = {
+            "user_input": FIXTURE_PROMPTS[i % len(FIXTURE_PROMPTS)],
+            "politician_identity": args.politician,
+        }
+        return request(base + "/api/politician/chat", payload)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(chat, range(args.chats)))
+    wall = time.perf_counter() - start
+    done.set()
+    prober.join()
+
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    with urllib.request.urlopen(base + "/api/capacity", timeout=5) as response:
+        capacity = json.loads(response.read())
+
+    results = {
+        "chats": args.chats,
+        "concurrency": args.concurrency,
+        "wall_seconds": wall,
+        "chat_status_codes": statuses,
+        "chat_latency": latency_summary([latency for status, latency in outcomes if status == 200]),
+        "health_probes": len(health["latencies"]),
+        "health_failures": health["failures"],
+        "health_latency": latency_summary(health["latencies"]),
+        "server_capacity": capacity,
+    }
+
+    write_results(results, args.output)
+
+    health_p99 = results["health_latency"]["p99_ms"]
+    if health["failures"]:
+        fail(f"{health['failures']} health probes failed while chats were running")
+    if health_p99 > args.max_health_ms:
+        fail(f"health p99 is {health_p99:.1f} ms under chat load (maximum {args.max_health_ms:g} ms)")
+    succeed(f"health p99 stayed at {health_p99:.1f} ms across {len(health['latencies'])} probes during {args.chats} chats")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare the PyTorch and ONNX Runtime embedding backends on CPU.
+
+Checks that the ONNX encoder (int8 by default) agrees with the
+SentenceTransformer encoder by cosine similarity on a fixed set of queries,
+then reports p50/p99 single-query encode latency and batch throughput for
+both. Exits non-zero if agreement falls below --min-cosine.
+
+Usage:
+  python scripts/benchmarks/embedding_backends.py
+  python scripts/benchmarks/embedding_backends.py --fp32 --iterations 500 --output results.json
+"""
+import time
+import argparse
+from pathlib import Path
+
+from _common import FIXTURE_QUERIES, latency_summary, write_results, fail, succeed
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from src.data.db.utils.rag_utils import EMBEDDING_MODEL_NAME
+from src.data.db.utils.onnx_encoder import ONNX_MODEL_DIR, INT8_FILENAME, FP32_FILENAME, OnnxSentenceEncoder, export_onnx_encoder
+
+def measure_latency(encoder, queries, iterations):
+    """Time single-query encodes, cycling through the fixture queries."""
+    for query in queries:
+        encoder.encode(query)  # Warm up
+    
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        encoder.encode(queries[i % len(queries)])
+        samples.append((time.perf_counter() - start) * 1000)
+    return latency_summary(samples)
+
+def measure_throughput(encoder, queries, batch_size, rounds=5):
+    batch = (queries * (batch_size // len(queries) + 1))[:batch_size]
+    encoder.encode(batch, batch_size=batch_size)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encoder.encode(batch, batch_size=batch_size)
+    return batch_size * rounds / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyTorch vs ONNX embedding backends")
+    parser.add_argument("--model-dir", default=ONNX_MODEL_DIR, help="Directory holding the ONNX export")
+    parser.add_argument("--fp32", action="store_true", help="Compare the fp32 ONNX export instead of int8")
+    parser.add_argument("--threads", type=int, help="onnxruntime intra-op threads")
+    parser.add_argument("--iterations", type=int, default=200, help="Single-query encodes per backend")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for the throughput run")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Minimum per-query cosine agreement")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    quantized = not args.fp32
+    model_file = Path(args.model_dir) / (INT8_FILENAME if quantized else FP32_FILENAME)
+    if not model_file.exists():
+        print(f"Exporting {EMBEDDING_MODEL_NAME} to ONNX...")
+        export_onnx_encoder(EMBEDDING_MODEL_NAME, args.model_dir, quantize=quantized)
+    
+    torch_encoder = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    onnx_kwargs = {"threads": args.threads} if args.threads else {}
+    onnx_encoder = OnnxSentenceEncoder(args.model_dir, quantized=quantized, **onnx_kwargs)
+    
+    # Equivalence: cosine agreement per fixture query
+    reference = torch_encoder.encode(FIXTURE_QUERIES, normalize_embeddings=True)
+    candidate = onnx_encoder.encode(FIXTURE_QUERIES)
+    cosines = np.sum(reference * candidate, axis=1)
+    
+    results = {
+        "model": EMBEDDING_MODEL_NAME,
+        "onnx_variant": "int8" if quantized else "fp32",
+        "agreement": {
+            "min_cosine": float(cosines.min()),
+            "mean_cosine": float(cosines.mean()),
+            "threshold": args.min_cosine
+        },
+        "torch": measure_latency(torch_encoder, FIXTURE_QUERIES, args.iterations),
+        "onnx": measure_latency(onnx_encoder, FIXTURE_QUERIES, args.iterations),
+    }
+    results["torch"]["batch_per_second"] = measure_throughput(torch_encoder, FIXTURE_QUERIES, args.batch_size)
+    results["onnx"]["batch_per_second"] = measure_throughput(onnx_encoder, FIXTURE_QUERIES, args.batch_size)
+    
+    write_results(results, args.output)
+    
+    if cosines.min() < args.min_cosine:
+        worst = FIXTURE_QUERIES[int(cosines.argmin())]
+        fail(f"cosine agreement {cosines.min():.4f} below {args.min_cosine} for query: {worst!r}")
+    succeed(f"ONNX embeddings agree with PyTorch (min cosine {cosines.min():.4f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure the per-request orchestration overhead of the politician workflow.
+
+Replaces the three agent nodes with no-ops so only LangGraph's own work is
+timed, then runs the same requests twice: building and compiling the graph
+for every request (the old behaviour), and invoking the compiled graph cached
+by ``get_compiled_graph``. Reports p50/p99 latency for both and the one-off
+build cost. Exits non-zero if the cached graph is not at least --min-speedup
+times faster per request.
+
+Usage:
+  python scripts/benchmarks/graph_compile.py
+  python scripts/benchmarks/graph_compile.py --requests 2000 --output results.json
+"""
+import time
+import argparse
+
+from _common import latency_summary, write_results, fail, succeed
+from src.models.langgraph import workflow
+
+def noop_node(state):
+    return {}
+
+def measure(run, state, requests):
+    """Time ``run(state)`` once per request; returns latencies in ms."""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        run(state)
+        samples.append((time.perf_counter() - start) * 1000)
+    return latency_summary(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request graph compilation vs a cached graph")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per mode")
+    parser.add_argument("--min-speedup", type=float, default=1.0, help="Minimum per-request/cached mean latency ratio")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Time orchestration only: the graph is built from these module-level names
+    workflow.extract_context = noop_node
+    workflow.analyze_sentiment = noop_node
+    workflow.generate_response = noop_node
+
+    state = workflow._initial_state(workflow.PoliticianInput(
+        user_input="What is your position on climate change?",
+        politician_identity="biden"
+    ))
+
+    start = time.perf_counter()
+    compiled = workflow.get_compiled_graph()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    per_request = measure(lambda s: workflow.create_politician_graph(trace=False).compile().invoke(s), state, args.requests)
+    cached = measure(lambda s: workflow.get_compiled_graph().invoke(s), state, args.requests)
+
+    speedup = per_request["mean_ms"] / cached["mean_ms"]
+    results = {
+        "requests": args.requests,
+        "first_build_ms": build_ms,
+        "per_request_compile": per_request,
+        "cached_graph": cached,
+        "overhead_saved_ms": per_request["mean_ms"] - cached["mean_ms"],
+        "speedup": speedup,
+        "cached_is_shared": workflow.get_compiled_graph() is compiled,
+    }
+
+    write_results(results, args.output)
+
+    if not results["cached_is_shared"]:
+        fail("get_compiled_graph returned a new graph instead of the cached one")
+    if speedup < args.min_speedup:
+        fail(f"cached graph is {speedup:.2f}x faster per request (minimum {args.min_speedup}x)")
+    succeed(f"reusing the compiled graph saves {results['overhead_saved_ms']:.2f} ms per request ({speedup:.2f}x)")
+
+if __name__ == "__main__":
+    main()
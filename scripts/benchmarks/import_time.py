@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Import-time regression check for the CLIs and the API.
+
+Config-only commands (--help, listing debate formats) and importing the
+workflow or API modules must not load torch, transformers, peft or
+sentence-transformers; those are imported when a model is first needed.
+Each check runs in a fresh interpreter. The script fails if a heavy module is
+imported or a check exceeds its time budget.
+
+Checks whose own dependencies are missing (e.g. langgraph or fastapi) are
+reported as skipped.
+
+Usage:
+  python scripts/benchmarks/import_time.py
+  python scripts/benchmarks/import_time.py --budget 1.0 --output import-times.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from _common import ROOT_DIR, write_results, fail, succeed
+
+HEAVY_MODULES = ["torch", "transformers", "peft", "sentence_transformers"]
+
+# Commands that only parse arguments or print configuration
+COMMANDS = {
+    "aipolitician --help": [sys.executable, "aipolitician.py", "--help"],
+    "debate cli config --list-formats": [sys.executable, "-m", "src.models.langgraph.debate.cli", "config", "--list-formats"],
+}
+
+# Modules whose import must stay free of model dependencies
+MODULES = [
+    "src.models.langgraph.config",
+    "src.models.langgraph.workflow",
+    "src.models.langgraph.debate.cli",
+    "src.models.langgraph.debate.workflow",
+    "src.models.langgraph.api",
+]
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+try:
+    import {module}
+except ImportError as e:
+    print(json.dumps({{"skipped": str(e)}}))
+    sys.exit(0)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def check_module(module, budget):
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"ok": False, "error": proc.stderr.strip().splitlines()[-1:] or ["no output"]}
+
+    result = json.loads(lines[-1])
+    if "skipped" in result:
+        return {"ok": True, **result}
+    result["budget"] = budget
+    result["ok"] = not result["heavy"] and result["seconds"] <= budget
+    return result
+
+def check_command(argv, budget):
+    # -X importtime reports every module the command loads on stderr
+    start = time.perf_counter()
+    proc = subprocess.run(argv[:1] + ["-X", "importtime"] + argv[1:], cwd=ROOT_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        missing = [line for line in proc.stderr.splitlines() if "ModuleNotFoundError" in line]
+        if missing:
+            return {"ok": True, "skipped": missing[-1]}
+        return {"ok": False, "error": proc.stderr.strip().splitlines()[-1:]}
+
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            imported.add(line.rsplit("|", 1)[-1].strip().split(".")[0])
+    heavy = [module for module in HEAVY_MODULES if module in imported]
+    return {"seconds": elapsed, "heavy": heavy, "budget": budget, "ok": not heavy and elapsed <= budget}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that config-only commands avoid heavy imports")
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("IMPORT_TIME_BUDGET", "2.0")),
+                        help="Maximum seconds per command or module import")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"budget": args.budget, "commands": {}, "modules": {}}
+    for name, argv in COMMANDS.items():
+        results["commands"][name] = check_command(argv, args.budget)
+    for module in MODULES:
+        results["modules"][module] = check_module(module, args.budget)
+
+    write_results(results, args.output)
+
+    failures = [name for group in ("commands", "modules") for name, result in results[group].items() if not result["ok"]]
+    if failures:
+        fail(", ".join(failures))
+    succeed("config-only commands and module imports stay within budget without loading models")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Benchmark the RAG retrieval backends on synthetic politician corpora.
+
+Thin wrapper around src/data/db/utils/benchmark.py: generates corpora of the
+requested sizes, indexes them into exact, ChromaDB, numpy and hybrid backends,
+and reports embedding time, query p50/p95/p99, filtered-vs-unfiltered cost,
+memory footprint and recall@k against exact search. Runs offline on CPU with
+a hashing stand-in encoder unless --encoder points at a local model.
+
+Usage:
+  python scripts/benchmarks/retrieval.py --sizes 10000 --output results.json
+  python scripts/benchmarks/retrieval.py --sizes 10000 100000 1000000 --backends exact numpy hybrid
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent.parent.absolute()
+sys.path.insert(0, str(root_dir))
+
+from src.data.db.utils.benchmark import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Compare micro-batched and per-request sentiment inference on CPU.
+
+Sends the same prompts from --concurrency threads twice: once with every
+request running its own batch-of-one forward pass, and once through the
+sentiment agent's micro-batcher. Reports throughput, p50/p99 request latency
+and the mean batch size, and checks that both modes produce the same
+probabilities. Exits non-zero if they disagree beyond --tolerance or if
+batching is slower than --min-speedup times per-request inference.
+
+Usage:
+  python scripts/benchmarks/sentiment_batching.py
+  python scripts/benchmarks/sentiment_batching.py --requests 512 --concurrency 32 --max-batch-size 32 --output results.json
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Benchmark on CPU regardless of available GPUs
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+from _common import FIXTURE_PROMPTS, percentile, write_results, fail, succeed
+from src.models.langgraph.agents import sentiment_agent
+from src.data.db.utils.micro_batcher import MicroBatcher
+
+def run(classify, prompts, concurrency):
+    """Classify every prompt from a thread pool; returns results, latencies (ms) and wall time."""
+    def timed(prompt):
+        start = time.perf_counter()
+        result = classify(prompt)
+        return result, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, prompts))
+    wall = time.perf_counter() - start
+
+    results = [result for result, _ in outcomes]
+    latencies = [latency for _, latency in outcomes]
+    return results, {
+        "requests_per_second": len(prompts) / wall,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+def max_difference(a, b):
+    return max(abs(x[label] - y[label]) for x, y in zip(a, b) for label in x)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched vs per-request sentiment inference")
+    parser.add_argument("--requests", type=int, default=256, help="Prompts sent per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent request threads")
+    parser.add_argument("--max-batch-size", type=int, default=16, help="Micro-batcher max batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Micro-batcher max wait")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="Maximum probability difference between modes")
+    parser.add_argument("--min-speedup", type=float, default=1.0, help="Minimum batched/per-request throughput ratio")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    # Load the model and warm up both paths before timing
+    if sentiment_agent.classify_batch(FIXTURE_PROMPTS[:2])[0] is None:
+        fail("sentiment model could not be loaded")
+    prompts = (FIXTURE_PROMPTS * (args.requests // len(FIXTURE_PROMPTS) + 1))[:args.requests]
+
+    batcher = MicroBatcher(
+        sentiment_agent.classify_batch,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        name="benchmark-batcher"
+    )
+    batcher(FIXTURE_PROMPTS[0])
+
+    per_request_results, per_request = run(lambda prompt: sentiment_agent.classify_batch([prompt])[0], prompts, args.concurrency)
+    batched_results, batched = run(batcher, prompts, args.concurrency)
+    batched.update(batcher.stats())
+
+    difference = max_difference(per_request_results, batched_results)
+    speedup = batched["requests_per_second"] / per_request["requests_per_second"]
+    results = {
+        "model": sentiment_agent.SENTIMENT_MODEL_ID,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "per_request": per_request,
+        "batched": batched,
+        "speedup": speedup,
+        "max_probability_difference": difference,
+    }
+
+    write_results(results, args.output)
+
+    if difference > args.tolerance:
+        fail(f"batched probabilities differ from per-request by {difference:.5f} (tolerance {args.tolerance})")
+    if speedup < args.min_speedup:
+        fail(f"batched throughput is {speedup:.2f}x per-request (minimum {args.min_speedup}x)")
+    succeed(f"micro-batching serves {speedup:.2f}x the requests per second with matching results")
+
+if __name__ == "__main__":
+    main()
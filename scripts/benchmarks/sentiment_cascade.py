@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline agreement report for the confidence-gated sentiment cascade.
+
+For each prompt, computes the deflection decision twice: with the full
+transformer classifier ("model" mode) and with the cascade, where the
+lexicon rules answer when confident and the classifier handles the rest.
+Reports the escalation rate, how often the two ``should_deflect`` decisions
+agree (overall and on the inputs the rules answered alone), a confusion
+matrix, and every disagreement. Exits non-zero if agreement falls below
+--min-agreement.
+
+Prompts come from --prompts (plain text, one per line, or JSONL with a
+"prompt" or "user_input" field) or a built-in fixture set.
+
+Usage:
+  python scripts/benchmarks/sentiment_cascade.py
+  python scripts/benchmarks/sentiment_cascade.py --prompts chat_logs.jsonl --output report.json
+"""
+import json
+import time
+import argparse
+
+from _common import FIXTURE_PROMPTS, write_results, fail, succeed
+from src.models.langgraph.agents import sentiment_agent
+
+def load_prompts(path):
+    prompts = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                line = record.get("prompt") or record.get("user_input") or ""
+            if line:
+                prompts.append(line)
+    return prompts
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sentiment cascade decisions with the full model")
+    parser.add_argument("--prompts", help="Text file (one prompt per line) or JSONL with prompt/user_input")
+    parser.add_argument("--politician", default="Biden", help="Politician addressed by the prompts")
+    parser.add_argument("--has-knowledge", action="store_true", help="Assume RAG found supporting knowledge")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="Minimum should_deflect agreement")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.prompts) if args.prompts else FIXTURE_PROMPTS
+
+    confusion = {"both_deflect": 0, "both_answer": 0, "cascade_only_deflects": 0, "model_only_deflects": 0}
+    disagreements = []
+    escalated = 0
+    rules_agree = rules_total = 0
+    model_seconds = rules_seconds = 0.0
+
+    for prompt in prompts:
+        start = time.perf_counter()
+        model_analysis = sentiment_agent.analyze_sentiment_details(prompt, args.politician, mode="model")
+        model_seconds += time.perf_counter() - start
+        if "emotion_details" not in model_analysis:
+            fail("sentiment model could not be loaded, so there is nothing to compare against")
+
+        start = time.perf_counter()
+        rules_analysis, confident = sentiment_agent.rule_sentiment(prompt)
+        rules_seconds += time.perf_counter() - start
+
+        # Escalated inputs get exactly the model's analysis in cascade mode
+        cascade_analysis = rules_analysis if confident else model_analysis
+        escalated += 0 if confident else 1
+
+        model_deflects, model_reason = sentiment_agent.decide_deflection(prompt, model_analysis, args.has_knowledge)
+        cascade_deflects, cascade_reason = sentiment_agent.decide_deflection(prompt, cascade_analysis, args.has_knowledge)
+
+        if model_deflects and cascade_deflects:
+            confusion["both_deflect"] += 1
+        elif not model_deflects and not cascade_deflects:
+            confusion["both_answer"] += 1
+        elif cascade_deflects:
+            confusion["cascade_only_deflects"] += 1
+        else:
+            confusion["model_only_deflects"] += 1
+
+        if confident:
+            rules_total += 1
+            rules_agree += model_deflects == cascade_deflects
+        if model_deflects != cascade_deflects:
+            disagreements.append({
+                "prompt": prompt,
+                "model": {"should_deflect": model_deflects, "reason": model_reason, "category": model_analysis["sentiment_category"]},
+                "cascade": {"should_deflect": cascade_deflects, "reason": cascade_reason, "category": cascade_analysis["sentiment_category"]},
+            })
+
+    total = len(prompts)
+    agreement = (confusion["both_deflect"] + confusion["both_answer"]) / total if total else 1.0
+    report = {
+        "prompts": total,
+        "escalation_rate": escalated / total if total else 0.0,
+        "agreement": agreement,
+        "rules_only_agreement": rules_agree / rules_total if rules_total else None,
+        "confusion": confusion,
+        "mean_model_ms": model_seconds / total * 1000 if total else 0.0,
+        "mean_rules_ms": rules_seconds / total * 1000 if total else 0.0,
+        "disagreements": disagreements,
+    }
+
+    write_results(report, args.output)
+
+    if agreement < args.min_agreement:
+        fail(f"cascade agrees with the full model on {agreement:.1%} of prompts (minimum {args.min_agreement:.0%})")
+    succeed(f"cascade agrees on {agreement:.1%} of prompts while escalating {report['escalation_rate']:.1%}")
+
+if __name__ == "__main__":
+    main()
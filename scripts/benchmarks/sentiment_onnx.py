@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Compare the PyTorch and ONNX Runtime sentiment classifiers on CPU.
+
+Checks that the ONNX classifier (int8 by default) predicts the same label as
+the PyTorch model on a fixed set of prompts, then reports p50/p99 latency and
+throughput for both at batch sizes 1, 8 and 32. Exits non-zero if label
+agreement falls below --min-agreement.
+
+Usage:
+  python scripts/benchmarks/sentiment_onnx.py
+  python scripts/benchmarks/sentiment_onnx.py --fp32 --iterations 100 --output results.json
+"""
+import os
+import time
+import argparse
+from pathlib import Path
+
+# Benchmark on CPU regardless of available GPUs
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+from _common import FIXTURE_PROMPTS, percentile, write_results, fail, succeed
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from src.models.langgraph.config import SENTIMENT_MODEL_ID, SENTIMENT_ONNX_MODEL_DIR
+from src.models.langgraph.utils.onnx_classifier import INT8_FILENAME, FP32_FILENAME, OnnxSequenceClassifier, export_onnx_classifier
+
+BATCH_SIZES = [1, 8, 32]
+
+class TorchClassifier:
+    """Eager PyTorch classifier with the same interface as the ONNX one."""
+
+    def __init__(self, model_name):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+    def predict_proba(self, texts):
+        inputs = self.tokenizer(texts, truncation=True, padding="longest", return_tensors="pt")
+        with torch.no_grad():
+            return self.model(**inputs).logits.softmax(dim=-1).numpy()
+
+def measure(classifier, prompts, batch_size, iterations):
+    """Time predict_proba on batches cycling through the fixture prompts."""
+    batches = [
+        [prompts[(i * batch_size + j) % len(prompts)] for j in range(batch_size)]
+        for i in range(iterations)
+    ]
+    classifier.predict_proba(batches[0])  # Warm up
+
+    samples = []
+    for batch in batches:
+        start = time.perf_counter()
+        classifier.predict_proba(batch)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "items_per_second": batch_size * len(samples) / (sum(samples) / 1000),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyTorch vs ONNX sentiment classifiers")
+    parser.add_argument("--model-dir", default=SENTIMENT_ONNX_MODEL_DIR, help="Directory holding the ONNX export")
+    parser.add_argument("--fp32", action="store_true", help="Compare the fp32 ONNX export instead of int8")
+    parser.add_argument("--threads", type=int, help="Intra-op threads for both backends")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed batches per backend and batch size")
+    parser.add_argument("--min-agreement", type=float, default=1.0, help="Minimum fraction of matching labels")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    quantized = not args.fp32
+    model_file = Path(args.model_dir) / (INT8_FILENAME if quantized else FP32_FILENAME)
+    if not model_file.exists():
+        print(f"Exporting {SENTIMENT_MODEL_ID} to ONNX...")
+        export_onnx_classifier(SENTIMENT_MODEL_ID, args.model_dir, quantize=quantized)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch_classifier = TorchClassifier(SENTIMENT_MODEL_ID)
+    onnx_classifier = OnnxSequenceClassifier(args.model_dir, quantized=quantized, threads=args.threads)
+
+    # Parity: predicted label per fixture prompt
+    reference = torch_classifier.predict_proba(FIXTURE_PROMPTS)
+    candidate = onnx_classifier.predict_proba(FIXTURE_PROMPTS)
+    matches = reference.argmax(axis=1) == candidate.argmax(axis=1)
+    labels = torch_classifier.model.config.id2label
+
+    results = {
+        "model": SENTIMENT_MODEL_ID,
+        "onnx_variant": "int8" if quantized else "fp32",
+        "parity": {
+            "label_agreement": float(matches.mean()),
+            "max_probability_difference": float(np.abs(reference - candidate).max()),
+            "threshold": args.min_agreement,
+            "mismatches": [
+                {
+                    "prompt": prompt,
+                    "torch": labels[int(reference[i].argmax())],
+                    "onnx": labels[int(candidate[i].argmax())],
+                }
+                for i, prompt in enumerate(FIXTURE_PROMPTS) if not matches[i]
+            ],
+        },
+        "torch": {},
+        "onnx": {},
+    }
+    for batch_size in BATCH_SIZES:
+        results["torch"][f"batch_{batch_size}"] = measure(torch_classifier, FIXTURE_PROMPTS, batch_size, args.iterations)
+        results["onnx"][f"batch_{batch_size}"] = measure(onnx_classifier, FIXTURE_PROMPTS, batch_size, args.iterations)
+
+    write_results(results, args.output)
+
+    agreement = results["parity"]["label_agreement"]
+    if agreement < args.min_agreement:
+        fail(f"ONNX labels agree with PyTorch on {agreement:.1%} of prompts (minimum {args.min_agreement:.0%})")
+    speedup = results["onnx"]["batch_1"]["items_per_second"] / results["torch"]["batch_1"]["items_per_second"]
+    succeed(f"ONNX labels match PyTorch ({agreement:.0%}); single-item throughput {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
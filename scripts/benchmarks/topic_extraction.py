@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Regression check and latency report for the fast topic extractor.
+
+Runs ``extract_topics`` on the fixture prompts, then on the same prompts with
+non-ASCII text mixed in (including characters such as "İ" whose lowercase
+form is longer than the character itself) before and after them. Every call
+must succeed, and the surrounding words must not change the extracted policy
+areas or entities. Reports p50/p99 latency per prompt. Exits non-zero
+on any exception or mismatch.
+
+Usage:
+  python scripts/benchmarks/topic_extraction.py
+  python scripts/benchmarks/topic_extraction.py --iterations 2000 --output results.json
+"""
+import time
+import random
+import argparse
+
+from _common import FIXTURE_PROMPTS, latency_summary, write_results, fail, succeed
+from src.models.langgraph.agents.topic_extractor import extract_topics
+
+# Non-ASCII words that match no alias; "İ" lowercases to two characters
+NON_ASCII_WORDS = ["İstanbul", "İİİİ", "Straße", "ﬁre", "naïve", "Ελλάδα", "東京", "🇺🇸", "café", "ǅemal"]
+
+# Aliases that only count in capitals ("IRA", "Hunter"), so their case checks
+# must read the right characters of the original prompt
+ALIAS_CASE_PROMPTS = [
+    "What is the IRA doing for clean energy?",
+    "Will the ira be extended?",
+    "Talk about ICE raids at the border.",
+    "I want ice cream and lower taxes.",
+    "Tell me about Hunter and the laptop.",
+    "talks with hunter",
+    "İstanbul İzmir İİİİ talks with hunter",
+    "Is Georgia going to flip?",
+]
+
+def with_noise(prompt, rng):
+    """Surround ``prompt`` with non-ASCII words, shifting every match offset."""
+    before = " ".join(rng.choice(NON_ASCII_WORDS) for _ in range(3))
+    after = " ".join(rng.choice(NON_ASCII_WORDS) for _ in range(2))
+    return f"{before} {prompt} {after}"
+
+def signature(topics):
+    return sorted(topics["policy_areas"]), [entity["name"] for entity in topics["entities"]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the topic extractor on ASCII and non-ASCII prompts")
+    parser.add_argument("--iterations", type=int, default=500, help="Timed extractions")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for placing the non-ASCII words")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    errors = []
+    mismatches = []
+    for prompt in FIXTURE_PROMPTS + ALIAS_CASE_PROMPTS:
+        noisy = with_noise(prompt, rng)
+        try:
+            expected = signature(extract_topics(prompt))
+            actual = signature(extract_topics(noisy))
+        except Exception as e:
+            errors.append({"prompt": noisy, "error": repr(e)})
+            continue
+        if actual != expected:
+            mismatches.append({"prompt": noisy, "expected": expected, "actual": actual})
+
+    samples = []
+    for i in range(args.iterations):
+        prompt = FIXTURE_PROMPTS[i % len(FIXTURE_PROMPTS)]
+        start = time.perf_counter()
+        extract_topics(prompt)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    results = {
+        "prompts": len(FIXTURE_PROMPTS) + len(ALIAS_CASE_PROMPTS),
+        "errors": errors,
+        "mismatches": mismatches,
+        "latency": latency_summary(samples),
+    }
+    write_results(results, args.output)
+
+    if errors:
+        fail(f"extract_topics raised on {len(errors)} non-ASCII prompts")
+    if mismatches:
+        fail(f"non-ASCII text changed the extracted topics of {len(mismatches)} prompts")
+    succeed(f"topics unchanged by non-ASCII text; p99 {results['latency']['p99_ms']:.3f} ms per prompt")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Helper script to rebuild the BM25 lexical index from the politicians collection.
+Ingestion keeps the index up to date; run this for collections loaded another way,
+then set RAG_HYBRID_RETRIEVAL=1 to fuse keyword and vector scores at query time.
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent.parent.absolute()
+sys.path.insert(0, str(root_dir))
+
+from src.data.db.chroma.schema import DEFAULT_DB_PATH, DEFAULT_COLLECTION_NAME, connect_to_chroma, get_collection
+from src.data.db.utils.lexical_index import DEFAULT_LEXICAL_INDEX_PATH, build_lexical_index
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    """Build the lexical index from the ChromaDB collection."""
+    parser = argparse.ArgumentParser(description="Build the BM25 lexical index for hybrid RAG retrieval")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="ChromaDB persistent storage path")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION_NAME, help="Collection to index")
+    parser.add_argument("--output", default=DEFAULT_LEXICAL_INDEX_PATH, help="SQLite file to write the index into")
+    
+    args = parser.parse_args()
+    
+    client = connect_to_chroma(args.db_path, args.collection)
+    collection = get_collection(client, args.collection)
+    if not collection:
+        print(f"Could not open collection '{args.collection}' at {args.db_path}")
+        sys.exit(1)
+    
+    indexed = build_lexical_index(collection, args.output)
+    
+    print(f"\nLexical index written to {args.output}")
+    print(f"Chunks indexed: {indexed}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Helper script to export the politicians collection into the in-process vector index.
+Run it after the ChromaDB collection changes, then set RAG_RETRIEVAL_BACKEND=numpy
+to serve retrieval from the memory-mapped shards.
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent.parent.absolute()
+sys.path.insert(0, str(root_dir))
+
+from src.data.db.chroma.schema import DEFAULT_DB_PATH, DEFAULT_COLLECTION_NAME, connect_to_chroma, get_collection
+from src.data.db.utils.vector_index import DEFAULT_INDEX_PATH, build_vector_index
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    """Build the vector index from the ChromaDB collection."""
+    parser = argparse.ArgumentParser(description="Build the in-process vector index for RAG retrieval")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="ChromaDB persistent storage path")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION_NAME, help="Collection to export")
+    parser.add_argument("--output", default=DEFAULT_INDEX_PATH, help="Directory to write the index into")
+    
+    args = parser.parse_args()
+    
+    client = connect_to_chroma(args.db_path, args.collection)
+    collection = get_collection(client, args.collection)
+    if not collection:
+        print(f"Could not open collection '{args.collection}' at {args.db_path}")
+        sys.exit(1)
+    
+    manifest = build_vector_index(collection, args.output)
+    
+    print(f"\nVector index written to {args.output}")
+    print(f"Documents: {manifest['source_count']}")
+    for politician, shard in manifest["shards"].items():
+        print(f"  - {politician or '(no politician)'}: {shard['count']} vectors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Helper script to load documents into the politicians knowledge base.
+Streams JSONL/CSV documents through chunking, batched embedding and upserts,
+and resumes from its checkpoint if a previous run was interrupted. With
+--incremental only new or changed chunks are embedded and vanished ones removed.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+root_dir = Path(__file__).parent.parent.parent.absolute()
+sys.path.insert(0, str(root_dir))
+
+from src.data.db.chroma.schema import DEFAULT_DB_PATH, DEFAULT_COLLECTION_NAME, get_or_create_collection
+from src.data.db.utils.ingestion import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_EMBED_BATCH_SIZE,
+    DEFAULT_UPSERT_BATCH_SIZE,
+    ingest_documents,
+    update_index
+)
+from src.data.db.utils.embedding_store import EMBEDDING_STORE_FILENAME, open_embedding_store
+from src.data.db.utils.lexical_index import DEFAULT_LEXICAL_INDEX_PATH, open_lexical_index
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+def main():
+    """Ingest documents into the ChromaDB collection."""
+    parser = argparse.ArgumentParser(description="Initialize or extend the AI Politician knowledge base")
+    parser.add_argument("--source", required=True, help="JSONL/CSV file or directory of files to ingest")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH, help="ChromaDB persistent storage path")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION_NAME, help="Collection to write into")
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to the source directory)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Characters per chunk")
+    parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP, help="Characters of overlap between chunks")
+    parser.add_argument("--embed-batch-size", type=int, default=DEFAULT_EMBED_BATCH_SIZE, help="Chunks embedded per batch")
+    parser.add_argument("--upsert-batch-size", type=int, default=DEFAULT_UPSERT_BATCH_SIZE, help="Chunks per upsert call")
+    parser.add_argument("--workers", type=int, help="Encoder processes on CPU (default: all cores)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint and start over")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only embed new or changed chunks and delete chunks missing from the source")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="With --incremental, keep chunks that are no longer in the source")
+    parser.add_argument("--embedding-cache", help="On-disk embedding cache file (defaults to the database directory)")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Always run the encoder")
+    parser.add_argument("--lexical-index", default=DEFAULT_LEXICAL_INDEX_PATH, help="BM25 index kept alongside the collection")
+    parser.add_argument("--no-lexical-index", action="store_true", help="Do not maintain the BM25 index")
+    
+    args = parser.parse_args()
+    
+    collection = get_or_create_collection(args.db_path, args.collection)
+    if not collection:
+        print(f"Could not open collection '{args.collection}' at {args.db_path}")
+        sys.exit(1)
+    
+    embedding_store = None
+    if not args.no_embedding_cache:
+        embedding_store = open_embedding_store(
+            args.embedding_cache or os.path.join(args.db_path, EMBEDDING_STORE_FILENAME)
+        )
+    
+    lexical_index = None if args.no_lexical_index else open_lexical_index(args.lexical_index)
+    
+    if args.incremental:
+        stats = update_index(
+            collection,
+            args.source,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            embed_batch_size=args.embed_batch_size,
+            upsert_batch_size=args.upsert_batch_size,
+            workers=args.workers,
+            embedding_store=embedding_store,
+            delete_missing=not args.keep_missing,
+            lexical_index=lexical_index
+        )
+    else:
+        stats = ingest_documents(
+            collection,
+            args.source,
+            checkpoint_path=args.checkpoint,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            embed_batch_size=args.embed_batch_size,
+            upsert_batch_size=args.upsert_batch_size,
+            workers=args.workers,
+            resume=not args.restart,
+            embedding_store=embedding_store,
+            lexical_index=lexical_index
+        )
+    
+    print("\nIngestion complete:")
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
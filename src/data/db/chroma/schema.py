@@ -7,14 +7,23 @@ for the politician document collection.
 """
 
 import os
+import time
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 # Set the default database path
 DEFAULT_DB_PATH = "/opt/chroma_db"
 DEFAULT_COLLECTION_NAME = "politicians"
 
+# Retrieval backend used by query_politician_data: "chroma" or "numpy"
+# ("numpy" uses the exported in-process index and falls back to ChromaDB)
+RETRIEVAL_BACKEND = os.environ.get("RAG_RETRIEVAL_BACKEND", "chroma")
+
+# Minimum number of seconds between health checks of a pooled collection handle
+HEALTH_CHECK_INTERVAL = float(os.environ.get("CHROMA_HEALTH_CHECK_INTERVAL", "30"))
+
 # Import ChromaDB
 try:
     import chromadb
@@ -24,12 +33,16 @@ except ImportError:
     HAS_CHROMADB = False
     logging.warning("ChromaDB not installed. RAG functionality will be disabled.")
 
-def connect_to_chroma(db_path: str = DEFAULT_DB_PATH) -> Optional[Any]:
+def connect_to_chroma(
+    db_path: str = DEFAULT_DB_PATH,
+    collection_name: str = DEFAULT_COLLECTION_NAME
+) -> Optional[Any]:
     """
     Connect to ChromaDB database.
     
     Args:
         db_path: Path to ChromaDB persistent storage
+        collection_name: Collection that must exist for the connection to be valid
         
     Returns:
         ChromaDB client or None if connection fails
@@ -53,12 +66,12 @@ def connect_to_chroma(db_path: str = DEFAULT_DB_PATH) -> Optional[Any]:
         
         # Verify connection by checking if the politicians collection exists
         try:
-            collection = client.get_collection(name=DEFAULT_COLLECTION_NAME)
+            collection = client.get_collection(name=collection_name)
             if collection:
                 logging.info(f"Successfully connected to ChromaDB at {db_path}")
                 return client
         except Exception as e:
-            logging.error(f"Collection '{DEFAULT_COLLECTION_NAME}' not found: {str(e)}")
+            logging.error(f"Collection '{collection_name}' not found: {str(e)}")
             return None
             
     except Exception as e:
@@ -88,6 +101,256 @@ def get_collection(client: Any, collection_name: str = DEFAULT_COLLECTION_NAME)
         logging.error(f"Error getting collection '{collection_name}': {str(e)}")
         return None
 
+def get_or_create_collection(
+    db_path: str = DEFAULT_DB_PATH,
+    collection_name: str = DEFAULT_COLLECTION_NAME
+) -> Optional[Any]:
+    """
+    Open a collection for writing, creating the database and collection if needed.
+    
+    New collections use cosine distance, matching the similarity method the
+    retrieval layer assumes.
+    
+    Args:
+        db_path: Path to ChromaDB persistent storage
+        collection_name: Name of the collection to open or create
+        
+    Returns:
+        ChromaDB collection or None if it cannot be opened
+    """
+    if not HAS_CHROMADB:
+        return None
+    
+    try:
+        os.makedirs(db_path, exist_ok=True)
+        client = chromadb.PersistentClient(
+            path=db_path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=False
+            )
+        )
+        return client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+    except Exception as e:
+        logging.error(f"Error opening collection '{collection_name}' for writing: {str(e)}")
+        return None
+
+class ChromaCollectionRegistry:
+    """
+    Thread-safe registry of long-lived ChromaDB clients and collection handles.
+    
+    Clients are keyed by database path and collections by (database path,
+    collection name). Handles are health-checked at most once every
+    ``health_check_interval`` seconds and reopened lazily when a check fails,
+    so per-request retrieval only pays for the vector query itself.
+    """
+    
+    def __init__(self, health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Any] = {}
+        self._collections: Dict[Tuple[str, str], Any] = {}
+        self._last_checked: Dict[Tuple[str, str], float] = {}
+        self._stats = {
+            "client_opens": 0,
+            "collection_opens": 0,
+            "reuses": 0,
+            "reconnects": 0,
+            "health_check_failures": 0
+        }
+    
+    def get_collection(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        collection_name: str = DEFAULT_COLLECTION_NAME
+    ) -> Optional[Any]:
+        """
+        Get a pooled collection handle, opening or reopening it if needed.
+        
+        Args:
+            db_path: Path to ChromaDB persistent storage
+            collection_name: Name of the collection to retrieve
+            
+        Returns:
+            ChromaDB collection or None if it cannot be opened
+        """
+        key = (db_path, collection_name)
+        
+        with self._lock:
+            collection = self._collections.get(key)
+            if collection is not None:
+                if self._is_healthy(key, collection):
+                    self._stats["reuses"] += 1
+                    return collection
+                
+                # Drop the stale handles and reconnect below
+                self._stats["reconnects"] += 1
+                self._collections.pop(key, None)
+                self._clients.pop(db_path, None)
+            
+            return self._open(key)
+    
+    def invalidate(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        collection_name: str = DEFAULT_COLLECTION_NAME
+    ) -> None:
+        """Forget a pooled collection handle so the next lookup reopens it."""
+        with self._lock:
+            self._collections.pop((db_path, collection_name), None)
+            self._last_checked.pop((db_path, collection_name), None)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Return open/reuse counters and the number of pooled handles."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pooled_clients"] = len(self._clients)
+            stats["pooled_collections"] = len(self._collections)
+            return stats
+    
+    def _is_healthy(self, key: Tuple[str, str], collection: Any) -> bool:
+        """Check a pooled handle, skipping the check if one ran recently."""
+        now = time.monotonic()
+        if now - self._last_checked.get(key, 0.0) < self.health_check_interval:
+            return True
+        
+        try:
+            collection.count()
+            self._last_checked[key] = now
+            return True
+        except Exception as e:
+            self._stats["health_check_failures"] += 1
+            logging.warning(f"Pooled ChromaDB collection '{key[1]}' failed health check: {str(e)}")
+            return False
+    
+    def _open(self, key: Tuple[str, str]) -> Optional[Any]:
+        """Open (or reuse the client for) a collection. Caller holds the lock."""
+        db_path, collection_name = key
+        
+        client = self._clients.get(db_path)
+        if client is None:
+            client = connect_to_chroma(db_path, collection_name)
+            if not client:
+                return None
+            self._clients[db_path] = client
+            self._stats["client_opens"] += 1
+        
+        collection = get_collection(client, collection_name)
+        if not collection:
+            return None
+        
+        self._collections[key] = collection
+        self._last_checked[key] = time.monotonic()
+        self._stats["collection_opens"] += 1
+        return collection
+
+# Process-wide registry shared by chat and debate retrieval
+_collection_registry = ChromaCollectionRegistry()
+
+def get_collection_registry() -> ChromaCollectionRegistry:
+    """Get the process-wide ChromaDB collection registry."""
+    return _collection_registry
+
+def get_pooled_collection(
+    db_path: str = DEFAULT_DB_PATH,
+    collection_name: str = DEFAULT_COLLECTION_NAME
+) -> Optional[Any]:
+    """
+    Get a long-lived collection handle from the process-wide registry.
+    
+    Args:
+        db_path: Path to ChromaDB persistent storage
+        collection_name: Name of the collection to retrieve
+        
+    Returns:
+        ChromaDB collection or None if it cannot be opened
+    """
+    if not HAS_CHROMADB:
+        return None
+    
+    return _collection_registry.get_collection(db_path, collection_name)
+
+def search_politician_data(
+    collection: Any,
+    query_embedding: List[float],
+    politician_name: str,
+    num_results: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Run a filtered vector search on the configured retrieval backend.
+    
+    Args:
+        collection: ChromaDB collection (the source of truth)
+        query_embedding: Embedding of the query text
+        politician_name: Name of the politician to filter by
+        num_results: Maximum number of results to return
+        
+    Returns:
+        List of document dictionaries with text and metadata
+    """
+    if RETRIEVAL_BACKEND == "numpy":
+        from src.data.db.utils.vector_index import query_vector_index
+        
+        documents = query_vector_index(collection, query_embedding, politician_name, num_results)
+        if documents is not None:
+            return documents
+    
+    # Search the collection with metadata filtering
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=num_results,
+        where={"politician_name": politician_name}
+    )
+    
+    return _format_query_results(results, 0)
+
+def _format_query_results(results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+    """Format one query's row of a ChromaDB query response as document dictionaries."""
+    documents = []
+    distances = results.get("distances") or []
+    for i, (doc, metadata) in enumerate(zip(results.get("documents", [[]])[row], results.get("metadatas", [[]])[row])):
+        documents.append({
+            "text": doc,
+            "metadata": metadata,
+            "score": distances[row][i] if distances else None
+        })
+    
+    return documents
+
+def search_politician_data_batch(
+    collection: Any,
+    query_embeddings: List[List[float]],
+    politician_name: str,
+    num_results: int = 5
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run several filtered vector searches for one politician at once.
+    
+    On the ChromaDB backend this is a single multi-embedding ``collection.query``.
+    
+    Returns:
+        One list of document dictionaries per query embedding
+    """
+    if not query_embeddings:
+        return []
+    
+    if RETRIEVAL_BACKEND == "numpy":
+        return [
+            search_politician_data(collection, embedding, politician_name, num_results)
+            for embedding in query_embeddings
+        ]
+    
+    results = collection.query(
+        query_embeddings=query_embeddings,
+        n_results=num_results,
+        where={"politician_name": politician_name}
+    )
+    
+    return [_format_query_results(results, row) for row in range(len(query_embeddings))]
+
 def query_politician_data(
     collection: Any,
     query_text: str,
@@ -112,31 +375,176 @@ def query_politician_data(
     try:
         # Import the embeddings utility to avoid circular imports
         from src.data.db.utils.rag_utils import get_embeddings
+        from src.data.db.utils.cache import get_result_cache, embedding_hash, copy_results
+        from src.data.db.utils.lexical_index import (
+            HYBRID_RETRIEVAL, HYBRID_CANDIDATE_MULTIPLIER, get_lexical_index, fuse_results
+        )
+        
+        lexical_index = get_lexical_index(collection) if HYBRID_RETRIEVAL else None
+        
+        # Short keyword queries with enough exact hits skip the encoder entirely
+        if lexical_index is not None:
+            exact = lexical_index.exact_match(query_text, politician_name, num_results)
+            if exact:
+                return exact
         
         # Generate embeddings for the query
         query_embedding = get_embeddings(query_text)
         
         if not query_embedding:
+            # BM25 still works without the embedding model
+            if lexical_index is not None:
+                return lexical_index.search(query_text, politician_name, num_results)
             return []
         
-        # Search the collection with metadata filtering
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=num_results,
-            where={"politician_name": politician_name}
-        )
+        # Serve repeated queries from the result cache while the collection is unchanged
+        result_cache = get_result_cache()
+        cache_key = None
+        if result_cache is not None:
+            fingerprint = result_cache.check_collection(collection)
+            cache_key = (fingerprint, embedding_hash(query_embedding), politician_name, num_results,
+                         lexical_index is not None)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return copy_results(cached)
+        
+        if lexical_index is not None:
+            candidates = num_results * HYBRID_CANDIDATE_MULTIPLIER
+            documents = fuse_results(
+                search_politician_data(collection, query_embedding, politician_name, candidates),
+                lexical_index.search(query_text, politician_name, candidates),
+                num_results
+            )
+        else:
+            documents = search_politician_data(collection, query_embedding, politician_name, num_results)
         
-        # Format the results
-        documents = []
-        for i, (doc, metadata) in enumerate(zip(results.get("documents", [[]])[0], results.get("metadatas", [[]])[0])):
-            documents.append({
-                "text": doc,
-                "metadata": metadata,
-                "score": results.get("distances", [[]])[0][i] if "distances" in results else None
-            })
+        if cache_key is not None:
+            result_cache.set(cache_key, copy_results(documents))
             
         return documents
         
     except Exception as e:
         logging.error(f"Error querying database: {str(e)}")
-        return [] 
\ No newline at end of file
+        return []
+
+def query_politician_data_batch(
+    collection: Any,
+    query_texts: List[str],
+    politician_name: str,
+    num_results: int = 5
+) -> List[List[Dict[str, Any]]]:
+    """
+    Query the politician collection for several texts at once.
+    
+    Each text goes through the same lexical shortcut, embedding cache and
+    result cache as ``query_politician_data``. The remaining texts are
+    embedded in one encoder call and searched with one multi-embedding query,
+    and on the hybrid backend each text's vector candidates are then fused
+    with its BM25 hits.
+    
+    Args:
+        collection: ChromaDB collection
+        query_texts: The texts to search for
+        politician_name: Name of the politician to filter by
+        num_results: Maximum number of results per text
+        
+    Returns:
+        One list of document dictionaries per query text
+    """
+    if not collection or not query_texts:
+        return [[] for _ in query_texts]
+    
+    try:
+        from src.data.db.utils.rag_utils import get_embeddings_many
+        from src.data.db.utils.cache import get_result_cache, embedding_hash, copy_results
+        from src.data.db.utils.lexical_index import (
+            HYBRID_RETRIEVAL, HYBRID_CANDIDATE_MULTIPLIER, get_lexical_index, fuse_results
+        )
+        
+        lexical_index = get_lexical_index(collection) if HYBRID_RETRIEVAL else None
+        results: List[Optional[List[Dict[str, Any]]]] = [None for _ in query_texts]
+        
+        # Short keyword queries with enough exact hits skip the encoder entirely
+        pending = list(range(len(query_texts)))
+        if lexical_index is not None:
+            for i in pending:
+                exact = lexical_index.exact_match(query_texts[i], politician_name, num_results)
+                if exact:
+                    results[i] = exact
+            pending = [i for i in pending if results[i] is None]
+        
+        embeddings = get_embeddings_many([query_texts[i] for i in pending])
+        
+        # Serve repeated queries from the result cache while the collection is unchanged
+        result_cache = get_result_cache()
+        fingerprint = result_cache.check_collection(collection) if result_cache is not None else None
+        cache_keys = {}
+        to_search = []
+        for i, query_embedding in zip(pending, embeddings):
+            if not query_embedding:
+                # BM25 still works without the embedding model
+                results[i] = []
+                if lexical_index is not None:
+                    results[i] = lexical_index.search(query_texts[i], politician_name, num_results)
+                continue
+            if result_cache is not None:
+                cache_keys[i] = (fingerprint, embedding_hash(query_embedding), politician_name, num_results,
+                                 lexical_index is not None)
+                cached = result_cache.get(cache_keys[i])
+                if cached is not None:
+                    results[i] = copy_results(cached)
+                    continue
+            to_search.append((i, query_embedding))
+        
+        if to_search:
+            candidates = num_results * HYBRID_CANDIDATE_MULTIPLIER if lexical_index is not None else num_results
+            searched = search_politician_data_batch(
+                collection, [query_embedding for _, query_embedding in to_search], politician_name, candidates
+            )
+            for (i, _), documents in zip(to_search, searched):
+                if lexical_index is not None:
+                    documents = fuse_results(
+                        documents,
+                        lexical_index.search(query_texts[i], politician_name, candidates),
+                        num_results
+                    )
+                results[i] = documents
+                if i in cache_keys:
+                    result_cache.set(cache_keys[i], copy_results(documents))
+        
+        return [documents or [] for documents in results]
+        
+    except Exception as e:
+        logging.error(f"Error running batched query: {str(e)}")
+        return [[] for _ in query_texts]
+
+async def aquery_politician_data(
+    collection: Any,
+    query_text: str,
+    politician_name: str,
+    num_results: int = 5,
+    timeout: Any = None
+) -> List[Dict[str, Any]]:
+    """
+    Async version of ``query_politician_data`` running on the bounded RAG executor.
+    
+    Args:
+        collection: ChromaDB collection
+        query_text: The text to search for
+        politician_name: Name of the politician to filter by
+        num_results: Maximum number of results to return
+        timeout: Seconds to wait (None uses ``RAG_TIMEOUT``, ``NO_TIMEOUT`` waits indefinitely)
+        
+    Returns:
+        List of document dictionaries, or an empty list on timeout
+    """
+    import asyncio
+    from src.data.db.utils.rag_utils import resolve_timeout, run_in_rag_executor
+    
+    try:
+        return await run_in_rag_executor(
+            query_politician_data, collection, query_text, politician_name, num_results, timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logging.warning(f"Query for {politician_name} timed out after {resolve_timeout(timeout)}s")
+        return []
\ No newline at end of file
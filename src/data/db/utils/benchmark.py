@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Retrieval Benchmark Harness for the AI Politician RAG System
+
+Generates synthetic politician corpora, indexes them through every retrieval
+backend and reports latency, memory and recall so changes to the retrieval
+path can be compared over time.
+
+For each corpus size the harness:
+
+1. Generates ``size`` chunks spread across synthetic politicians, using a
+   policy vocabulary so keyword search has something to match.
+2. Embeds them with an offline encoder and records embedding throughput.
+3. Builds each backend and records build time, on-disk size and RSS growth:
+   - ``exact``: in-memory float32 brute force (the recall reference)
+   - ``chroma``: a ChromaDB collection written with ``upsert_chunks`` and
+     queried through ``schema.search_politician_data``
+   - ``numpy``: the memory-mapped shards from ``build_vector_index``
+   - ``hybrid``: ChromaDB candidates fused with the BM25 ``lexical_index``
+4. Runs the query set filtered by politician (and unfiltered where the backend
+   supports it), reporting p50/p95/p99 latency and recall@k against ``exact``.
+
+Everything runs offline on CPU. The default ``hashing`` encoder is a stand-in
+that hashes words into a fixed-size vector; pass ``--encoder /path/to/model``
+to use a local sentence-transformers model instead. Results are written as JSON.
+
+Usage:
+    python -m src.data.db.utils.benchmark --sizes 10000 --output results.json
+    python scripts/benchmarks/retrieval.py --sizes 10000 100000 1000000 --backends exact numpy
+"""
+
+import os
+import re
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import platform
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Constants
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_BACKENDS = ["exact", "chroma", "numpy", "hybrid"]
+DEFAULT_POLITICIANS = ["Joe Biden", "Donald Trump", "Kamala Harris", "Mike Pence"]
+DEFAULT_NUM_QUERIES = 200
+DEFAULT_TOP_K = 5
+HASHING_DIMENSION = 384  # Same width as all-MiniLM-L6-v2
+
+POLICY_TERMS = [
+    "border wall funding", "inflation reduction act", "student loan forgiveness", "tariffs on china",
+    "climate change", "prescription drug prices", "second amendment", "nato alliance", "ukraine aid",
+    "infrastructure bill", "social security", "medicare", "tax cuts", "minimum wage", "energy independence",
+    "supply chains", "border security", "job creation", "manufacturing", "health care", "immigration reform",
+    "trade deals", "defense spending", "police reform", "election integrity", "chips act", "clean energy",
+    "oil drilling", "small business", "veterans affairs"
+]
+FILLER_WORDS = [
+    "american", "families", "workers", "plan", "believe", "country", "people", "support", "policy",
+    "economy", "future", "record", "promise", "fight", "deliver", "strong", "fair", "security",
+    "jobs", "growth", "communities", "leadership", "congress", "administration", "state", "nation",
+    "middle", "class", "costs", "investment", "protect", "rights", "history", "vote", "bill", "law"
+]
+
+
+class HashingEncoder:
+    """
+    Deterministic stand-in encoder: signed feature hashing of words and bigrams.
+
+    It has no model weights and needs no network access, yet texts that share
+    words land close together, which is enough to exercise the retrieval path.
+    """
+
+    def __init__(self, dimension: int = HASHING_DIMENSION):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def encode(self, sentences: Any, batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                embeddings[row, digest % self.dimension] += 1.0 if (digest >> 63) & 1 else -1.0
+
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(name: str) -> Any:
+    """Return the hashing stand-in, or a sentence-transformers model from a local path."""
+    if name == "hashing":
+        return HashingEncoder()
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name, device="cpu")
+
+
+def generate_corpus(
+    size: int,
+    politicians: List[str] = DEFAULT_POLITICIANS,
+    seed: int = 0
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Generate ``size`` synthetic (id, text, metadata) chunks."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(size):
+        politician = politicians[i % len(politicians)]
+        topics = rng.sample(POLICY_TERMS, 2)
+        filler = " ".join(rng.choices(FILLER_WORDS, k=rng.randint(20, 60)))
+        text = (
+            f"{politician} spoke about {topics[0]}. {filler.capitalize()}. "
+            f"On {topics[1]}, the position was clear: {' '.join(rng.choices(FILLER_WORDS, k=12))}."
+        )
+        metadata = {
+            "politician_name": politician,
+            "source": f"synthetic-{i // 1000}",
+            "content_type": rng.choice(["speech", "interview", "statement", "fact"]),
+            "topic": topics[0]
+        }
+        chunks.append((f"synthetic-{i}", text, metadata))
+    return chunks
+
+
+def generate_queries(count: int, politicians: List[str] = DEFAULT_POLITICIANS, seed: int = 1) -> List[Tuple[str, str]]:
+    """Generate (query text, politician) pairs mixing keyword and question styles."""
+    rng = random.Random(seed)
+    templates = [
+        "{term}",
+        "What is {name}'s position on {term}?",
+        "Tell me about your plan for {term} and {other}",
+        "{term} {filler}"
+    ]
+    queries = []
+    for _ in range(count):
+        term, other = rng.sample(POLICY_TERMS, 2)
+        politician = rng.choice(politicians)
+        text = rng.choice(templates).format(
+            term=term, other=other, name=politician, filler=" ".join(rng.choices(FILLER_WORDS, k=3))
+        )
+        queries.append((text, politician))
+    return queries
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _disk_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1e6
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples)
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean())
+    }
+
+
+def _recall_at_k(results: List[List[str]], reference: List[List[str]]) -> float:
+    hits = total = 0
+    for found, expected in zip(results, reference):
+        hits += len(set(found) & set(expected))
+        total += len(expected)
+    return hits / total if total else 0.0
+
+
+class ExactSearch:
+    """Float32 brute-force search; the ground truth for recall."""
+
+    def __init__(self, chunks: List[Tuple[str, str, Dict[str, Any]]], embeddings: np.ndarray):
+        self.ids = [chunk_id for chunk_id, _, _ in chunks]
+        self.texts = [text for _, text, _ in chunks]
+        self.embeddings = embeddings
+        self.rows_by_politician: Dict[str, np.ndarray] = {}
+        politicians = np.asarray([metadata["politician_name"] for _, _, metadata in chunks])
+        for politician in np.unique(politicians):
+            self.rows_by_politician[str(politician)] = np.flatnonzero(politicians == politician)
+
+    def query(self, query_embedding: np.ndarray, k: int, politician: Optional[str] = None) -> List[str]:
+        rows = self.rows_by_politician.get(politician) if politician else None
+        matrix = self.embeddings if rows is None else self.embeddings[rows]
+        similarities = matrix @ query_embedding
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        if rows is not None:
+            top = rows[top]
+        return [self.ids[i] for i in top]
+
+
+def _time_queries(
+    run: Callable[[str, np.ndarray, str], List[str]],
+    queries: List[Tuple[str, str]],
+    query_embeddings: np.ndarray
+) -> Tuple[Dict[str, float], List[List[str]]]:
+    run(queries[0][0], query_embeddings[0], queries[0][1])  # Warm up caches and lazy loads
+    samples, results = [], []
+    for (text, politician), embedding in zip(queries, query_embeddings):
+        start = time.perf_counter()
+        results.append(run(text, embedding, politician))
+        samples.append((time.perf_counter() - start) * 1000)
+    return _latency_summary(samples), results
+
+
+def _ids_from_documents(documents: List[Dict[str, Any]], id_by_text: Dict[str, str]) -> List[str]:
+    return [id_by_text.get(doc["text"], "") for doc in documents]
+
+
+def benchmark_size(
+    size: int,
+    backends: List[str],
+    encoder: Any,
+    num_queries: int = DEFAULT_NUM_QUERIES,
+    k: int = DEFAULT_TOP_K,
+    work_dir: Optional[str] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Benchmark every requested backend on one synthetic corpus size."""
+    from src.data.db.utils.ingestion import upsert_chunks
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix=f"rag-bench-{size}-")
+    result: Dict[str, Any] = {"size": size, "k": k, "queries": num_queries, "backends": {}}
+
+    logging.info(f"[{size}] Generating corpus")
+    chunks = generate_corpus(size, seed=seed)
+    queries = generate_queries(num_queries, seed=seed + 1)
+    id_by_text = {text: chunk_id for chunk_id, text, _ in chunks}
+
+    start = time.perf_counter()
+    embeddings = np.asarray(encoder.encode([text for _, text, _ in chunks], batch_size=256), dtype=np.float32)
+    embed_seconds = time.perf_counter() - start
+    result["embedding"] = {"seconds": embed_seconds, "chunks_per_second": size / embed_seconds if embed_seconds else 0.0}
+
+    query_embeddings = np.asarray(encoder.encode([text for text, _ in queries]), dtype=np.float32)
+
+    # Exact search is always built: it is the recall reference
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    exact = ExactSearch(chunks, embeddings)
+    exact_build = time.perf_counter() - start
+    filtered_latency, reference = _time_queries(
+        lambda text, emb, politician: exact.query(emb, k, politician), queries, query_embeddings
+    )
+    unfiltered_latency, unfiltered_reference = _time_queries(
+        lambda text, emb, politician: exact.query(emb, k), queries, query_embeddings
+    )
+    if "exact" in backends:
+        result["backends"]["exact"] = {
+            "build_seconds": exact_build,
+            "rss_delta_mb": _rss_mb() - rss_before,
+            "disk_mb": 0.0,
+            "filtered": filtered_latency,
+            "unfiltered": unfiltered_latency,
+            "recall_at_k": 1.0
+        }
+
+    collection = None
+    if any(backend in backends for backend in ("chroma", "numpy", "hybrid")):
+        from src.data.db.chroma.schema import get_or_create_collection
+
+        chroma_path = os.path.join(work_dir, "chroma")
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        collection = get_or_create_collection(chroma_path, "politicians")
+        if collection is None:
+            for backend in ("chroma", "numpy", "hybrid"):
+                if backend in backends:
+                    result["backends"][backend] = {"skipped": "ChromaDB unavailable"}
+        else:
+            upsert_chunks(collection, chunks, list(embeddings))
+            chroma_build = time.perf_counter() - start
+            chroma_rss = _rss_mb() - rss_before
+
+    if collection is not None and "chroma" in backends:
+        from src.data.db.chroma.schema import search_politician_data
+
+        def run_chroma(text, emb, politician):
+            documents = search_politician_data(collection, emb.tolist(), politician, k)
+            return _ids_from_documents(documents, id_by_text)
+
+        def run_chroma_unfiltered(text, emb, politician):
+            return collection.query(query_embeddings=[emb.tolist()], n_results=k)["ids"][0]
+
+        filtered_latency, found = _time_queries(run_chroma, queries, query_embeddings)
+        unfiltered_latency, unfiltered_found = _time_queries(run_chroma_unfiltered, queries, query_embeddings)
+        result["backends"]["chroma"] = {
+            "build_seconds": chroma_build,
+            "rss_delta_mb": chroma_rss,
+            "disk_mb": _disk_mb(chroma_path),
+            "filtered": filtered_latency,
+            "unfiltered": unfiltered_latency,
+            "recall_at_k": _recall_at_k(found, reference),
+            "unfiltered_recall_at_k": _recall_at_k(unfiltered_found, unfiltered_reference)
+        }
+
+    if collection is not None and "numpy" in backends:
+        from src.data.db.utils.vector_index import build_vector_index, NumpyVectorIndex
+
+        index_path = os.path.join(work_dir, "vector_index")
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        build_vector_index(collection, index_path)
+        index = NumpyVectorIndex(index_path)
+        numpy_build = time.perf_counter() - start
+
+        def run_numpy(text, emb, politician):
+            return _ids_from_documents(index.query(emb, politician, k), id_by_text)
+
+        filtered_latency, found = _time_queries(run_numpy, queries, query_embeddings)
+        result["backends"]["numpy"] = {
+            "build_seconds": numpy_build,
+            "rss_delta_mb": _rss_mb() - rss_before,
+            "disk_mb": _disk_mb(index_path),
+            "filtered": filtered_latency,
+            "unfiltered": None,
+            "recall_at_k": _recall_at_k(found, reference)
+        }
+
+    if collection is not None and "hybrid" in backends:
+        from src.data.db.chroma.schema import search_politician_data
+        from src.data.db.utils.lexical_index import (
+            HYBRID_CANDIDATE_MULTIPLIER, LexicalIndex, build_lexical_index, fuse_results
+        )
+
+        lexical_path = os.path.join(work_dir, "lexical_index.sqlite")
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        build_lexical_index(collection, lexical_path)
+        lexical = LexicalIndex(lexical_path)
+        lexical_build = time.perf_counter() - start
+        candidates = k * HYBRID_CANDIDATE_MULTIPLIER
+
+        def run_hybrid(text, emb, politician):
+            exact_hits = lexical.exact_match(text, politician, k)
+            if exact_hits:
+                return _ids_from_documents(exact_hits, id_by_text)
+            documents = fuse_results(
+                search_politician_data(collection, emb.tolist(), politician, candidates),
+                lexical.search(text, politician, candidates),
+                k
+            )
+            return _ids_from_documents(documents, id_by_text)
+
+        def run_lexical(text, emb, politician):
+            return _ids_from_documents(lexical.search(text, politician, k), id_by_text)
+
+        filtered_latency, found = _time_queries(run_hybrid, queries, query_embeddings)
+        lexical_latency, _ = _time_queries(run_lexical, queries, query_embeddings)
+        result["backends"]["hybrid"] = {
+            "build_seconds": lexical_build,
+            "rss_delta_mb": _rss_mb() - rss_before,
+            "disk_mb": _disk_mb(lexical_path),
+            "filtered": filtered_latency,
+            "lexical_only": lexical_latency,
+            "unfiltered": None,
+            "recall_at_k": _recall_at_k(found, reference)
+        }
+
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(
+    sizes: List[int] = DEFAULT_SIZES,
+    backends: List[str] = DEFAULT_BACKENDS,
+    encoder_name: str = "hashing",
+    num_queries: int = DEFAULT_NUM_QUERIES,
+    k: int = DEFAULT_TOP_K,
+    keep: bool = False
+) -> Dict[str, Any]:
+    """
+    Run the benchmark for each corpus size.
+
+    Returns:
+        Dict with run metadata and one result entry per size
+    """
+    encoder = load_encoder(encoder_name)
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "encoder": encoder_name,
+        "results": []
+    }
+
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix=f"rag-bench-{size}-")
+        try:
+            report["results"].append(benchmark_size(size, backends, encoder, num_queries, k, work_dir))
+        finally:
+            if keep:
+                logging.info(f"Kept benchmark indexes in {work_dir}")
+            else:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            gc.collect()
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark RAG retrieval backends on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes in chunks")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS, choices=DEFAULT_BACKENDS)
+    parser.add_argument("--encoder", default="hashing", help="'hashing' or a local sentence-transformers model path")
+    parser.add_argument("--queries", type=int, default=DEFAULT_NUM_QUERIES, help="Queries per backend")
+    parser.add_argument("--k", type=int, default=DEFAULT_TOP_K, help="Results per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated indexes on disk")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    report = run_benchmark(args.sizes, args.backends, args.encoder, args.queries, args.k, args.keep)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Caching Utilities for the AI Politician RAG System
+
+This module provides a bounded LRU cache with per-entry TTL and an optional
+SQLite-backed on-disk tier. Two process-wide instances are used by the RAG
+layer:
+
+- The embedding cache maps (encoder, normalized query text) to its embedding
+  vector, so repeated queries skip the encoder. The encoder id names the
+  model and backend, so switching either never serves the other's vectors.
+- The retrieval result cache maps (collection fingerprint, embedding hash,
+  politician name, number of results) to the documents returned by
+  ``query_politician_data``, so repeated queries also skip the vector search.
+  It is cleared whenever the collection's document count or version metadata
+  changes (the ingestion pipeline bumps the version on every write).
+
+Configuration (environment variables):
+    RAG_CACHE_ENABLED: Set to "0" to disable both caches
+    RAG_EMBEDDING_CACHE_SIZE: Max in-memory embedding entries (default 4096)
+    RAG_RESULT_CACHE_SIZE: Max in-memory retrieval result entries (default 2048)
+    RAG_CACHE_TTL: Entry lifetime in seconds (default 3600)
+    RAG_CACHE_DIR: Directory for the optional on-disk tier (disabled if unset)
+    RAG_CACHE_DISK_SIZE: Max entries kept in each on-disk tier (default 100000)
+"""
+
+import os
+import re
+import time
+import copy
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.data.db.utils.collection_version import get_collection_state
+
+# Constants
+ENABLE_RAG_CACHE = os.environ.get("RAG_CACHE_ENABLED", "1") != "0"
+EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "4096"))
+RESULT_CACHE_SIZE = int(os.environ.get("RAG_RESULT_CACHE_SIZE", "2048"))
+CACHE_TTL_SECONDS = float(os.environ.get("RAG_CACHE_TTL", "3600"))
+CACHE_DIR = os.environ.get("RAG_CACHE_DIR")
+CACHE_DISK_SIZE = int(os.environ.get("RAG_CACHE_DISK_SIZE", "100000"))
+
+# Minimum seconds between collection fingerprint checks for the result cache
+FINGERPRINT_CHECK_INTERVAL = float(os.environ.get("RAG_CACHE_FINGERPRINT_INTERVAL", "10"))
+
+_MISSING = object()
+
+
+class _DiskTier:
+    """
+    SQLite-backed key/value store used as the second tier of a cache.
+
+    The row count is tracked in memory so writes only trim once the tier grows
+    past ``max_entries``. Each trim removes the oldest tenth of the entries,
+    so trimming runs once every ``max_entries // 10`` writes rather than on
+    every write.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL, stored_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+        self._conn.commit()
+        self._rows = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return _MISSING, 0.0
+        if row[1] < time.time():
+            self.delete(key)
+            return _MISSING, 0.0
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, blob, expires_at, time.time())
+            )
+            # Replacing a key also counts as a new row, so this may trim early
+            self._rows += 1
+            if self._rows > self.max_entries:
+                self._trim()
+            self._conn.commit()
+
+    def _trim(self):
+        """Drop the oldest entries, leaving a tenth of the bound free. Caller holds the lock."""
+        keep = self.max_entries - self.max_entries // 10
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (keep,)
+        )
+        self._rows = self._count()
+
+    def delete(self, key: str):
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+            self._rows -= deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._rows = 0
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    The in-memory tier holds at most ``max_entries`` items and evicts the least
+    recently used one when full. If ``disk_path`` is given, entries are also
+    written to an SQLite file and misses in memory fall back to it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = CACHE_DISK_SIZE
+    ):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+        self._disk = None
+        if disk_path:
+            try:
+                os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+                self._disk = _DiskTier(disk_path, max_disk_entries)
+            except Exception as e:
+                logging.warning(f"On-disk tier for cache '{name}' unavailable: {str(e)}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` if it is missing or expired."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+        if self._disk is not None:
+            value, expires_at = self._disk.get(self._disk_key(key))
+            if value is not _MISSING:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._store(key, value, expires_at)
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value in memory and, if enabled, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._store(key, value, expires_at)
+
+        if self._disk is not None:
+            try:
+                self._disk.set(self._disk_key(key), value, expires_at)
+            except Exception as e:
+                logging.warning(f"Failed to write cache '{self.name}' entry to disk: {str(e)}")
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+        if self._disk is not None:
+            self._disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, the hit rate and the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["disk_enabled"] = self._disk is not None
+        return stats
+
+    def _store(self, key: Hashable, value: Any, expires_at: float):
+        """Insert an entry and evict the LRU item if needed. Caller holds the lock."""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+class RetrievalResultCache(LRUTTLCache):
+    """
+    LRU+TTL cache for retrieval results that tracks the collection's state.
+
+    The cache remembers a fingerprint of each collection (document count plus
+    any ``version`` in its metadata) and clears itself when it changes.
+    """
+
+    def __init__(self, *args, fingerprint_interval: float = FINGERPRINT_CHECK_INTERVAL, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fingerprint_interval = fingerprint_interval
+        self._fingerprints: Dict[str, Tuple[Any, float]] = {}
+        self._fingerprints_lock = threading.Lock()
+
+    def check_collection(self, collection: Any) -> Any:
+        """
+        Return the collection's fingerprint, clearing cached results if it changed.
+
+        The fingerprint is also part of every result key, so entries written to
+        the on-disk tier by an older version of the collection are never served.
+        """
+        name = getattr(collection, "name", "default")
+        now = time.monotonic()
+
+        with self._fingerprints_lock:
+            previous = self._fingerprints.get(name)
+        if previous is not None and now - previous[1] < self.fingerprint_interval:
+            return previous[0]
+
+        try:
+            fingerprint = (name, *get_collection_state(collection))
+        except Exception as e:
+            logging.warning(f"Could not fingerprint collection '{name}': {str(e)}")
+            return previous[0] if previous is not None else None
+
+        with self._fingerprints_lock:
+            # Another thread may have recorded the change since the read above
+            current = self._fingerprints.get(name)
+            changed = current is not None and current[0] != fingerprint
+            self._fingerprints[name] = (fingerprint, now)
+        if changed:
+            logging.info(f"Collection '{name}' changed, clearing retrieval result cache")
+            self.clear()
+        return fingerprint
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for use as a cache key.
+
+    all-MiniLM-L6-v2 uses an uncased tokenizer, so lowercasing and collapsing
+    whitespace does not change the resulting embedding.
+    """
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def embedding_hash(embedding: List[float]) -> str:
+    """Return a stable hash of an embedding vector."""
+    return hashlib.sha1(array("f", embedding).tobytes()).hexdigest()
+
+
+def _disk_path(name: str) -> Optional[str]:
+    return os.path.join(CACHE_DIR, f"{name}.sqlite") if CACHE_DIR else None
+
+
+# Process-wide caches used by the RAG layer
+_embedding_cache = LRUTTLCache(
+    "query_embeddings", EMBEDDING_CACHE_SIZE, disk_path=_disk_path("query_embeddings")
+) if ENABLE_RAG_CACHE else None
+_result_cache = RetrievalResultCache(
+    "retrieval_results", RESULT_CACHE_SIZE, disk_path=_disk_path("retrieval_results")
+) if ENABLE_RAG_CACHE else None
+
+
+def get_embedding_cache() -> Optional[LRUTTLCache]:
+    """Get the query embedding cache, or None if caching is disabled."""
+    return _embedding_cache
+
+
+def get_result_cache() -> Optional[RetrievalResultCache]:
+    """Get the retrieval result cache, or None if caching is disabled."""
+    return _result_cache
+
+
+def copy_results(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy cached documents so callers cannot mutate the cached entry."""
+    return copy.deepcopy(documents)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss metrics for both RAG cache levels."""
+    return {
+        "query_embeddings": _embedding_cache.get_stats() if _embedding_cache else None,
+        "retrieval_results": _result_cache.get_stats() if _result_cache else None
+    }
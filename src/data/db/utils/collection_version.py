@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Collection Versioning for the AI Politician RAG System
+
+Re-embedding changed chunks in place leaves a collection's ``count()``
+unchanged, so the document count alone cannot tell derived data (the
+retrieval result cache, the vector index and the lexical index) that the
+collection changed. Every write made by the ingestion pipeline therefore
+bumps an integer ``version`` in the collection metadata, and each of those
+staleness checks compares (count, version) instead.
+"""
+
+import logging
+from typing import Any, Dict, Tuple
+
+VERSION_KEY = "version"
+
+
+def _current_metadata(collection: Any) -> Dict[str, Any]:
+    """
+    Return the collection's metadata as stored, not as cached on the handle.
+
+    The metadata is re-read through the collection's client when possible,
+    so long-lived pooled handles see writes made by other processes.
+    """
+    metadata = getattr(collection, "metadata", None) or {}
+    client = getattr(collection, "_client", None)
+    if client is not None:
+        try:
+            metadata = client.get_collection(name=collection.name).metadata or {}
+        except Exception as e:
+            logging.debug(f"Could not refresh metadata of collection '{collection.name}': {str(e)}")
+    return metadata
+
+
+def _version_of(metadata: Dict[str, Any]) -> int:
+    try:
+        return int(metadata.get(VERSION_KEY, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_collection_version(collection: Any) -> int:
+    """Read the collection's current version (0 if it has never been bumped)."""
+    return _version_of(_current_metadata(collection))
+
+
+def get_collection_state(collection: Any) -> Tuple[int, int]:
+    """Return (document count, version) for staleness checks."""
+    return collection.count(), get_collection_version(collection)
+
+
+def bump_collection_version(collection: Any) -> int:
+    """
+    Record a write by incrementing the collection's ``version`` metadata.
+
+    The metadata is re-read first, so metadata changed by another process
+    since this handle was opened is not overwritten with a stale copy.
+
+    Returns:
+        The new version
+    """
+    current = _current_metadata(collection)
+    version = _version_of(current) + 1
+
+    # ChromaDB rejects changes to the hnsw:* settings after creation, so only
+    # the remaining metadata is written back
+    metadata = {key: value for key, value in current.items() if not key.startswith("hnsw:")}
+    metadata[VERSION_KEY] = version
+    collection.modify(metadata=metadata)
+    return version
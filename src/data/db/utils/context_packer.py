@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Token-Budgeted Context Packing for the AI Politician RAG System
+
+Retrieved passages are prepended to the Mistral prompt, so every token spent
+on them adds to prefill time. ``pack_context`` formats retrieval results the
+same way ``integrate_with_chat`` always has, but:
+
+- drops passages that are near-duplicates of a higher-ranked passage,
+- stops adding passages once the token budget is reached, trimming the last
+  one at a sentence boundary rather than mid-sentence,
+- counts tokens with the response model's tokenizer, shared through
+  ``set_tokenizer_provider`` by the response agent (falling back to loading
+  the same slow tokenizer, then to a character estimate), and
+- reports how many tokens were saved compared with the unpacked context.
+
+Configuration (environment variables):
+    RAG_CONTEXT_PACKING: Set to "0" to append passages verbatim
+    RAG_CONTEXT_TOKEN_BUDGET: Tokens allowed for chat context (default 512)
+    RAG_DEBATE_CONTEXT_TOKEN_BUDGET: Tokens allowed for debate knowledge (default 256)
+    RAG_DUPLICATE_THRESHOLD: Word-shingle overlap treated as a duplicate (default 0.8)
+    RAG_PACKER_TOKENIZER: Tokenizer loaded for counting when no provider is set (default: the Mistral response model)
+"""
+
+import os
+import re
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Constants
+ENABLE_CONTEXT_PACKING = os.environ.get("RAG_CONTEXT_PACKING", "1") != "0"
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", "512"))
+DEBATE_CONTEXT_TOKEN_BUDGET = int(os.environ.get("RAG_DEBATE_CONTEXT_TOKEN_BUDGET", "256"))
+DUPLICATE_THRESHOLD = float(os.environ.get("RAG_DUPLICATE_THRESHOLD", "0.8"))
+PACKER_TOKENIZER_ID = os.environ.get("RAG_PACKER_TOKENIZER", "mistralai/Mistral-7B-Instruct-v0.2")
+SHINGLE_SIZE = 3
+CHARS_PER_TOKEN = 4  # Rough estimate used when the tokenizer is unavailable
+
+CONTEXT_HEADER = "Here is some relevant factual information to help with your response:\n\n"
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Lazily loaded tokenizer and running totals
+_tokenizer = None
+_tokenizer_provider = None
+_tokenizer_failed = False
+_tokenizer_lock = threading.Lock()
+_totals = {"requests": 0, "original_tokens": 0, "packed_tokens": 0, "saved_tokens": 0}
+_totals_lock = threading.Lock()
+
+
+def set_tokenizer_provider(provider: Callable[[], Any]):
+    """Count tokens with the tokenizer returned by ``provider`` instead of loading one."""
+    global _tokenizer, _tokenizer_provider, _tokenizer_failed
+
+    with _tokenizer_lock:
+        _tokenizer_provider = provider
+        _tokenizer = None
+        _tokenizer_failed = False
+
+
+def _get_tokenizer() -> Optional[Any]:
+    """Get the response model's tokenizer once; None if it cannot be loaded."""
+    global _tokenizer, _tokenizer_failed
+
+    with _tokenizer_lock:
+        if _tokenizer is None and not _tokenizer_failed:
+            try:
+                if _tokenizer_provider is not None:
+                    _tokenizer = _tokenizer_provider()
+                else:
+                    # Same slow SentencePiece tokenizer the response model uses
+                    from transformers import AutoTokenizer
+                    _tokenizer = AutoTokenizer.from_pretrained(PACKER_TOKENIZER_ID, use_fast=False)
+                if _tokenizer is None:
+                    raise RuntimeError("tokenizer provider returned no tokenizer")
+            except Exception as e:
+                logging.warning(f"Context packer tokenizer unavailable, estimating tokens from length: {str(e)}")
+                _tokenizer_failed = True
+        return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens as the response model would see them."""
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _is_near_duplicate(shingles: Set[Tuple[str, ...]], kept: List[Set[Tuple[str, ...]]], threshold: float) -> bool:
+    """A passage is a duplicate if most of its shingles appear in an already kept passage."""
+    for other in kept:
+        overlap = len(shingles & other) / max(1, min(len(shingles), len(other)))
+        if overlap >= threshold:
+            return True
+    return False
+
+
+def format_passage(index: int, text: str, metadata: Dict[str, Any]) -> str:
+    """Format one retrieved passage with its source and type lines."""
+    source = metadata.get("source", "Unknown source")
+    content_type = metadata.get("content_type", "")
+
+    passage = f"{index}. {text}\n"
+    if source:
+        passage += f"   Source: {source}\n"
+    if content_type:
+        passage += f"   Type: {content_type}\n"
+    return passage + "\n"
+
+
+def format_context(documents: List[Dict[str, Any]]) -> str:
+    """Format every passage verbatim (the unpacked context)."""
+    if not documents:
+        return ""
+    return CONTEXT_HEADER + "".join(
+        format_passage(i, doc["text"], doc.get("metadata") or {}) for i, doc in enumerate(documents, 1)
+    )
+
+
+def _trim_to_budget(text: str, metadata: Dict[str, Any], index: int, budget: int) -> Optional[str]:
+    """
+    Keep as many leading sentences as fit in ``budget`` tokens, or None if not even one does.
+
+    The token count only grows as sentences are added, so the cut point is
+    binary-searched with O(log n) tokenizations rather than one per sentence.
+    """
+    sentences = _SENTENCE_BOUNDARY.split(text.strip())
+    fits, too_many = 0, len(sentences) + 1
+    while too_many - fits > 1:
+        middle = (fits + too_many) // 2
+        if count_tokens(format_passage(index, " ".join(sentences[:middle]), metadata)) <= budget:
+            fits = middle
+        else:
+            too_many = middle
+    return " ".join(sentences[:fits]) if fits else None
+
+
+def pack_context(
+    documents: List[Dict[str, Any]],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Fit retrieved passages into a token budget.
+
+    Passages are taken in rank order. Near-duplicates of a passage already
+    kept are skipped, and the first passage that does not fit is trimmed at a
+    sentence boundary, after which packing stops.
+
+    Args:
+        documents: Retrieval results (dicts with text and metadata), best first
+        token_budget: Maximum tokens for the whole context block
+        duplicate_threshold: Shingle overlap at which a passage counts as a duplicate
+
+    Returns:
+        Tuple of (context string, stats with original/packed/saved token counts)
+    """
+    stats = {
+        "original_tokens": count_tokens(format_context(documents)),
+        "packed_tokens": 0,
+        "saved_tokens": 0,
+        "passages": 0,
+        "duplicates_dropped": 0,
+        "trimmed": 0,
+        "over_budget_dropped": 0
+    }
+    if not documents:
+        return "", stats
+
+    remaining = token_budget - count_tokens(CONTEXT_HEADER)
+    passages = []
+    kept_shingles: List[Set[Tuple[str, ...]]] = []
+
+    for position, doc in enumerate(documents):
+        text = doc["text"]
+        metadata = doc.get("metadata") or {}
+
+        shingles = _shingles(text)
+        if _is_near_duplicate(shingles, kept_shingles, duplicate_threshold):
+            stats["duplicates_dropped"] += 1
+            continue
+
+        index = len(passages) + 1
+        passage = format_passage(index, text, metadata)
+        tokens = count_tokens(passage)
+
+        if tokens > remaining:
+            trimmed = _trim_to_budget(text, metadata, index, remaining)
+            if trimmed:
+                passages.append(format_passage(index, trimmed, metadata))
+                stats["trimmed"] += 1
+            stats["over_budget_dropped"] = len(documents) - position - (1 if trimmed else 0)
+            break
+
+        passages.append(passage)
+        kept_shingles.append(shingles)
+        remaining -= tokens
+
+    context = CONTEXT_HEADER + "".join(passages) if passages else ""
+    stats["passages"] = len(passages)
+    stats["packed_tokens"] = count_tokens(context)
+    stats["saved_tokens"] = max(0, stats["original_tokens"] - stats["packed_tokens"])
+
+    with _totals_lock:
+        _totals["requests"] += 1
+        _totals["original_tokens"] += stats["original_tokens"]
+        _totals["packed_tokens"] += stats["packed_tokens"]
+        _totals["saved_tokens"] += stats["saved_tokens"]
+
+    logging.info(
+        f"Packed RAG context: {stats['packed_tokens']}/{stats['original_tokens']} tokens "
+        f"({stats['saved_tokens']} saved, {stats['duplicates_dropped']} duplicates dropped, "
+        f"{stats['trimmed']} trimmed)"
+    )
+    return context, stats
+
+
+def get_packer_stats() -> Dict[str, int]:
+    """Running token totals across all packed requests in this process."""
+    with _totals_lock:
+        return dict(_totals)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+On-Disk Embedding Store for the AI Politician RAG System
+
+This module persists chunk embeddings keyed by (encoder, content hash) in an
+SQLite file, where the encoder is the embedding model plus its backend (see
+``get_encoder_id``). Ingestion and incremental re-indexing consult it before
+running the encoder, so rebuilding the collection with an unchanged encoder
+only costs disk I/O.
+"""
+
+import os
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Constants
+EMBEDDING_STORE_FILENAME = "embedding_cache.sqlite"
+_LOOKUP_BATCH_SIZE = 500  # Stay well under SQLite's bound-parameter limit
+
+
+def content_hash(text: str) -> str:
+    """Return the content hash stored in each chunk's metadata."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContentEmbeddingStore:
+    """SQLite-backed cache of embeddings keyed by model name and content hash."""
+
+    def __init__(self, path: str, model_name: str):
+        if not HAS_NUMPY:
+            raise RuntimeError("NumPy is required for the embedding store")
+
+        self.path = path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, content_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, content_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Any]:
+        """Return the stored embeddings for whichever hashes are present."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(hashes), _LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings WHERE model = ? AND content_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for chunk_hash, blob in rows:
+                    found[chunk_hash] = np.frombuffer(blob, dtype=np.float32)
+
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+
+        return found
+
+    def put_many(self, hashes: List[str], embeddings: Any):
+        """Store embeddings for the given hashes."""
+        rows = [
+            (self.model_name, chunk_hash, np.asarray(embedding, dtype=np.float32).tobytes())
+            for chunk_hash, embedding in zip(hashes, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, content_hash, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+            ).fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "stored": stored, "model": self.model_name}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_store(path: str) -> Any:
+    """Open the embedding store for the current encoder, or None if unavailable."""
+    from src.data.db.utils.rag_utils import get_encoder_id
+
+    try:
+        return ContentEmbeddingStore(path, get_encoder_id())
+    except Exception as e:
+        logging.warning(f"Embedding store at {path} unavailable: {str(e)}")
+        return None
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingestion Pipeline for the AI Politician RAG System
+
+This module streams source documents into the ``politicians`` ChromaDB
+collection. Documents are read lazily from JSONL or CSV files, split into
+overlapping chunks, embedded in large batches (using every CPU core through
+a sentence-transformers multi-process pool when no GPU is present) and
+upserted in fixed-size batches.
+
+Progress is written to a checkpoint file after every embedding batch, so an
+interrupted run resumes from the last completed document instead of starting
+over. Chunk ids are deterministic, which makes re-processing the tail of an
+interrupted batch harmless.
+
+Every chunk carries a ``content_hash`` and ``embedding_model`` in its metadata.
+``update_index`` uses them to re-embed only new or changed chunks and to delete
+chunks that no longer exist in the source, and both entry points can reuse
+embeddings from an on-disk ``ContentEmbeddingStore``. Every write bumps the
+collection's ``version`` metadata so caches and derived indexes notice it.
+
+Source Record Format:
+    Each JSONL line or CSV row needs a ``text`` (or ``content``) field and a
+    ``politician_name``. Optional fields: ``id``, ``source``, ``content_type``,
+    ``topic``, ``date``. Any other scalar fields are kept as metadata.
+
+Usage:
+    python scripts/data/initialize_database.py --source path/to/documents/
+    python scripts/data/initialize_database.py --source path/to/documents/ --incremental
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.data.db.utils.embedding_store import content_hash
+from src.data.db.utils.collection_version import bump_collection_version, get_collection_state
+
+# Constants
+SUPPORTED_EXTENSIONS = (".jsonl", ".csv")
+DEFAULT_CHUNK_SIZE = 1000  # Characters per chunk
+DEFAULT_CHUNK_OVERLAP = 200  # Characters shared between neighbouring chunks
+DEFAULT_EMBED_BATCH_SIZE = 4096  # Chunks embedded (and checkpointed) together
+DEFAULT_UPSERT_BATCH_SIZE = 1000  # Chunks per collection.upsert call
+DEFAULT_ENCODE_BATCH_SIZE = 128  # Chunks per encoder forward pass
+DEFAULT_DELETE_BATCH_SIZE = 1000  # Ids per collection.delete call
+DEFAULT_LOOKUP_BATCH_SIZE = 5000  # Chunk ids per collection.get call when diffing
+CHECKPOINT_FILENAME = "ingestion_checkpoint.json"
+
+# Metadata fields that are not copied from source records
+_RESERVED_FIELDS = {"id", "text", "content"}
+
+
+def iter_source_files(source: str) -> List[str]:
+    """List the JSONL/CSV files under a path in a stable order."""
+    path = Path(source)
+    if path.is_file():
+        return [str(path)]
+    return sorted(
+        str(p) for p in path.rglob("*") if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def iter_records(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily yield records from a JSONL or CSV file."""
+    if file_path.lower().endswith(".csv"):
+        csv.field_size_limit(sys.maxsize)
+        with open(file_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield row
+    else:
+        with open(file_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logging.warning(f"Skipping malformed line {line_number} in {file_path}: {str(e)}")
+
+
+def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring sentence and word boundaries.
+
+    Args:
+        text: The text to split
+        chunk_size: Maximum characters per chunk
+        overlap: Characters repeated at the start of the next chunk
+
+    Returns:
+        List of chunk strings
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Back off to the last sentence end, or failing that the last space
+            boundary = max(text.rfind(". ", start, end), text.rfind("? ", start, end), text.rfind("! ", start, end))
+            if boundary <= start + chunk_size // 2:
+                boundary = text.rfind(" ", start, end)
+            if boundary > start:
+                end = boundary + 1
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+
+    return [chunk for chunk in chunks if chunk]
+
+
+def _clean_metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the scalar fields ChromaDB accepts as metadata."""
+    return {
+        key: value for key, value in record.items()
+        if key not in _RESERVED_FIELDS and isinstance(value, (str, int, float, bool)) and value != ""
+    }
+
+
+def record_to_chunks(
+    record: Dict[str, Any],
+    default_id: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_CHUNK_OVERLAP
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Turn one source record into (chunk id, chunk text, metadata) tuples.
+
+    Returns an empty list for records without text or a politician name.
+    """
+    text = record.get("text") or record.get("content") or ""
+    if not text or not record.get("politician_name"):
+        return []
+
+    from src.data.db.utils.rag_utils import EMBEDDING_MODEL_NAME
+
+    doc_id = str(record.get("id") or default_id)
+    metadata = _clean_metadata(record)
+    metadata["document_id"] = doc_id
+    metadata["embedding_model"] = EMBEDDING_MODEL_NAME
+
+    chunks = chunk_text(text, chunk_size, overlap)
+    return [
+        (
+            f"{doc_id}#{i}",
+            chunk,
+            {**metadata, "chunk_index": i, "chunk_count": len(chunks), "content_hash": content_hash(chunk)}
+        )
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+class IngestionCheckpoint:
+    """JSON checkpoint recording how far ingestion of a source has progressed."""
+
+    def __init__(self, path: str, source: str, resume: bool = True):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.file_index = 0
+        self.record_offset = 0
+        self.documents = 0
+        self.chunks = 0
+
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get("source") == self.source:
+                self.file_index = state.get("file_index", 0)
+                self.record_offset = state.get("record_offset", 0)
+                self.documents = state.get("documents", 0)
+                self.chunks = state.get("chunks", 0)
+            else:
+                logging.warning(f"Checkpoint {path} belongs to {state.get('source')}; starting fresh")
+
+    def save(self, file_index: int, record_offset: int, documents: int, chunks: int):
+        self.file_index, self.record_offset = file_index, record_offset
+        self.documents, self.chunks = documents, chunks
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "source": self.source,
+                "file_index": file_index,
+                "record_offset": record_offset,
+                "documents": documents,
+                "chunks": chunks,
+                "updated_at": time.time()
+            }, f)
+        # Atomic replace so a crash never leaves a half-written checkpoint
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ParallelEncoder:
+    """
+    Embeds chunk batches with the shared SentenceTransformer model.
+
+    On CPU with more than one worker the batches are spread across a
+    multi-process pool so every core is used; on GPU the model encodes
+    directly with a large batch size.
+    """
+
+    def __init__(self, workers: Optional[int] = None, encode_batch_size: int = DEFAULT_ENCODE_BATCH_SIZE):
+        from src.data.db.utils.rag_utils import get_embedding_model
+
+        self.model = get_embedding_model()
+        if self.model is None:
+            raise RuntimeError("Embedding model unavailable; cannot ingest documents")
+
+        self.encode_batch_size = encode_batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+        # The ONNX backend already uses every core inside one session
+        on_cpu = getattr(getattr(self.model, "device", None), "type", "cpu") == "cpu"
+        if on_cpu and self.workers > 1 and hasattr(self.model, "start_multi_process_pool"):
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+
+    def encode(self, texts: List[str]) -> Any:
+        if self._pool is not None:
+            return self.model.encode_multi_process(texts, self._pool, batch_size=self.encode_batch_size)
+        return self.model.encode(
+            texts, batch_size=self.encode_batch_size, convert_to_numpy=True, show_progress_bar=False
+        )
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+
+def embed_chunks(
+    chunks: List[Tuple[str, str, Dict[str, Any]]],
+    get_encoder: Callable[[], ParallelEncoder],
+    embedding_store: Optional[Any] = None
+) -> List[Any]:
+    """
+    Embed chunks, reusing stored embeddings by content hash where possible.
+
+    The encoder is only requested (and therefore only loaded) when at least
+    one chunk is missing from the store.
+    """
+    vectors: List[Any] = [None] * len(chunks)
+    hashes = [metadata["content_hash"] for _, _, metadata in chunks]
+
+    if embedding_store is not None:
+        stored = embedding_store.get_many(hashes)
+        for i, chunk_hash in enumerate(hashes):
+            vectors[i] = stored.get(chunk_hash)
+
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        encoded = get_encoder().encode([chunks[i][1] for i in missing])
+        for j, i in enumerate(missing):
+            vectors[i] = encoded[j]
+        if embedding_store is not None:
+            embedding_store.put_many([hashes[i] for i in missing], encoded)
+
+    return vectors
+
+
+def upsert_chunks(
+    collection: Any,
+    chunks: List[Tuple[str, str, Dict[str, Any]]],
+    vectors: List[Any],
+    upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+    lexical_index: Optional[Any] = None
+):
+    """
+    Upsert embedded chunks in fixed-size slices, mirroring them into the lexical index.
+
+    The collection version is bumped afterwards, since updating chunks in
+    place does not change the collection's count.
+    """
+    for start in range(0, len(chunks), upsert_batch_size):
+        batch = chunks[start:start + upsert_batch_size]
+        ids = [chunk_id for chunk_id, _, _ in batch]
+        documents = [text for _, text, _ in batch]
+        metadatas = [metadata for _, _, metadata in batch]
+        collection.upsert(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=[vector.tolist() for vector in vectors[start:start + upsert_batch_size]]
+        )
+        if lexical_index is not None:
+            lexical_index.upsert(ids, documents, metadatas)
+
+    if chunks:
+        bump_collection_version(collection)
+
+
+class _LazyEncoder:
+    """Creates the ParallelEncoder on first use, so fully cached runs never load the model."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self.encoder = None
+
+    def __call__(self) -> ParallelEncoder:
+        if self.encoder is None:
+            self.encoder = ParallelEncoder(workers=self.workers)
+        return self.encoder
+
+    def close(self):
+        if self.encoder is not None:
+            self.encoder.close()
+
+
+def ingest_documents(
+    collection: Any,
+    source: str,
+    checkpoint_path: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    resume: bool = True,
+    embedding_store: Optional[Any] = None,
+    lexical_index: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Stream documents from ``source`` into a ChromaDB collection.
+
+    Args:
+        collection: Target ChromaDB collection
+        source: A JSONL/CSV file or a directory containing them
+        checkpoint_path: Where to record progress (defaults to the source directory)
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between neighbouring chunks
+        embed_batch_size: Chunks embedded together before upserting and checkpointing
+        upsert_batch_size: Chunks per ``collection.upsert`` call
+        workers: Encoder processes on CPU (defaults to all cores)
+        resume: Continue from an existing checkpoint instead of starting over
+        embedding_store: Optional ContentEmbeddingStore to reuse embeddings from
+        lexical_index: Optional LexicalIndex kept in step with the collection
+
+    Returns:
+        Dict with document/chunk totals, elapsed time and throughput
+    """
+    files = iter_source_files(source)
+    if not files:
+        raise ValueError(f"No {'/'.join(SUPPORTED_EXTENSIONS)} files found at {source}")
+
+    if checkpoint_path is None:
+        base_dir = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+        checkpoint_path = os.path.join(base_dir, CHECKPOINT_FILENAME)
+
+    checkpoint = IngestionCheckpoint(checkpoint_path, source, resume=resume)
+    if checkpoint.file_index or checkpoint.record_offset:
+        logging.info(
+            f"Resuming ingestion at file {checkpoint.file_index + 1}/{len(files)}, "
+            f"record {checkpoint.record_offset} ({checkpoint.documents} documents already ingested)"
+        )
+
+    encoder = _LazyEncoder(workers=workers)
+    documents_done, chunks_done = checkpoint.documents, checkpoint.chunks
+    session_documents = session_chunks = 0
+    started = time.monotonic()
+
+    def flush(pending: List[Tuple[str, str, Dict[str, Any]]]):
+        """Embed a pending batch and upsert it in fixed-size slices."""
+        nonlocal chunks_done, session_chunks
+        vectors = embed_chunks(pending, encoder, embedding_store)
+        upsert_chunks(collection, pending, vectors, upsert_batch_size, lexical_index)
+        chunks_done += len(pending)
+        session_chunks += len(pending)
+
+    def report():
+        elapsed = max(time.monotonic() - started, 1e-9)
+        logging.info(
+            f"Ingested {documents_done} documents / {chunks_done} chunks "
+            f"({session_documents / elapsed:.1f} docs/s, {session_chunks / elapsed:.1f} embeddings/s)"
+        )
+
+    try:
+        for file_index in range(checkpoint.file_index, len(files)):
+            file_path = files[file_index]
+            skip = checkpoint.record_offset if file_index == checkpoint.file_index else 0
+            pending: List[Tuple[str, str, Dict[str, Any]]] = []
+            record_offset = skip
+
+            for record_number, record in enumerate(iter_records(file_path)):
+                if record_number < skip:
+                    continue
+
+                pending.extend(record_to_chunks(
+                    record,
+                    default_id=f"{Path(file_path).name}:{record_number}",
+                    chunk_size=chunk_size,
+                    overlap=chunk_overlap
+                ))
+                record_offset = record_number + 1
+                documents_done += 1
+                session_documents += 1
+
+                if len(pending) >= embed_batch_size:
+                    flush(pending)
+                    pending = []
+                    checkpoint.save(file_index, record_offset, documents_done, chunks_done)
+                    report()
+
+            if pending:
+                flush(pending)
+            checkpoint.save(file_index + 1, 0, documents_done, chunks_done)
+            report()
+    finally:
+        encoder.close()
+
+    elapsed = time.monotonic() - started
+    checkpoint.clear()
+    if lexical_index is not None:
+        lexical_index.set_source_state(*get_collection_state(collection))
+
+    return {
+        "documents": documents_done,
+        "chunks": chunks_done,
+        "session_documents": session_documents,
+        "session_chunks": session_chunks,
+        "elapsed_seconds": elapsed,
+        "docs_per_second": session_documents / elapsed if elapsed else 0.0,
+        "embeddings_per_second": session_chunks / elapsed if elapsed else 0.0
+    }
+
+
+def _stored_state(
+    collection: Any,
+    ids: List[str],
+    page_size: int = DEFAULT_LOOKUP_BATCH_SIZE
+) -> Dict[str, Tuple[Any, Any]]:
+    """Read (content hash, embedding model) for those of ``ids`` already in the collection."""
+    state = {}
+    for start in range(0, len(ids), page_size):
+        page = collection.get(ids=ids[start:start + page_size], include=["metadatas"])
+        for chunk_id, metadata in zip(page.get("ids") or [], page.get("metadatas") or []):
+            metadata = metadata or {}
+            state[chunk_id] = (metadata.get("content_hash"), metadata.get("embedding_model"))
+    return state
+
+
+def _iter_collection_ids(collection: Any, page_size: int = DEFAULT_LOOKUP_BATCH_SIZE) -> Iterator[str]:
+    """Yield every chunk id in the collection, a page at a time and without metadata."""
+    total = collection.count()
+    offset = 0
+    while offset < total:
+        ids = collection.get(limit=page_size, offset=offset, include=[]).get("ids") or []
+        if not ids:
+            break
+        yield from ids
+        offset += len(ids)
+
+
+def update_index(
+    collection: Any,
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    embedding_store: Optional[Any] = None,
+    delete_missing: bool = True,
+    lexical_index: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Incrementally bring a collection in line with ``source``.
+
+    Chunks whose content hash and embedding model match what is already
+    stored are skipped; new or changed chunks are embedded and upserted; and,
+    if ``delete_missing`` is set, chunks that no longer appear in the source
+    are deleted. Because unchanged chunks cost nothing, re-running after an
+    interruption simply continues where it left off.
+
+    The stored state is looked up a batch of chunk ids at a time as the
+    source is read, so the collection's metadata is never held in memory as
+    a whole; only the ids seen in the source are kept, for the deletion pass.
+
+    Args:
+        collection: Target ChromaDB collection
+        source: A JSONL/CSV file or a directory containing them
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between neighbouring chunks
+        embed_batch_size: Changed chunks embedded together per batch
+        upsert_batch_size: Chunks per ``collection.upsert`` call
+        workers: Encoder processes on CPU (defaults to all cores)
+        embedding_store: Optional ContentEmbeddingStore to reuse embeddings from
+        delete_missing: Remove chunks that are no longer in the source
+        lexical_index: Optional LexicalIndex kept in step with the collection
+
+    Returns:
+        Dict with unchanged/added/updated/deleted counts and throughput
+    """
+    from src.data.db.utils.rag_utils import EMBEDDING_MODEL_NAME
+
+    files = iter_source_files(source)
+    if not files:
+        raise ValueError(f"No {'/'.join(SUPPORTED_EXTENSIONS)} files found at {source}")
+
+    seen = set()
+    stats = {"documents": 0, "unchanged": 0, "added": 0, "updated": 0, "deleted": 0}
+    encoder = _LazyEncoder(workers=workers)
+    started = time.monotonic()
+
+    def flush(pending: List[Tuple[str, str, Dict[str, Any]]]):
+        vectors = embed_chunks(pending, encoder, embedding_store)
+        upsert_chunks(collection, pending, vectors, upsert_batch_size, lexical_index)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        written = stats["added"] + stats["updated"]
+        logging.info(
+            f"Indexed {stats['documents']} documents: {written} chunks written, {stats['unchanged']} unchanged "
+            f"({stats['documents'] / elapsed:.1f} docs/s, {written / elapsed:.1f} embeddings/s)"
+        )
+
+    def changed(candidates: List[Tuple[str, str, Dict[str, Any]]]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        stored = _stored_state(collection, [chunk_id for chunk_id, _, _ in candidates])
+        result = []
+        for chunk in candidates:
+            chunk_id, _, metadata = chunk
+            previous = stored.get(chunk_id)
+            if previous == (metadata["content_hash"], EMBEDDING_MODEL_NAME):
+                stats["unchanged"] += 1
+                continue
+
+            stats["updated" if previous is not None else "added"] += 1
+            result.append(chunk)
+        return result
+
+    try:
+        candidates: List[Tuple[str, str, Dict[str, Any]]] = []
+        pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        for file_path in files:
+            for record_number, record in enumerate(iter_records(file_path)):
+                stats["documents"] += 1
+                for chunk in record_to_chunks(
+                    record,
+                    default_id=f"{Path(file_path).name}:{record_number}",
+                    chunk_size=chunk_size,
+                    overlap=chunk_overlap
+                ):
+                    seen.add(chunk[0])
+                    candidates.append(chunk)
+
+                if len(candidates) >= DEFAULT_LOOKUP_BATCH_SIZE:
+                    pending.extend(changed(candidates))
+                    candidates = []
+
+                if len(pending) >= embed_batch_size:
+                    flush(pending)
+                    pending = []
+
+        pending.extend(changed(candidates))
+        if pending:
+            flush(pending)
+    finally:
+        encoder.close()
+
+    if delete_missing:
+        # Collected before deleting, since deletes would shift the paging offsets
+        vanished = [chunk_id for chunk_id in _iter_collection_ids(collection) if chunk_id not in seen]
+        for start in range(0, len(vanished), DEFAULT_DELETE_BATCH_SIZE):
+            collection.delete(ids=vanished[start:start + DEFAULT_DELETE_BATCH_SIZE])
+            if lexical_index is not None:
+                lexical_index.delete(vanished[start:start + DEFAULT_DELETE_BATCH_SIZE])
+        stats["deleted"] = len(vanished)
+        if vanished:
+            bump_collection_version(collection)
+
+    if lexical_index is not None:
+        lexical_index.set_source_state(*get_collection_state(collection))
+
+    elapsed = time.monotonic() - started
+    stats["elapsed_seconds"] = elapsed
+    stats["embeddings_per_second"] = (stats["added"] + stats["updated"]) / elapsed if elapsed else 0.0
+    if embedding_store is not None:
+        stats["embedding_store"] = embedding_store.get_stats()
+    return stats
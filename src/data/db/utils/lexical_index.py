@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Lexical (BM25) Index for the AI Politician RAG System
+
+This module keeps an SQLite FTS5 index over the same chunks and metadata as
+the ``politicians`` ChromaDB collection. It serves three purposes:
+
+- A hybrid query mode that fuses BM25 and dense-vector scores, which is far
+  more precise for short keyword queries such as "border wall funding" or "IRA".
+- An exact-phrase short-circuit: when a short keyword query has enough exact
+  hits for the politician, those are returned without running the encoder or
+  the vector search at all.
+- A fallback that still returns results when the embedding model is unavailable.
+
+The index is maintained by the ingestion pipeline and can be rebuilt from the
+collection with ``scripts/data/build_lexical_index.py``. Like the vector index,
+it records the collection's document count and version and is ignored once
+either diverges.
+
+Configuration (environment variables):
+    RAG_HYBRID_RETRIEVAL: Set to "1" to enable hybrid retrieval
+    RAG_LEXICAL_INDEX_PATH: SQLite file (default /opt/chroma_db/lexical_index.sqlite)
+    RAG_HYBRID_ALPHA: Weight of the dense score in the fusion (default 0.5)
+    RAG_SHORT_QUERY_TERMS: Max terms for the exact-phrase short-circuit (default 4)
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.data.db.utils.collection_version import get_collection_state
+
+# Constants
+HYBRID_RETRIEVAL = os.environ.get("RAG_HYBRID_RETRIEVAL", "0") == "1"
+DEFAULT_LEXICAL_INDEX_PATH = os.environ.get("RAG_LEXICAL_INDEX_PATH", "/opt/chroma_db/lexical_index.sqlite")
+HYBRID_ALPHA = float(os.environ.get("RAG_HYBRID_ALPHA", "0.5"))
+SHORT_QUERY_MAX_TERMS = int(os.environ.get("RAG_SHORT_QUERY_TERMS", "4"))
+HYBRID_CANDIDATE_MULTIPLIER = 3  # Candidates fetched per side before fusion
+BUILD_BATCH_SIZE = 5000
+
+# Minimum seconds between checks that the index still matches the collection
+STALENESS_CHECK_INTERVAL = float(os.environ.get("RAG_LEXICAL_INDEX_CHECK_INTERVAL", "30"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "s", "that", "the", "their", "this", "to", "was", "what",
+    "when", "where", "which", "who", "why", "will", "with", "you", "your"
+}
+
+# Process-wide index handle
+_lexical_index = None
+_lexical_index_lock = threading.Lock()
+
+
+def query_terms(text: str) -> List[str]:
+    """Split a query into lowercase search terms, dropping stopwords."""
+    return [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS]
+
+
+def _or_query(terms: List[str]) -> str:
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+# Chunks live in an ordinary table keyed by chunk_id and politician, and the
+# FTS5 table indexes their text as external content keyed by the same rowid,
+# so upserts, deletes and the politician filter all go through B-tree indexes
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS documents ("
+    "rowid INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE, politician_name TEXT NOT NULL, "
+    "text TEXT NOT NULL, metadata TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS documents_politician ON documents (politician_name)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+    "text, content='documents', content_rowid='rowid', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS documents_insert AFTER INSERT ON documents BEGIN "
+    "INSERT INTO chunks (rowid, text) VALUES (new.rowid, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS documents_delete AFTER DELETE ON documents BEGIN "
+    "INSERT INTO chunks (chunks, rowid, text) VALUES ('delete', old.rowid, old.text); END",
+    "CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+
+class LexicalIndex:
+    """SQLite FTS5 index of collection chunks, filterable by politician."""
+
+    def __init__(self, path: str = DEFAULT_LEXICAL_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_checked = 0.0
+        self._is_current = True
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "chunks" in tables and "documents" not in tables:
+            # Indexes from before the documents table must be rebuilt from the collection
+            logging.warning(f"Lexical index at {path} uses an old layout; it is empty until rebuilt")
+            self.reset()
+        else:
+            self._create_schema()
+
+    def _create_schema(self):
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def reset(self):
+        """Drop every chunk and the recorded source state."""
+        with self._lock:
+            for name in ("documents_insert", "documents_delete"):
+                self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for name in ("chunks", "documents", "index_meta"):
+                self._conn.execute(f"DROP TABLE IF EXISTS {name}")
+            self._create_schema()
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Insert or replace chunks in the index."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM documents WHERE chunk_id = ?", [(chunk_id,) for chunk_id in ids])
+            self._conn.executemany(
+                "INSERT INTO documents (chunk_id, politician_name, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (chunk_id, (metadata or {}).get("politician_name", ""), text, json.dumps(metadata or {}))
+                    for chunk_id, text, metadata in zip(ids, documents, metadatas)
+                ]
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM documents WHERE chunk_id = ?", [(chunk_id,) for chunk_id in ids])
+            self._conn.commit()
+
+    def set_source_state(self, count: int, version: int):
+        """Record the collection size and version this index corresponds to."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+                [("source_count", str(count)), ("source_version", str(version))]
+            )
+            self._conn.commit()
+        self._last_checked = 0.0
+
+    def get_source_state(self) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT key, value FROM index_meta WHERE key IN ('source_count', 'source_version')"
+            ).fetchall())
+        if "source_count" not in rows:
+            return None
+        return int(rows["source_count"]), int(rows.get("source_version", 0))
+
+    def is_current(self, collection: Any) -> bool:
+        """Check that the collection has not changed since the index was last synced."""
+        now = time.monotonic()
+        if now - self._last_checked < STALENESS_CHECK_INTERVAL:
+            return self._is_current
+
+        try:
+            self._is_current = get_collection_state(collection) == self.get_source_state()
+        except Exception as e:
+            logging.warning(f"Could not verify lexical index against collection: {str(e)}")
+            self._is_current = False
+        self._last_checked = now
+
+        if not self._is_current:
+            logging.warning(f"Lexical index at {self.path} is stale; rebuild it to use hybrid retrieval")
+        return self._is_current
+
+    def _search(self, match: str, politician_name: str, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT documents.text, documents.metadata, bm25(chunks) AS rank "
+                "FROM chunks JOIN documents ON documents.rowid = chunks.rowid "
+                "WHERE chunks MATCH ? AND documents.politician_name = ? ORDER BY rank LIMIT ?",
+                (match, politician_name, limit)
+            ).fetchall()
+
+        # bm25() is negative with better matches more negative; flip it to a relevance
+        return [
+            {"text": text, "metadata": json.loads(metadata), "relevance": -rank}
+            for text, metadata, rank in rows
+        ]
+
+    def search(self, query_text: str, politician_name: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25 search for any of the query terms.
+
+        Scores are normalized to ``1 - relevance / best relevance`` so that,
+        like vector distances, lower is better.
+        """
+        terms = query_terms(query_text)
+        if not terms:
+            return []
+
+        hits = self._search(_or_query(terms), politician_name, num_results)
+        return _with_distance_scores(hits)
+
+    def exact_match(self, query_text: str, politician_name: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return exact-phrase hits for short keyword queries.
+
+        Only short queries are considered, and only when there are at least
+        ``num_results`` hits, so a non-empty result can safely replace the
+        dense search.
+        """
+        terms = query_terms(query_text)
+        if not terms or len(terms) > SHORT_QUERY_MAX_TERMS:
+            return []
+
+        phrase = '"' + " ".join(terms) + '"'
+        hits = self._search(phrase, politician_name, num_results)
+        if len(hits) < num_results:
+            return []
+        return _with_distance_scores(hits)
+
+
+def _with_distance_scores(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    best = max((hit["relevance"] for hit in hits), default=0.0) or 1.0
+    return [
+        {"text": hit["text"], "metadata": hit["metadata"], "score": 1.0 - hit["relevance"] / best}
+        for hit in hits
+    ]
+
+
+def fuse_results(
+    dense: List[Dict[str, Any]],
+    lexical: List[Dict[str, Any]],
+    num_results: int,
+    alpha: float = HYBRID_ALPHA
+) -> List[Dict[str, Any]]:
+    """
+    Combine dense and BM25 results with a weighted sum of normalized scores.
+
+    Both inputs use distance-style scores (lower is better). Each side is
+    turned into a similarity and scaled by its best value before weighting,
+    and the fused result is converted back to a distance.
+    """
+    def similarities(documents: List[Dict[str, Any]]) -> Dict[str, float]:
+        values = [
+            max(0.0, 1.0 - doc["score"]) if doc.get("score") is not None else 1.0 / (rank + 1)
+            for rank, doc in enumerate(documents)
+        ]
+        best = max(values, default=0.0) or 1.0
+        return {doc["text"]: value / best for doc, value in zip(documents, values)}
+
+    dense_scores = similarities(dense)
+    lexical_scores = similarities(lexical)
+
+    by_text = {doc["text"]: doc for doc in lexical}
+    by_text.update({doc["text"]: doc for doc in dense})
+
+    fused = []
+    for text, doc in by_text.items():
+        score = alpha * dense_scores.get(text, 0.0) + (1.0 - alpha) * lexical_scores.get(text, 0.0)
+        fused.append((score, {"text": doc["text"], "metadata": doc["metadata"], "score": 1.0 - score}))
+
+    fused.sort(key=lambda item: item[0], reverse=True)
+    return [doc for _, doc in fused[:num_results]]
+
+
+def build_lexical_index(
+    collection: Any,
+    path: str = DEFAULT_LEXICAL_INDEX_PATH,
+    batch_size: int = BUILD_BATCH_SIZE
+) -> int:
+    """
+    Rebuild the lexical index from every document in a collection.
+
+    Returns:
+        Number of chunks indexed
+    """
+    index = LexicalIndex(path)
+    source_state = get_collection_state(collection)
+    index.reset()
+
+    total = source_state[0]
+    offset = 0
+    while offset < total:
+        page = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        index.upsert(ids, page["documents"], page["metadatas"])
+        offset += len(ids)
+
+    index.set_source_state(*source_state)
+    logging.info(f"Indexed {offset} chunks into the lexical index at {path}")
+    return offset
+
+
+def open_lexical_index(path: str = DEFAULT_LEXICAL_INDEX_PATH) -> Optional[LexicalIndex]:
+    """Open (creating if needed) a lexical index for writing, or None on failure."""
+    try:
+        return LexicalIndex(path)
+    except Exception as e:
+        logging.warning(f"Lexical index at {path} unavailable: {str(e)}")
+        return None
+
+
+def get_lexical_index(collection: Any, path: str = DEFAULT_LEXICAL_INDEX_PATH) -> Optional[LexicalIndex]:
+    """
+    Get the process-wide lexical index if it exists and matches the collection.
+
+    Returns:
+        LexicalIndex or None if hybrid retrieval cannot be used
+    """
+    global _lexical_index
+
+    with _lexical_index_lock:
+        if _lexical_index is None or _lexical_index.path != path:
+            if not os.path.exists(path):
+                return None
+            try:
+                _lexical_index = LexicalIndex(path)
+            except Exception as e:
+                logging.error(f"Error opening lexical index: {str(e)}")
+                return None
+        index = _lexical_index
+
+    return index if index.is_current(collection) else None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Cross-request micro-batching for model inference.
+
+Concurrent requests each submit one item and get a future back. A single
+worker thread collects items until it has ``max_batch_size`` of them or the
+oldest has waited ``max_wait`` seconds, runs them through the model as one
+batch, and resolves each caller's future with its own result. Under load this
+turns many batch-of-one forward passes into a few full batches; with a single
+caller it adds at most ``max_wait`` of latency.
+
+Used for both query embeddings (rag_utils.py) and the sentiment classifier.
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MicroBatcher:
+    """Queue items from many threads and process them in batches on one worker."""
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+        name: str = "micro-batcher"
+    ):
+        """
+        Args:
+            process_batch: Maps a list of items to a list of results in the same order
+            max_batch_size: Largest batch passed to ``process_batch``
+            max_wait: Seconds to wait for a batch to fill after its first item arrives
+            name: Name of the worker thread
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._stats = {"items": 0, "batches": 0, "max_batch": 0}
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item; the future resolves to its result."""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and wait for its result."""
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Items already queued are taken even once the wait is over
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            # Skip items whose callers already gave up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"Batch of {len(items)} items produced {len(results)} results")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+
+            with self._stats_lock:
+                self._stats["items"] += len(items)
+                self._stats["batches"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(items))
+
+    def stats(self) -> Dict[str, float]:
+        """Items processed, batches run and the average batch size."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["mean_batch"] = stats["items"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
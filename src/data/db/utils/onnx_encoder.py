@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime Embedding Backend for the AI Politician RAG System
+
+This module exports the sentence-transformers MiniLM encoder to ONNX,
+optionally applies dynamic int8 quantization, and runs it with onnxruntime
+on CPU. ``OnnxSentenceEncoder.encode`` mirrors the subset of
+``SentenceTransformer.encode`` used by the RAG layer (mean pooling followed
+by L2 normalization, as in all-MiniLM-L6-v2), so it can be returned from
+``get_embedding_model`` as a drop-in replacement.
+
+Configuration (environment variables):
+    RAG_EMBEDDING_BACKEND: "torch" (default) or "onnx"
+    RAG_ONNX_MODEL_DIR: Where the exported model lives (default /opt/chroma_db/onnx_encoder)
+    RAG_ONNX_QUANTIZE: Set to "0" to run the fp32 export instead of int8
+    RAG_ONNX_THREADS: Intra-op threads for the session (default: all cores)
+
+Requires ``onnxruntime`` (and ``onnx`` plus ``torch`` for the export step).
+"""
+
+import os
+import logging
+from typing import Any, List, Optional, Union
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+# Constants
+ONNX_MODEL_DIR = os.environ.get("RAG_ONNX_MODEL_DIR", "/opt/chroma_db/onnx_encoder")
+ONNX_QUANTIZE = os.environ.get("RAG_ONNX_QUANTIZE", "1") != "0"
+ONNX_THREADS = int(os.environ.get("RAG_ONNX_THREADS", str(os.cpu_count() or 1)))
+MAX_SEQ_LENGTH = 256  # Matches the sentence-transformers config for all-MiniLM-L6-v2
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+
+
+def export_onnx_encoder(
+    model_name: str,
+    output_dir: str = ONNX_MODEL_DIR,
+    quantize: bool = ONNX_QUANTIZE
+) -> str:
+    """
+    Export a sentence-transformers encoder to ONNX.
+
+    Args:
+        model_name: Hugging Face id of the encoder
+        output_dir: Directory for the ONNX files and tokenizer
+        quantize: Also write a dynamically int8-quantized copy
+
+    Returns:
+        Path to the model file the encoder should load
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(output_dir, FP32_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+    tokenizer.save_pretrained(output_dir)
+    logging.info(f"Exported {model_name} to {fp32_path}")
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    int8_path = os.path.join(output_dir, INT8_FILENAME)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    logging.info(f"Wrote int8-quantized encoder to {int8_path}")
+    return int8_path
+
+
+class OnnxSentenceEncoder:
+    """
+    Mean-pooled, L2-normalized sentence encoder running on onnxruntime.
+
+    The session's intra-op thread pool is sized once at construction, so
+    per-query calls never pay for thread start-up.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, quantized: bool = ONNX_QUANTIZE, threads: int = ONNX_THREADS):
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(model_dir, INT8_FILENAME if quantized else FP32_FILENAME)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        **kwargs: Any
+    ) -> "np.ndarray":
+        """Embed one string (returns a vector) or a list of strings (returns a matrix)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalization
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            batches.append(pooled.astype(np.float32))
+
+        embeddings = np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def load_onnx_encoder(model_name: str, model_dir: str = ONNX_MODEL_DIR) -> Optional[OnnxSentenceEncoder]:
+    """
+    Load the ONNX encoder, exporting it first if the model file is missing.
+
+    Returns:
+        OnnxSentenceEncoder or None if onnxruntime or the export is unavailable
+    """
+    if not HAS_ONNXRUNTIME:
+        logging.warning("onnxruntime not installed; using the PyTorch embedding backend")
+        return None
+
+    try:
+        filename = INT8_FILENAME if ONNX_QUANTIZE else FP32_FILENAME
+        if not os.path.exists(os.path.join(model_dir, filename)):
+            export_onnx_encoder(model_name, model_dir, quantize=ONNX_QUANTIZE)
+        return OnnxSentenceEncoder(model_dir)
+    except Exception as e:
+        logging.error(f"Error loading ONNX embedding backend: {str(e)}")
+        return None
@@ -13,32 +13,67 @@ Collection Name: politicians
 """
 
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-# Import ChromaDB and SentenceTransformer libraries
-try:
-    import numpy as np
-    from sentence_transformers import SentenceTransformer
-    # We'll import chromadb through the schema module to avoid duplication
-    HAS_DEPENDENCIES = True
-except ImportError:
-    HAS_DEPENDENCIES = False
+def rag_dependencies_available() -> bool:
+    """
+    Check that the RAG libraries are installed without importing them.
+    
+    sentence-transformers pulls in torch and transformers, which take seconds
+    to import, so it is only imported when the embedding model is first loaded.
+    """
+    return all(importlib.util.find_spec(name) is not None for name in ("numpy", "sentence_transformers", "chromadb"))
+
+# ChromaDB is imported through the schema module to avoid duplication
+HAS_DEPENDENCIES = rag_dependencies_available()
+if not HAS_DEPENDENCIES:
     logging.warning("Required dependencies not installed. RAG functionality will be disabled.")
 
+from src.data.db.utils.cache import get_embedding_cache, normalize_query
+from src.data.db.utils.micro_batcher import MicroBatcher
+from src.data.db.utils.context_packer import (
+    ENABLE_CONTEXT_PACKING, CONTEXT_TOKEN_BUDGET, pack_context, format_context
+)
+
 # Constants
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# Encoder backend: "torch" (SentenceTransformer) or "onnx" (onnxruntime, see onnx_encoder.py)
+EMBEDDING_BACKEND = os.environ.get("RAG_EMBEDDING_BACKEND", "torch")
+
+# Micro-batching of concurrent embedding requests
+ENABLE_EMBEDDING_MICROBATCH = os.environ.get("RAG_EMBEDDING_MICROBATCH", "1") != "0"
+EMBEDDING_BATCH_SIZE = int(os.environ.get("RAG_EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.environ.get("RAG_EMBEDDING_MAX_WAIT_MS", "5"))
+
+# Bounded executor and default timeout for the async retrieval API
+RAG_MAX_WORKERS = int(os.environ.get("RAG_MAX_WORKERS", "4"))
+RAG_TIMEOUT = float(os.environ.get("RAG_TIMEOUT", "10"))
+
+# Pass as ``timeout`` to wait without a limit; None means ``RAG_TIMEOUT``
+NO_TIMEOUT = object()
+
 # Initialize global variables
 _embedding_model = None
+_embedding_model_lock = threading.Lock()
+_embedding_batcher = None
+_embedding_batcher_lock = threading.Lock()
+_rag_executor = None
+_rag_executor_lock = threading.Lock()
 
 def get_embedding_model() -> Optional[Any]:
     """
     Get or initialize the embedding model.
     
     Returns:
-        SentenceTransformer model or None if initialization fails
+        SentenceTransformer model (or the ONNX encoder when EMBEDDING_BACKEND
+        is "onnx") or None if initialization fails
     """
     global _embedding_model
     
@@ -48,46 +83,201 @@ def get_embedding_model() -> Optional[Any]:
     if not HAS_DEPENDENCIES:
         return None
     
+    # Concurrent first callers (batcher thread, RAG executor, API workers) wait for one load
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            _embedding_model = _load_embedding_model()
+        return _embedding_model
+
+def _load_embedding_model() -> Optional[Any]:
+    """Load the encoder for ``EMBEDDING_BACKEND``; None if it cannot be loaded."""
+    if EMBEDDING_BACKEND == "onnx":
+        from src.data.db.utils.onnx_encoder import load_onnx_encoder
+        
+        model = load_onnx_encoder(EMBEDDING_MODEL_NAME)
+        if model is not None:
+            return model
+        logging.warning("Falling back to the SentenceTransformer embedding backend")
+    
     try:
+        from sentence_transformers import SentenceTransformer
+        
         # Initialize the embedding model
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-        return _embedding_model
+        return SentenceTransformer(EMBEDDING_MODEL_NAME)
     except Exception as e:
         logging.error(f"Error initializing embedding model: {str(e)}")
         return None
 
-def get_embeddings(text: str) -> List[float]:
+def get_encoder_id() -> str:
     """
-    Generate embeddings for a text using the SentenceTransformer model.
+    Identify the query encoder (model and backend) for embedding cache keys.
+    
+    Uses the loaded encoder when there is one, so an ONNX load that fell back
+    to SentenceTransformer is keyed as torch; before the first load it uses
+    the configured backend.
+    """
+    model = _embedding_model
+    if model is not None:
+        # The ONNX encoder records which export (fp32 or int8) it runs
+        model_path = getattr(model, "model_path", None)
+        backend = f"onnx:{os.path.basename(model_path)}" if model_path else "torch"
+    elif EMBEDDING_BACKEND == "onnx":
+        from src.data.db.utils.onnx_encoder import ONNX_QUANTIZE, INT8_FILENAME, FP32_FILENAME
+        backend = f"onnx:{INT8_FILENAME if ONNX_QUANTIZE else FP32_FILENAME}"
+    else:
+        backend = "torch"
+    return f"{EMBEDDING_MODEL_NAME}|{backend}"
+
+def get_embeddings_batch(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> Optional["np.ndarray"]:
+    """
+    Generate embeddings for several texts in a single encoder call.
     
     Args:
-        text (str): The text to generate embeddings for
+        texts (List[str]): The texts to generate embeddings for
+        batch_size (int): Number of texts per forward pass
         
     Returns:
-        List[float]: The embedding vector
+        np.ndarray: A (len(texts), dim) embedding matrix, or None on failure
     """
     model = get_embedding_model()
     
     if model is None:
         logging.error("Failed to initialize embedding model")
+        return None
+    
+    try:
+        return model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+    except Exception as e:
+        logging.error(f"Error generating batch embeddings: {str(e)}")
+        return None
+
+def _encode_batch(texts: List[str]) -> List["np.ndarray"]:
+    """Embed one micro-batch; raises so every waiting caller sees the failure."""
+    embeddings = get_embeddings_batch(texts, batch_size=len(texts))
+    if embeddings is None:
+        raise RuntimeError("Embedding model unavailable")
+    return list(embeddings)
+
+def get_embedding_batcher() -> MicroBatcher:
+    """Get or create the process-wide embedding micro-batcher."""
+    global _embedding_batcher
+    
+    with _embedding_batcher_lock:
+        if _embedding_batcher is None:
+            _embedding_batcher = MicroBatcher(
+                _encode_batch,
+                max_batch_size=EMBEDDING_BATCH_SIZE,
+                max_wait=EMBEDDING_MAX_WAIT_MS / 1000,
+                name="embedding-batcher"
+            )
+        return _embedding_batcher
+
+def get_embeddings(text: str) -> List[float]:
+    """
+    Generate embeddings for a text using the SentenceTransformer model.
+    
+    Results are cached by encoder and normalized text. When micro-batching is enabled the
+    text is encoded together with any other queries that arrive within
+    ``EMBEDDING_MAX_WAIT_MS``.
+    
+    Args:
+        text (str): The text to generate embeddings for
+        
+    Returns:
+        List[float]: The embedding vector
+    """
+    if not HAS_DEPENDENCIES:
         return []
     
+    # Repeated queries skip the encoder entirely
+    embedding_cache = get_embedding_cache()
+    cache_key = (get_encoder_id(), normalize_query(text))
+    if embedding_cache is not None:
+        cached = embedding_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+    
     try:
-        # Get embeddings and convert to list
-        embedding = model.encode(text)
-        return embedding.tolist()
+        if ENABLE_EMBEDDING_MICROBATCH:
+            embedding = get_embedding_batcher()(text)
+        else:
+            embeddings = get_embeddings_batch([text])
+            if embeddings is None:
+                return []
+            embedding = embeddings[0]
+        
+        # Convert to list for ChromaDB
+        embedding = embedding.tolist()
+        if embedding_cache is not None:
+            embedding_cache.set(cache_key, embedding)
+        return embedding
     except Exception as e:
         logging.error(f"Error generating embeddings: {str(e)}")
         return []
 
-def integrate_with_chat(query: str, politician_name: str) -> str:
+def get_embeddings_many(texts: List[str]) -> List[List[float]]:
+    """
+    Generate embeddings for several texts, encoding only the embedding-cache misses.
+    
+    Cache hits are served as in ``get_embeddings``; the misses are encoded
+    together in one encoder call and added to the cache.
+    
+    Args:
+        texts (List[str]): The texts to generate embeddings for
+        
+    Returns:
+        List[List[float]]: One embedding per text ([] where encoding failed)
+    """
+    if not HAS_DEPENDENCIES or not texts:
+        return [[] for _ in texts]
+    
+    embedding_cache = get_embedding_cache()
+    encoder_id = get_encoder_id()
+    cache_keys = [(encoder_id, normalize_query(text)) for text in texts]
+    embeddings: List[List[float]] = [[] for _ in texts]
+    
+    # Group misses by cache key so duplicate texts are encoded once
+    misses: Dict[Any, List[int]] = {}
+    for i, cache_key in enumerate(cache_keys):
+        cached = embedding_cache.get(cache_key) if embedding_cache is not None else None
+        if cached is not None:
+            embeddings[i] = list(cached)
+        else:
+            misses.setdefault(cache_key, []).append(i)
+    
+    if not misses:
+        return embeddings
+    
+    encoded = get_embeddings_batch([texts[positions[0]] for positions in misses.values()])
+    if encoded is None:
+        return embeddings
+    
+    for (cache_key, positions), embedding in zip(misses.items(), encoded):
+        embedding = embedding.tolist()
+        if embedding_cache is not None:
+            embedding_cache.set(cache_key, embedding)
+        for i in positions:
+            embeddings[i] = list(embedding)
+    
+    return embeddings
+
+def integrate_with_chat(query: str, politician_name: str, token_budget: Optional[int] = None) -> str:
     """
     Integrate RAG with chat by retrieving relevant context from the database.
     This function is called by the chat modules to enhance responses.
     
+    Retrieved passages are packed into a token budget (see context_packer.py)
+    unless ``RAG_CONTEXT_PACKING=0``.
+    
     Args:
         query (str): The user's query
         politician_name (str): The name of the politician (e.g., "Joe Biden", "Donald Trump")
+        token_budget (int): Tokens allowed for the context (defaults to ``RAG_CONTEXT_TOKEN_BUDGET``)
         
     Returns:
         str: Formatted context to use in the prompt
@@ -97,16 +287,10 @@ def integrate_with_chat(query: str, politician_name: str) -> str:
     
     try:
         # Import here to avoid circular imports
-        from src.data.db.chroma.schema import connect_to_chroma, get_collection, query_politician_data
+        from src.data.db.chroma.schema import get_pooled_collection, query_politician_data
         
-        # Connect to ChromaDB
-        client = connect_to_chroma()
-        if not client:
-            logging.warning("Failed to connect to ChromaDB")
-            return ""
-            
-        # Get the politicians collection
-        collection = get_collection(client)
+        # Reuse the long-lived politicians collection handle
+        collection = get_pooled_collection()
         if not collection:
             logging.warning("Failed to get collection from ChromaDB")
             return ""
@@ -114,25 +298,120 @@ def integrate_with_chat(query: str, politician_name: str) -> str:
         # Query the database
         documents = query_politician_data(collection, query, politician_name)
         
-        if not documents:
-            return ""
+        return _documents_to_context(documents, token_budget)
+        
+    except Exception as e:
+        logging.error(f"Error integrating with chat: {str(e)}")
+        return ""
+
+def integrate_with_chat_batch(
+    queries: List[str],
+    politician_name: str,
+    token_budget: Optional[int] = None
+) -> List[str]:
+    """
+    Retrieve formatted context for several queries about one politician at once.
+    
+    The queries are embedded together and searched with a single
+    multi-embedding query, so prefetching context for a set of known topics
+    costs one round trip instead of one per topic.
+    
+    Args:
+        queries (List[str]): The queries to retrieve context for
+        politician_name (str): The name of the politician
+        token_budget (int): Tokens allowed for each context
         
-        # Format the context
-        context = "Here is some relevant factual information to help with your response:\n\n"
+    Returns:
+        List[str]: Formatted context per query ("" where nothing was found)
+    """
+    if not HAS_DEPENDENCIES or not queries:
+        return ["" for _ in queries]
+    
+    try:
+        from src.data.db.chroma.schema import get_pooled_collection, query_politician_data_batch
         
-        for i, doc in enumerate(documents, 1):
-            source = doc["metadata"].get("source", "Unknown source")
-            content_type = doc["metadata"].get("content_type", "")
-            
-            context += f"{i}. {doc['text']}\n"
-            if source:
-                context += f"   Source: {source}\n"
-            if content_type:
-                context += f"   Type: {content_type}\n"
-            context += "\n"
+        collection = get_pooled_collection()
+        if not collection:
+            logging.warning("Failed to get collection from ChromaDB")
+            return ["" for _ in queries]
         
-        return context
+        results = query_politician_data_batch(collection, queries, politician_name)
+        return [_documents_to_context(documents, token_budget) for documents in results]
         
     except Exception as e:
         logging.error(f"Error integrating with chat: {str(e)}")
-        return "" 
\ No newline at end of file
+        return ["" for _ in queries]
+
+def _documents_to_context(documents: List[Dict[str, Any]], token_budget: Optional[int] = None) -> str:
+    """Format retrieved documents, fitting them into the token budget."""
+    if not documents:
+        return ""
+    
+    if ENABLE_CONTEXT_PACKING:
+        context, _ = pack_context(documents, token_budget or CONTEXT_TOKEN_BUDGET)
+        return context
+    return format_context(documents)
+
+def get_rag_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded executor that runs retrieval for async callers."""
+    global _rag_executor
+    
+    with _rag_executor_lock:
+        if _rag_executor is None:
+            _rag_executor = ThreadPoolExecutor(max_workers=RAG_MAX_WORKERS, thread_name_prefix="rag")
+        return _rag_executor
+
+def resolve_timeout(timeout: Any) -> Optional[float]:
+    """Map an async API ``timeout`` argument to seconds: None is ``RAG_TIMEOUT``, ``NO_TIMEOUT`` is unlimited."""
+    if timeout is None:
+        return RAG_TIMEOUT
+    if timeout is NO_TIMEOUT:
+        return None
+    return timeout
+
+async def run_in_rag_executor(func: Any, *args: Any, timeout: Any = None) -> Any:
+    """
+    Run a blocking retrieval call on the RAG executor without blocking the event loop.
+    
+    ``timeout`` is in seconds; None uses ``RAG_TIMEOUT`` and ``NO_TIMEOUT`` waits indefinitely.
+    
+    Raises:
+        asyncio.TimeoutError: If the call does not finish within ``timeout`` seconds.
+            The worker thread finishes in the background; its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_rag_executor(), func, *args)
+    return await asyncio.wait_for(future, resolve_timeout(timeout))
+
+async def aintegrate_with_chat(
+    query: str,
+    politician_name: str,
+    timeout: Any = None,
+    token_budget: Optional[int] = None
+) -> str:
+    """
+    Async version of ``integrate_with_chat``.
+    
+    Embedding and vector search run on the bounded RAG executor, so a slow
+    index delays only this request instead of the whole event loop.
+    
+    Args:
+        query (str): The user's query
+        politician_name (str): The name of the politician
+        timeout (float): Seconds to wait before giving up (None uses ``RAG_TIMEOUT``,
+            ``NO_TIMEOUT`` waits indefinitely)
+        token_budget (int): Tokens allowed for the context
+        
+    Returns:
+        str: Formatted context, or "" on timeout
+    """
+    if not HAS_DEPENDENCIES:
+        return ""
+    
+    try:
+        return await run_in_rag_executor(
+            integrate_with_chat, query, politician_name, token_budget, timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logging.warning(f"RAG retrieval for {politician_name} timed out after {resolve_timeout(timeout)}s")
+        return ""
\ No newline at end of file
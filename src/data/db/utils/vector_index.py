@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+In-Process Vector Index for the AI Politician RAG System
+
+This module provides an exact-search alternative to ChromaDB's HNSW query.
+The ``politicians`` collection is exported into one float16 embedding matrix
+per politician (``.npy`` shards) plus an SQLite record store. Queries memory-map
+the shard for the requested politician and run a single matrix-vector product
+followed by ``argpartition`` top-k, which avoids the ``where`` filter entirely;
+only the top-k rows' documents and metadata are then read from the store.
+
+ChromaDB remains the source of truth: the index records the collection's
+document count and version when it is built and is ignored once the
+collection changes.
+
+Index Layout:
+    <index_dir>/manifest.json        Model, dimension, source count/version and shard list
+    <index_dir>/<politician>.npy     Unit-normalized float16 embeddings
+    <index_dir>/records.sqlite       Ids, documents and metadata keyed by (shard, row)
+
+Usage:
+    python scripts/data/build_vector_index.py --output /opt/chroma_db/vector_index
+    RAG_RETRIEVAL_BACKEND=numpy python aipolitician.py chat biden
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.data.db.utils.collection_version import get_collection_state
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Constants
+DEFAULT_INDEX_PATH = os.environ.get("RAG_VECTOR_INDEX_PATH", "/opt/chroma_db/vector_index")
+MANIFEST_FILENAME = "manifest.json"
+RECORDS_FILENAME = "records.sqlite"
+EXPORT_BATCH_SIZE = 5000
+
+# Rows upcast to float32 per matrix-vector block, bounding temporary memory
+SCORE_BLOCK_ROWS = 65536
+
+# Minimum seconds between checks that the index still matches the collection
+STALENESS_CHECK_INTERVAL = float(os.environ.get("RAG_VECTOR_INDEX_CHECK_INTERVAL", "30"))
+
+# Process-wide index handle
+_vector_index = None
+_vector_index_lock = threading.Lock()
+
+
+def _shard_name(politician_name: str) -> str:
+    """Turn a politician name into a safe shard file stem."""
+    return re.sub(r"[^a-z0-9]+", "_", politician_name.lower()).strip("_") or "unknown"
+
+
+def _count_by_politician(collection: Any, source_count: int, batch_size: int) -> Dict[str, int]:
+    """First export pass: count each politician's documents from metadata alone."""
+    counts: Dict[str, int] = {}
+    offset = 0
+    while offset < source_count:
+        page = collection.get(limit=batch_size, offset=offset, include=["metadatas"])
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        for metadata in page["metadatas"]:
+            politician = (metadata or {}).get("politician_name", "")
+            counts[politician] = counts.get(politician, 0) + 1
+        offset += len(ids)
+    return counts
+
+
+def build_vector_index(
+    collection: Any,
+    output_dir: str = DEFAULT_INDEX_PATH,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Export a ChromaDB collection into per-politician embedding shards.
+
+    The collection is read twice, one page at a time: once to size each
+    shard, then again to write embeddings straight into the ``.npy`` memmaps
+    and records into the SQLite store, so memory use is bounded by the page size.
+
+    Args:
+        collection: ChromaDB collection to export
+        output_dir: Directory to write the shards and manifest into
+        batch_size: Number of records fetched from ChromaDB per page
+
+    Returns:
+        The manifest describing the written index
+    """
+    if not HAS_NUMPY:
+        raise RuntimeError("NumPy is required to build the vector index")
+
+    from src.data.db.utils.rag_utils import EMBEDDING_MODEL_NAME
+
+    os.makedirs(output_dir, exist_ok=True)
+    source_count, source_version = get_collection_state(collection)
+    counts = _count_by_politician(collection, source_count, batch_size)
+
+    records_path = os.path.join(output_dir, RECORDS_FILENAME)
+    if os.path.exists(records_path):
+        os.remove(records_path)
+    conn = sqlite3.connect(records_path)
+    conn.execute(
+        "CREATE TABLE records (shard TEXT NOT NULL, row INTEGER NOT NULL, id TEXT NOT NULL, "
+        "document TEXT, metadata TEXT, PRIMARY KEY (shard, row))"
+    )
+
+    shards: Dict[str, Any] = {}
+    next_row: Dict[str, int] = {}
+    dimension = None
+
+    try:
+        offset = 0
+        while offset < source_count:
+            page = collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            dimension = embeddings.shape[1]
+
+            # Normalize so a dot product is cosine similarity
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = (embeddings / np.maximum(norms, 1e-12)).astype(np.float16)
+
+            rows = []
+            for i, doc_id in enumerate(ids):
+                metadata = page["metadatas"][i] or {}
+                politician = metadata.get("politician_name", "")
+                row = next_row.get(politician, 0)
+                if row >= counts.get(politician, 0):
+                    raise RuntimeError("Collection changed while the vector index was being built; rebuild it")
+
+                if politician not in shards:
+                    stem = _shard_name(politician)
+                    shards[politician] = np.lib.format.open_memmap(
+                        os.path.join(output_dir, f"{stem}.npy"),
+                        mode="w+",
+                        dtype=np.float16,
+                        shape=(counts[politician], dimension)
+                    )
+                shards[politician][row] = embeddings[i]
+                next_row[politician] = row + 1
+                rows.append((_shard_name(politician), row, doc_id, page["documents"][i], json.dumps(metadata)))
+
+            conn.executemany("INSERT INTO records (shard, row, id, document, metadata) VALUES (?, ?, ?, ?, ?)", rows)
+            offset += len(ids)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    for matrix in shards.values():
+        matrix.flush()
+
+    manifest = {
+        "collection": getattr(collection, "name", ""),
+        "source_count": source_count,
+        "source_version": source_version,
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "dimension": dimension,
+        "dtype": "float16",
+        "created_at": datetime.now().isoformat(),
+        "shards": {
+            politician: {"file": _shard_name(politician), "count": next_row[politician]}
+            for politician in shards
+        }
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    logging.info(f"Exported {offset} documents into {len(shards)} vector index shards at {output_dir}")
+    return manifest
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine-similarity search over memory-mapped per-politician shards.
+
+    Shards are memory-mapped lazily on first use and only the top-k rows'
+    documents and metadata are read from the record store, so startup only
+    reads the manifest.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_PATH):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, MANIFEST_FILENAME)) as f:
+            self.manifest = json.load(f)
+        self._lock = threading.Lock()
+        self._shards: Dict[str, Any] = {}
+        self._records = sqlite3.connect(
+            f"file:{os.path.join(index_dir, RECORDS_FILENAME)}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._records_lock = threading.Lock()
+        self._last_checked = 0.0
+        self._is_current = True
+
+    def is_current(self, collection: Any) -> bool:
+        """Check that the collection has not changed since the index was built."""
+        now = time.monotonic()
+        if now - self._last_checked < STALENESS_CHECK_INTERVAL:
+            return self._is_current
+
+        try:
+            self._is_current = get_collection_state(collection) == (
+                self.manifest.get("source_count"), self.manifest.get("source_version", 0)
+            )
+        except Exception as e:
+            logging.warning(f"Could not verify vector index against collection: {str(e)}")
+            self._is_current = False
+        self._last_checked = now
+
+        if not self._is_current:
+            logging.warning(f"Vector index at {self.index_dir} is stale; rebuild it to use the numpy backend")
+        return self._is_current
+
+    def has_politician(self, politician_name: str) -> bool:
+        return politician_name in self.manifest.get("shards", {})
+
+    def _load_shard(self, politician_name: str):
+        with self._lock:
+            if politician_name not in self._shards:
+                stem = self.manifest["shards"][politician_name]["file"]
+                self._shards[politician_name] = np.load(
+                    os.path.join(self.index_dir, f"{stem}.npy"), mmap_mode="r"
+                )
+            return self._shards[politician_name]
+
+    def _fetch_records(self, politician_name: str, rows: List[int]) -> Dict[int, Any]:
+        """Read the documents and metadata of the given shard rows."""
+        stem = self.manifest["shards"][politician_name]["file"]
+        placeholders = ",".join("?" for _ in rows)
+        with self._records_lock:
+            fetched = self._records.execute(
+                f"SELECT row, document, metadata FROM records WHERE shard = ? AND row IN ({placeholders})",
+                [stem, *rows]
+            ).fetchall()
+        return {row: (document, json.loads(metadata)) for row, document, metadata in fetched}
+
+    def query(
+        self,
+        query_embedding: List[float],
+        politician_name: str,
+        num_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the top-k documents for a politician by cosine similarity.
+
+        Scores are cosine distances (1 - similarity) so that, like ChromaDB,
+        lower is better.
+        """
+        if not self.has_politician(politician_name):
+            return []
+
+        matrix = self._load_shard(politician_name)
+        if matrix.shape[0] == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        # Score in blocks so large float16 shards are upcast a slice at a time
+        num_rows = matrix.shape[0]
+        similarities = np.empty(num_rows, dtype=np.float32)
+        for start in range(0, num_rows, SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            similarities[start:start + SCORE_BLOCK_ROWS] = block @ query
+
+        k = min(num_results, num_rows)
+
+        # Partial selection of the k best rows, then sort only those
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+
+        records = self._fetch_records(politician_name, [int(i) for i in top])
+        return [
+            {
+                "text": records[int(i)][0],
+                "metadata": records[int(i)][1],
+                "score": float(1.0 - similarities[i])
+            }
+            for i in top
+        ]
+
+
+def get_vector_index(index_dir: str = DEFAULT_INDEX_PATH) -> Optional[NumpyVectorIndex]:
+    """
+    Get the process-wide vector index, loading its manifest on first use.
+
+    Returns:
+        NumpyVectorIndex or None if NumPy or the index is unavailable
+    """
+    global _vector_index
+
+    if not HAS_NUMPY:
+        return None
+
+    with _vector_index_lock:
+        if _vector_index is not None and _vector_index.index_dir == index_dir:
+            return _vector_index
+
+        if not os.path.exists(os.path.join(index_dir, MANIFEST_FILENAME)):
+            logging.warning(f"Vector index not found at {index_dir}; falling back to ChromaDB")
+            return None
+
+        try:
+            _vector_index = NumpyVectorIndex(index_dir)
+        except Exception as e:
+            logging.error(f"Error loading vector index: {str(e)}")
+            return None
+        return _vector_index
+
+
+def query_vector_index(
+    collection: Any,
+    query_embedding: List[float],
+    politician_name: str,
+    num_results: int = 5
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Query the in-process index if it is available and matches the collection.
+
+    Returns:
+        List of document dictionaries, or None if the caller should use ChromaDB
+    """
+    index = get_vector_index()
+    if index is None or not index.is_current(collection):
+        return None
+
+    return index.query(query_embedding, politician_name, num_results)
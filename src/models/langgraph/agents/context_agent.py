@@ -4,11 +4,14 @@ Context Agent for the AI Politician system.
 This agent extracts important information from user input and uses RAG to look through the knowledge base.
 """
 import sys
-import torch
+import time
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add the project root to the Python path
 root_dir = Path(__file__).parent.parent.parent.parent.parent.absolute()
@@ -17,88 +20,92 @@ sys.path.insert(0, str(root_dir))
 from src.models.langgraph.config import (
     CONTEXT_LLM_MODEL_ID, 
     USE_4BIT_QUANTIZATION,
+    CONTEXT_MAX_WORKERS,
+    CONTEXT_EXTRACTOR,
     HAS_RAG
 )
+from src.models.langgraph.agents.topic_extractor import extract_topics, format_topics, has_topics
+from src.models.langgraph.utils.model_registry import model_registry
 
 # Import RAG utilities if available
 if HAS_RAG:
-    from src.data.db.utils.rag_utils import integrate_with_chat
+    from src.data.db.utils.rag_utils import integrate_with_chat, aintegrate_with_chat, integrate_with_chat_batch
 
-# Global cache for models
-_context_model = None
-_context_tokenizer = None
-_context_model_loading = False
+# Executor shared by the extraction and retrieval stages
+_context_executor = None
+_context_executor_lock = threading.Lock()
 
 # Silence the transformer logging
 logging.getLogger("transformers").setLevel(logging.ERROR)
 logging.getLogger("tokenizers").setLevel(logging.ERROR)
 
-def _get_context_model_and_tokenizer():
-    """Load or get cached context analysis model."""
-    global _context_model, _context_tokenizer, _context_model_loading
+def _load_context_model_and_tokenizer():
+    """Load the context analysis model (called once by the model registry)."""
+    # Heavy dependencies are imported only when the model is actually needed
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
     
-    if _context_model is not None and _context_tokenizer is not None:
-        return _context_model, _context_tokenizer
+    # Check for CUDA availability
+    if torch.cuda.is_available():
+        device = "cuda"
+        print(f"Loading context extraction model...")
+        
+        # Set up quantization for more efficient memory usage
+        if USE_4BIT_QUANTIZATION:
+            bnb_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_use_double_quant=True,
+            )
+            
+            model = AutoModelForCausalLM.from_pretrained(
+                CONTEXT_LLM_MODEL_ID,
+                quantization_config=bnb_config,
+                device_map="auto",
+                torch_dtype=torch.float16,
+                attn_implementation="eager"  # Disable FlashAttention
+            )
+        else:
+            model = AutoModelForCausalLM.from_pretrained(
+                CONTEXT_LLM_MODEL_ID,
+                device_map="auto",
+                torch_dtype=torch.float16,
+                attn_implementation="eager"  # Disable FlashAttention
+            )
+    else:
+        # CPU-only operation
+        device = "cpu"
+        print(f"Loading context extraction model on CPU...")
+        model = AutoModelForCausalLM.from_pretrained(CONTEXT_LLM_MODEL_ID)
     
-    if _context_model_loading:
-        print("Context model is already loading...")
-        return None, None
+    # Load tokenizer
+    tokenizer = AutoTokenizer.from_pretrained(CONTEXT_LLM_MODEL_ID)
     
-    _context_model_loading = True
+    # Ensure padding token is set
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
     
-    try:
-        # Check for CUDA availability
-        if torch.cuda.is_available():
-            device = "cuda"
-            print(f"Loading context extraction model...")
-            
-            # Set up quantization for more efficient memory usage
-            if USE_4BIT_QUANTIZATION:
-                bnb_config = BitsAndBytesConfig(
-                    load_in_4bit=True,
-                    bnb_4bit_compute_dtype=torch.float16,
-                    bnb_4bit_quant_type="nf4",
-                    bnb_4bit_use_double_quant=True,
-                )
-                
-                model = AutoModelForCausalLM.from_pretrained(
-                    CONTEXT_LLM_MODEL_ID,
-                    quantization_config=bnb_config,
-                    device_map="auto",
-                    torch_dtype=torch.float16,
-                    attn_implementation="eager"  # Disable FlashAttention
-                )
-            else:
-                model = AutoModelForCausalLM.from_pretrained(
-                    CONTEXT_LLM_MODEL_ID,
-                    device_map="auto",
-                    torch_dtype=torch.float16,
-                    attn_implementation="eager"  # Disable FlashAttention
-                )
+    return model, tokenizer
+
+# Only the "llm" and "cascade" extractors use the context model
+if CONTEXT_EXTRACTOR != "fast":
+    model_registry.register("context", _load_context_model_and_tokenizer)
+
+@contextmanager
+def _use_context_model_and_tokenizer():
+    """
+    Load or get cached context analysis model, waiting for a load already in progress.
+    
+    The model is held in the registry until the block exits, so it cannot be
+    evicted mid-generation. Yields (None, None) if it is unavailable.
+    """
+    with model_registry.acquire("context", _load_context_model_and_tokenizer) as loaded:
+        if loaded is None:
+            print("Using simple context extraction as fallback")
+            yield None, None
         else:
-            # CPU-only operation
-            device = "cpu"
-            print(f"Loading context extraction model on CPU...")
-            model = AutoModelForCausalLM.from_pretrained(CONTEXT_LLM_MODEL_ID)
-        
-        # Load tokenizer
-        tokenizer = AutoTokenizer.from_pretrained(CONTEXT_LLM_MODEL_ID)
-        
-        # Ensure padding token is set
-        if tokenizer.pad_token is None:
-            tokenizer.pad_token = tokenizer.eos_token
-    
-        _context_model = model
-        _context_tokenizer = tokenizer
-        _context_model_loading = False
-        print("Context extraction model loaded successfully")
-        return model, tokenizer
-        
-    except Exception as e:
-        _context_model_loading = False
-        print(f"Error loading context model: {str(e)}")
-        print("Using simple context extraction as fallback")
-        return None, None
+            yield loaded
 
 def _simple_keyword_extraction(prompt: str) -> str:
     """Simple keyword extraction as fallback method."""
@@ -113,13 +120,18 @@ def _simple_keyword_extraction(prompt: str) -> str:
 
 def extract_context_from_prompt(prompt: str, politician_name: str) -> str:
     """Extract key topics and context from the user prompt."""
-    model, tokenizer = _get_context_model_and_tokenizer()
-    
-    if model is None or tokenizer is None:
-        # Fallback to simple keyword extraction if model loading failed
-        return _simple_keyword_extraction(prompt)
-    
+    with _use_context_model_and_tokenizer() as (model, tokenizer):
+        if model is None or tokenizer is None:
+            # Fallback to simple keyword extraction if model loading failed
+            return _simple_keyword_extraction(prompt)
+        
+        return _generate_context(model, tokenizer, prompt, politician_name)
+
+def _generate_context(model, tokenizer, prompt: str, politician_name: str) -> str:
+    """Run the context model over the user prompt."""
     try:
+        import torch
+        
         # Create the prompt for context extraction
         extraction_prompt = f"""<s>[INST] As a political analyst, analyze the following user input directed at {politician_name}. Extract key topics, policy areas, and factual questions.
 
@@ -154,13 +166,70 @@ Provide a concise analysis that identifies:
         # Fallback to simple keyword extraction if inference fails
         return _simple_keyword_extraction(prompt)
 
-def get_rag_context(prompt: str, politician_name: str) -> Optional[str]:
+def _extract_topics(prompt: str, politician_name: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract topics with the configured strategy.
+    
+    The structured topics always come from the fast extractor; the text placed
+    in the context comes from the LLM in "llm" mode, or in "cascade" mode when
+    the fast extractor finds nothing.
+    
+    Returns:
+        Tuple of (topic text for the context, structured topics)
+    """
+    topics = extract_topics(prompt)
+    
+    if CONTEXT_EXTRACTOR == "llm" or (CONTEXT_EXTRACTOR == "cascade" and not has_topics(topics)):
+        return extract_context_from_prompt(prompt, politician_name), topics
+    
+    return format_topics(topics), topics
+
+def _get_context_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded executor that runs the context stages."""
+    global _context_executor
+    
+    with _context_executor_lock:
+        if _context_executor is None:
+            _context_executor = ThreadPoolExecutor(max_workers=CONTEXT_MAX_WORKERS, thread_name_prefix="context")
+        return _context_executor
+
+def _extract_topics_or_empty(prompt: str, politician_name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """``_extract_topics`` that falls back to no topics instead of failing the request."""
+    try:
+        return _extract_topics(prompt, politician_name)
+    except Exception as e:
+        print(f"Error extracting topics: {str(e)}")
+        return "", None
+
+def _rag_context_or_none(prompt: str, politician_name: str) -> Optional[str]:
+    """``get_rag_context`` that falls back to no knowledge instead of failing the request."""
+    try:
+        return get_rag_context(prompt, politician_name)
+    except Exception as e:
+        print(f"Error retrieving knowledge: {str(e)}")
+        return None
+
+def _timed(func, *args):
+    """Call ``func`` and return its result with the elapsed seconds."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def get_rag_context(prompt: str, politician_name: str, token_budget: Optional[int] = None) -> Optional[str]:
     """Get context from the RAG system if available."""
     if HAS_RAG:
-        return integrate_with_chat(prompt, politician_name)
+        return integrate_with_chat(prompt, politician_name, token_budget=token_budget)
     else:
         # Simulate RAG response for testing
-        extracted_info = extract_context_from_prompt(prompt, politician_name)
+        extracted_info, _ = _extract_topics(prompt, politician_name)
+        return f"Simulated knowledge base information about: {extracted_info}"
+
+async def aget_rag_context(prompt: str, politician_name: str, token_budget: Optional[int] = None) -> Optional[str]:
+    """Get context from the RAG system without blocking the event loop."""
+    if HAS_RAG:
+        return await aintegrate_with_chat(prompt, politician_name, token_budget=token_budget)
+    else:
+        extracted_info, _ = await asyncio.to_thread(_extract_topics, prompt, politician_name)
         return f"Simulated knowledge base information about: {extracted_info}"
 
 def extract_context(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -168,13 +237,64 @@ def extract_context(state: Dict[str, Any]) -> Dict[str, Any]:
     prompt = state["user_input"]
     politician_name = state["politician_identity"].title()  # Convert "biden" to "Biden"
     
-    # Extract context from prompt for better retrieval
-    extracted_context = extract_context_from_prompt(prompt, politician_name)
+    use_rag = state.get("use_rag", True) and HAS_RAG
+    start = time.perf_counter()
+    
+    # Topic extraction and knowledge base retrieval are independent, so run them side by side
+    executor = _get_context_executor()
+    extraction = executor.submit(_timed, _extract_topics_or_empty, prompt, politician_name)
+    retrieval = executor.submit(_timed, _rag_context_or_none, prompt, politician_name) if use_rag else None
+    
+    (extracted_context, topics), extraction_time = extraction.result()
+    rag_context, retrieval_time = retrieval.result() if retrieval else (None, 0.0)
     
-    # Get context from knowledge base using RAG
-    rag_context = get_rag_context(prompt, politician_name) if state.get("use_rag", True) else None
+    timings = {"extraction": extraction_time, "retrieval": retrieval_time, "total": time.perf_counter() - start}
+    return _combine_context(state, extracted_context, _simulated_or(rag_context, extracted_context, state), timings, topics)
+
+async def aextract_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async version of ``extract_context`` for graphs run with ``ainvoke``."""
+    prompt = state["user_input"]
+    politician_name = state["politician_identity"].title()
     
-    # Combine both contexts
+    use_rag = state.get("use_rag", True) and HAS_RAG
+    start = time.perf_counter()
+    
+    async def timed_retrieval():
+        if not use_rag:
+            return None, 0.0
+        retrieval_start = time.perf_counter()
+        try:
+            rag_context = await aget_rag_context(prompt, politician_name)
+        except Exception as e:
+            print(f"Error retrieving knowledge: {str(e)}")
+            rag_context = None
+        return rag_context, time.perf_counter() - retrieval_start
+    
+    # Run the extraction model on the context executor while retrieval is awaited
+    loop = asyncio.get_running_loop()
+    ((extracted_context, topics), extraction_time), (rag_context, retrieval_time) = await asyncio.gather(
+        loop.run_in_executor(_get_context_executor(), _timed, _extract_topics_or_empty, prompt, politician_name),
+        timed_retrieval()
+    )
+    
+    timings = {"extraction": extraction_time, "retrieval": retrieval_time, "total": time.perf_counter() - start}
+    return _combine_context(state, extracted_context, _simulated_or(rag_context, extracted_context, state), timings, topics)
+
+def _simulated_or(rag_context: Optional[str], extracted_context: str, state: Dict[str, Any]) -> Optional[str]:
+    """Without the RAG system, reuse the extracted topics as simulated knowledge instead of generating them twice."""
+    if HAS_RAG or not state.get("use_rag", True):
+        return rag_context
+    return f"Simulated knowledge base information about: {extracted_context}"
+
+def _combine_context(
+    state: Dict[str, Any],
+    extracted_context: str,
+    rag_context: Optional[str],
+    timings: Optional[Dict[str, float]] = None,
+    topics: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Merge extracted topics, retrieved knowledge and stage timings into the workflow state."""
+    topics = topics or {"main_topics": [], "policy_areas": [], "entities": []}
     combined_context = f"Extracted Topics: {extracted_context}\n\n"
     if rag_context:
         combined_context += f"Knowledge Base Context: {rag_context}"
@@ -183,10 +303,14 @@ def extract_context(state: Dict[str, Any]) -> Dict[str, Any]:
     return {
         **state,
         "context": combined_context,
-        "has_knowledge": bool(rag_context and rag_context != f"Simulated knowledge base information about: {extracted_context}")
+        "has_knowledge": bool(rag_context and rag_context != f"Simulated knowledge base information about: {extracted_context}"),
+        "context_timings": timings or {},
+        "main_topics": topics["main_topics"],
+        "policy_areas": topics["policy_areas"],
+        "entities": topics["entities"]
     }
 
-def retrieve_knowledge(topic: str, politician_name: str) -> str:
+def retrieve_knowledge(topic: str, politician_name: str, token_budget: Optional[int] = None) -> str:
     """
     Retrieve knowledge from the knowledge base about a specific topic for a politician.
     This function is used by the debate system to get relevant information.
@@ -194,6 +318,7 @@ def retrieve_knowledge(topic: str, politician_name: str) -> str:
     Args:
         topic: The topic to retrieve knowledge about
         politician_name: The politician identity to retrieve knowledge for
+        token_budget: Tokens allowed for the retrieved passages
         
     Returns:
         Retrieved knowledge as a string
@@ -202,8 +327,42 @@ def retrieve_knowledge(topic: str, politician_name: str) -> str:
     prompt = f"What is {politician_name}'s position on {topic}?"
     
     # Use the existing RAG function to get knowledge
-    knowledge = get_rag_context(prompt, politician_name)
+    knowledge = get_rag_context(prompt, politician_name, token_budget=token_budget)
     
+    return _knowledge_or_fallback(knowledge, topic, politician_name)
+
+async def aretrieve_knowledge(topic: str, politician_name: str, token_budget: Optional[int] = None) -> str:
+    """Async version of ``retrieve_knowledge`` for callers running in an event loop."""
+    prompt = f"What is {politician_name}'s position on {topic}?"
+    knowledge = await aget_rag_context(prompt, politician_name, token_budget=token_budget)
+    
+    return _knowledge_or_fallback(knowledge, topic, politician_name)
+
+def retrieve_knowledge_batch(topics: List[str], politician_name: str, token_budget: Optional[int] = None) -> Dict[str, str]:
+    """
+    Retrieve knowledge for several topics for one politician in a single batched query.
+    
+    Args:
+        topics: The topics to retrieve knowledge about
+        politician_name: The politician identity to retrieve knowledge for
+        token_budget: Tokens allowed for each topic's passages
+        
+    Returns:
+        Dict mapping each topic to its retrieved knowledge (or the fallback text)
+    """
+    if not HAS_RAG:
+        # Without the knowledge base every topic ends up with the fallback text
+        return {topic: _knowledge_or_fallback(None, topic, politician_name) for topic in topics}
+    
+    prompts = [f"What is {politician_name}'s position on {topic}?" for topic in topics]
+    contexts = integrate_with_chat_batch(prompts, politician_name, token_budget=token_budget)
+    
+    return {
+        topic: _knowledge_or_fallback(knowledge, topic, politician_name)
+        for topic, knowledge in zip(topics, contexts)
+    }
+
+def _knowledge_or_fallback(knowledge: Optional[str], topic: str, politician_name: str) -> str:
     if not knowledge or knowledge.startswith("Simulated knowledge base information about:"):
         # Provide a fallback response if no real knowledge is available
         return f"In the absence of specific information, {politician_name} is known to generally align with their party's position on {topic}."
@@ -4,12 +4,12 @@ Response Agent for the AI Politician system.
 This agent generates the final response to the user, incorporating context and sentiment analysis.
 """
 import sys
-import torch
+import time
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig, GenerationConfig
-from peft import PeftModel
+from typing import Dict, Any, Callable, List, Optional, Union
 
 # Add the project root to the Python path
 root_dir = Path(__file__).parent.parent.parent.parent.parent.absolute()
@@ -17,8 +17,8 @@ sys.path.insert(0, str(root_dir))
 
 from src.models.langgraph.config import (
     BASE_MODEL_ID, 
-    BIDEN_ADAPTER_PATH, 
-    TRUMP_ADAPTER_PATH,
+    ADAPTER_PATHS,
+    MAX_RESIDENT_ADAPTERS,
     PoliticianIdentity,
     MAX_RESPONSE_LENGTH,
     DEFAULT_TEMPERATURE,
@@ -27,74 +27,243 @@ from src.models.langgraph.config import (
     TRUMP_TEMPERATURE,
     TRUMP_TOP_P
 )
+from src.models.langgraph.utils.model_registry import model_registry
+from src.data.db.utils.context_packer import set_tokenizer_provider
 
-# Cache for models and tokenizers
-_model_cache = {}
-_tokenizer_cache = {}
-_model_loading = False
+# The shared base model is held by the model registry; which adapters are
+# attached and active is read from the model itself
+_adapter_last_used = {}  # Adapter name -> time it was last made active
+_reported_adapters = None  # (model id, adapter names) last reported to the registry
+_adapter_lock = threading.RLock()  # Guards adapter switching and the bookkeeping above
+
+# Prompt markers removed from streamed text
+_STREAM_MARKERS = ("[INST]", "[/INST]", "<<SYS>>", "<</SYS>>", "<s>", "</s>")
 
 # Silence the transformer logging
 logging.getLogger("transformers").setLevel(logging.ERROR)
 logging.getLogger("tokenizers").setLevel(logging.ERROR)
 logging.getLogger("peft").setLevel(logging.ERROR)
 
-def _get_model_and_tokenizer(politician_identity: str):
-    """Get or load the model and tokenizer for the specified politician."""
-    global _model_cache, _tokenizer_cache, _model_loading
+def _adapter_name_for(politician_identity: str) -> str:
+    """Map a politician identity to the name of its LoRA adapter."""
+    if politician_identity == PoliticianIdentity.BIDEN:
+        return PoliticianIdentity.BIDEN.value
+    return PoliticianIdentity.TRUMP.value
+
+def _load_response_tokenizer():
+    """Load the response model's tokenizer (shared with the RAG context packer)."""
+    from transformers import AutoTokenizer
     
-    # Return from cache if already loaded
-    if politician_identity in _model_cache and politician_identity in _tokenizer_cache:
-        return _model_cache[politician_identity], _tokenizer_cache[politician_identity]
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL_ID, use_fast=False)
     
-    if _model_loading:
-        print("Politician model is already loading...")
-        return None, None
+    # Set padding token if needed
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
     
-    _model_loading = True
+    return tokenizer
+
+model_registry.register("response_tokenizer", _load_response_tokenizer)
+
+# Context packing counts tokens exactly as the response model will see them
+set_tokenizer_provider(lambda: model_registry.get("response_tokenizer"))
+
+def _load_base_model():
+    """Load the quantized Mistral base model and its tokenizer."""
+    # Heavy dependencies are imported only when a model is actually needed
+    import torch
+    from transformers import AutoModelForCausalLM, BitsAndBytesConfig
     
-    try:
-        # Create BitsAndBytesConfig for 4-bit quantization
-        bnb_config = BitsAndBytesConfig(
-            load_in_4bit=True,
-            bnb_4bit_compute_dtype=torch.float16,
-            bnb_4bit_quant_type="nf4",
-            bnb_4bit_use_double_quant=True,
-        )
-        
-        print(f"Loading politician response model...")
-        # Load model with proper configuration
-        model = AutoModelForCausalLM.from_pretrained(
-            BASE_MODEL_ID,
-            quantization_config=bnb_config,
-            device_map="auto",
-            torch_dtype=torch.float16,
-            attn_implementation="eager"  # Disable FlashAttention
-        )
-        tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL_ID, use_fast=False)
-        
-        # Set padding token if needed
-        if tokenizer.pad_token is None:
-            tokenizer.pad_token = tokenizer.eos_token
-        
-        # Load the appropriate LoRA adapter
-        adapter_path = BIDEN_ADAPTER_PATH if politician_identity == PoliticianIdentity.BIDEN else TRUMP_ADAPTER_PATH
-        print(f"Loading political personality adapter...")
-        model = PeftModel.from_pretrained(model, adapter_path)
-        model.eval()  # Set to evaluation mode
-        
-        # Cache the model and tokenizer
-        _model_cache[politician_identity] = model
-        _tokenizer_cache[politician_identity] = tokenizer
+    # Create BitsAndBytesConfig for 4-bit quantization
+    bnb_config = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_compute_dtype=torch.float16,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_use_double_quant=True,
+    )
+    
+    print(f"Loading politician response model...")
+    # Load model with proper configuration
+    model = AutoModelForCausalLM.from_pretrained(
+        BASE_MODEL_ID,
+        quantization_config=bnb_config,
+        device_map="auto",
+        torch_dtype=torch.float16,
+        attn_implementation="eager"  # Disable FlashAttention
+    )
+    tokenizer = model_registry.get("response_tokenizer")
+    if tokenizer is None:
+        raise RuntimeError("Response tokenizer could not be loaded")
+    
+    return model, tokenizer
+
+def _attach_adapter(model, adapter_name: str):
+    """Attach a named LoRA adapter to the shared base model."""
+    from peft import PeftModel
+    
+    adapter_path = ADAPTER_PATHS[adapter_name]
+    print(f"Loading political personality adapter ({adapter_name})...")
+    
+    if isinstance(model, PeftModel):
+        model.load_adapter(adapter_path, adapter_name=adapter_name)
+    else:
+        # First adapter wraps the base model; later ones are added alongside it
+        model = PeftModel.from_pretrained(model, adapter_path, adapter_name=adapter_name)
+    
+    return model
+
+def _load_response_model_and_tokenizer():
+    """Load the base model with the politicians' adapters attached (called by the model registry)."""
+    model, tokenizer = _load_base_model()
+    
+    # The first adapter wraps the base model and becomes active; the remaining
+    # identities are attached alongside it, up to the resident adapter limit
+    adapter_names = list(ADAPTER_PATHS)
+    model = _attach_adapter(model, adapter_names[0])
+    for other_name in adapter_names[1:MAX_RESIDENT_ADAPTERS or None]:
+        try:
+            model = _attach_adapter(model, other_name)
+        except Exception as e:
+            print(f"Could not preload adapter '{other_name}': {str(e)}")
+    
+    model.eval()  # Set to evaluation mode
+    return model, tokenizer
+
+def _unload_response_model(loaded):
+    """Forget adapter bookkeeping when the registry evicts the response model."""
+    global _reported_adapters
+    
+    with _adapter_lock:
+        _adapter_last_used.clear()
+        _reported_adapters = None
+
+model_registry.register("response", _load_response_model_and_tokenizer, _unload_response_model)
+
+def _adapter_sizes(model) -> Dict[str, int]:
+    """Bytes of LoRA weights held by each attached adapter."""
+    sizes = {name: 0 for name in model.peft_config}
+    for param_name, param in model.named_parameters():
+        for name in sizes:
+            if f".{name}." in param_name:
+                sizes[name] += param.numel() * param.element_size()
+    return sizes
+
+def _evict_adapters(model, keep: str):
+    """Detach least recently used adapters beyond ``MAX_RESIDENT_ADAPTERS``, never ``keep``."""
+    if not MAX_RESIDENT_ADAPTERS:
+        return
+    
+    loaded = list(model.peft_config)
+    while len(loaded) > MAX_RESIDENT_ADAPTERS:
+        candidates = [name for name in loaded if name != keep]
+        if not candidates:
+            break
+        victim = min(candidates, key=lambda name: _adapter_last_used.get(name, 0.0))
+        model.delete_adapter(victim)
+        loaded.remove(victim)
+        _adapter_last_used.pop(victim, None)
+        print(f"Detached adapter '{victim}' (resident adapter limit {MAX_RESIDENT_ADAPTERS})")
+
+class _AdapterGate:
+    """
+    Lets generations that use the same adapter run at the same time.
+    
+    The base model is shared, so only one adapter can be active at once.
+    Callers for the active adapter enter straight away; a caller for another
+    adapter waits until the running generations finish. While it waits, new
+    callers for the active adapter queue behind it, so requests are served in
+    batches by adapter and neither politician is starved.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = None  # Adapter of the running batch
+        self._running = 0  # Generations in the running batch
+        self._admit = 0  # Callers that were waiting when the batch started
+        self._waiting: Dict[str, int] = {}  # Adapter name -> callers waiting for it
+    
+    def _can_enter(self, adapter_name: str) -> bool:
+        others_waiting = any(name != adapter_name for name in self._waiting)
+        if self._running == 0:
+            return adapter_name != self._active or not others_waiting
+        return adapter_name == self._active and (self._admit > 0 or not others_waiting)
+    
+    @contextmanager
+    def use(self, adapter_name: str):
+        with self._condition:
+            self._waiting[adapter_name] = self._waiting.get(adapter_name, 0) + 1
+            try:
+                while not self._can_enter(adapter_name):
+                    self._condition.wait()
+            finally:
+                self._waiting[adapter_name] -= 1
+                if not self._waiting[adapter_name]:
+                    del self._waiting[adapter_name]
+            
+            if self._running == 0 or adapter_name != self._active:
+                # Start a new batch with everyone already waiting for this adapter
+                self._active = adapter_name
+                self._admit = self._waiting.get(adapter_name, 0)
+                self._condition.notify_all()
+            elif self._admit:
+                self._admit -= 1
+            self._running += 1
         
-        _model_loading = False
-        print("Response model loaded successfully")
-        return model, tokenizer
-    
-    except Exception as e:
-        _model_loading = False
-        print(f"Error loading politician model: {str(e)}")
-        print("WARNING: Using simple response generation as fallback.")
-        return None, None
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                if not self._running:
+                    self._condition.notify_all()
+
+_adapter_gate = _AdapterGate()
+
+@contextmanager
+def _use_model_and_tokenizer(politician_identity: str):
+    """
+    Use the shared response model with the adapter for the specified politician active.
+    
+    A single base model stays resident and every politician's LoRA adapter is
+    attached to it by name, so switching speakers only calls ``set_adapter``.
+    Concurrent callers during the first load wait for it rather than falling back.
+    The model is held in the registry until the block exits, so it cannot be
+    evicted mid-generation. Yields (None, None) if it is unavailable.
+    """
+    with model_registry.acquire("response", _load_response_model_and_tokenizer) as loaded:
+        if loaded is None:
+            print("WARNING: Using simple response generation as fallback.")
+            yield None, None
+        else:
+            yield _activate_adapter(*loaded, politician_identity)
+
+def _activate_adapter(model, tokenizer, politician_identity: str):
+    """Make the politician's adapter the active one; returns (None, None) if that fails."""
+    global _reported_adapters
+    
+    adapter_name = _adapter_name_for(politician_identity)
+    
+    with _adapter_lock:
+        try:
+            # Adapters that failed to preload, or were detached, are attached on use
+            if adapter_name not in model.peft_config:
+                _attach_adapter(model, adapter_name)
+            
+            if model.active_adapter != adapter_name:
+                model.set_adapter(adapter_name)
+            _adapter_last_used[adapter_name] = time.monotonic()
+            _evict_adapters(model, keep=adapter_name)
+            
+            # Report adapter sizes whenever the set of attached adapters changes
+            adapter_state = (id(model), frozenset(model.peft_config))
+            if adapter_state != _reported_adapters:
+                model_registry.set_components("response", _adapter_sizes(model))
+                _reported_adapters = adapter_state
+        except Exception as e:
+            print(f"Error switching to adapter '{adapter_name}': {str(e)}")
+            print("WARNING: Using simple response generation as fallback.")
+            return None, None
+    
+    return model, tokenizer
 
 def _generate_simple_fallback_response(prompt: str, context: str, politician_identity: str, should_deflect: bool) -> str:
     """Generate a simple fallback response if the model fails to load."""
@@ -124,17 +293,18 @@ def _generate_response_with_model(
     temperature: float = DEFAULT_TEMPERATURE
 ) -> str:
     """Generate a response using the fine-tuned model."""
-    # Get model and tokenizer
-    model, tokenizer = _get_model_and_tokenizer(politician_identity)
-    
-    # Use fallback if model loading failed
-    if model is None or tokenizer is None:
-        return _generate_simple_fallback_response(prompt, context, politician_identity, should_deflect)
+    import torch
     
-    try:
-        # Define system messages based on identity
-        if politician_identity == PoliticianIdentity.BIDEN:
-            system_message = """You are Joe Biden, 46th President of the United States. 
+    # Get model and tokenizer, held until the response is decoded
+    with _use_model_and_tokenizer(politician_identity) as (model, tokenizer):
+        # Use fallback if model loading failed
+        if model is None or tokenizer is None:
+            return _generate_simple_fallback_response(prompt, context, politician_identity, should_deflect)
+        
+        try:
+            # Define system messages based on identity
+            if politician_identity == PoliticianIdentity.BIDEN:
+                system_message = """You are Joe Biden, 46th President of the United States. 
             
 Answer as if you are Joe Biden, using his authentic speaking style with these characteristics:
 1. Use verbal fillers and phrases like "Look, folks", "Here's the deal", "I'm not joking", "Let me be clear"
@@ -147,69 +317,69 @@ Answer as if you are Joe Biden, using his authentic speaking style with these ch
 8. Express your genuine empathy for everyday struggles
 
 Your response should sound like natural speech that a real person would say, not a written essay."""
-            if should_deflect:
-                system_message += " You need to deflect this question diplomatically, as politicians often do when faced with difficult or hostile questions. Use a personal story or shift to a related topic you're more comfortable discussing."
-        elif politician_identity == PoliticianIdentity.TRUMP:
-            system_message = "You are Donald Trump, 45th President of the United States. Answer as if you are Donald Trump, using his speaking style, mannerisms, and policy positions."
-            if should_deflect:
-                system_message += " You need to deflect this question in your characteristic style, as you often do when faced with difficult or hostile questions."
-        
-        # Format the prompt with context
-        formatted_prompt = f"<s>[INST] {system_message}\n\nContext Information: {context}\n\nUser Question: {prompt} [/INST]"
-        
-        # Set politician-specific generation parameters
-        if politician_identity == PoliticianIdentity.BIDEN:
-            temperature = BIDEN_TEMPERATURE
-            top_p = BIDEN_TOP_P
-        else:
-            temperature = TRUMP_TEMPERATURE
-            top_p = TRUMP_TOP_P
-        
-        inputs = tokenizer(formatted_prompt, return_tensors="pt").to(model.device)
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_length=max_length,
-                num_return_sequences=1,
-                temperature=temperature,
-                do_sample=True,
-                pad_token_id=tokenizer.pad_token_id,
-                use_cache=True,
-                top_p=top_p
-            )
-        
-        # Decode and clean response
-        response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        response = response.split("[/INST]")[-1].strip()
-        
-        # Enhanced sanitization to clean up the response
-        import re
-        
-        # Remove any system tags
-        response = re.sub(r'<\/?SYS>|<\/?sys>', '', response)
-        
-        # Remove any remaining instruction markers or formatting tags
-        response = re.sub(r'<\/?[A-Za-z]+>|<<.*?>>', '', response)
-        
-        # Remove echoed identities or content patterns that might appear
-        response = re.sub(r'(BIDEN|TRUMP|User):\s.*?(\n|$)', '', response, flags=re.IGNORECASE)
-        
-        # Remove any lines that look like they're from the prompt
-        response = re.sub(r'User Question:.*?(\n|$)', '', response)
-        response = re.sub(r'Context Information:.*?(\n|$)', '', response)
-        
-        # For Biden, clean up responses that still look like bullet points or numbered lists
-        if politician_identity == PoliticianIdentity.BIDEN and (response.startswith("1.") or response.startswith("•")):
-            lines = response.split("\n")
-            if len(lines) > 1:
-                # Convert numbered/bulleted lists to conversational flow
-                response = "Look, here's what I believe. " + " ".join([line.strip().replace("1.", "First,").replace("2.", "Second,").replace("3.", "Third,").replace("4.", "Fourth,").replace("5.", "And finally,").replace("•", "") for line in lines])
+                if should_deflect:
+                    system_message += " You need to deflect this question diplomatically, as politicians often do when faced with difficult or hostile questions. Use a personal story or shift to a related topic you're more comfortable discussing."
+            elif politician_identity == PoliticianIdentity.TRUMP:
+                system_message = "You are Donald Trump, 45th President of the United States. Answer as if you are Donald Trump, using his speaking style, mannerisms, and policy positions."
+                if should_deflect:
+                    system_message += " You need to deflect this question in your characteristic style, as you often do when faced with difficult or hostile questions."
+            
+            # Format the prompt with context
+            formatted_prompt = f"<s>[INST] {system_message}\n\nContext Information: {context}\n\nUser Question: {prompt} [/INST]"
+            
+            # Set politician-specific generation parameters
+            if politician_identity == PoliticianIdentity.BIDEN:
+                temperature = BIDEN_TEMPERATURE
+                top_p = BIDEN_TOP_P
+            else:
+                temperature = TRUMP_TEMPERATURE
+                top_p = TRUMP_TOP_P
+            
+            inputs = tokenizer(formatted_prompt, return_tensors="pt").to(model.device)
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs,
+                    max_length=max_length,
+                    num_return_sequences=1,
+                    temperature=temperature,
+                    do_sample=True,
+                    pad_token_id=tokenizer.pad_token_id,
+                    use_cache=True,
+                    top_p=top_p
+                )
+            
+            # Decode and clean response
+            response = tokenizer.decode(outputs[0], skip_special_tokens=True)
+            response = response.split("[/INST]")[-1].strip()
+            
+            # Enhanced sanitization to clean up the response
+            import re
+            
+            # Remove any system tags
+            response = re.sub(r'<\/?SYS>|<\/?sys>', '', response)
+            
+            # Remove any remaining instruction markers or formatting tags
+            response = re.sub(r'<\/?[A-Za-z]+>|<<.*?>>', '', response)
+            
+            # Remove echoed identities or content patterns that might appear
+            response = re.sub(r'(BIDEN|TRUMP|User):\s.*?(\n|$)', '', response, flags=re.IGNORECASE)
+            
+            # Remove any lines that look like they're from the prompt
+            response = re.sub(r'User Question:.*?(\n|$)', '', response)
+            response = re.sub(r'Context Information:.*?(\n|$)', '', response)
+            
+            # For Biden, clean up responses that still look like bullet points or numbered lists
+            if politician_identity == PoliticianIdentity.BIDEN and (response.startswith("1.") or response.startswith("•")):
+                lines = response.split("\n")
+                if len(lines) > 1:
+                    # Convert numbered/bulleted lists to conversational flow
+                    response = "Look, here's what I believe. " + " ".join([line.strip().replace("1.", "First,").replace("2.", "Second,").replace("3.", "Third,").replace("4.", "Fourth,").replace("5.", "And finally,").replace("•", "") for line in lines])
+            
+            return response.strip()
         
-        return response.strip()
-    
-    except Exception as e:
-        print(f"Error during response generation: {str(e)}")
-        return _generate_simple_fallback_response(prompt, context, politician_identity, should_deflect)
+        except Exception as e:
+            print(f"Error during response generation: {str(e)}")
+            return _generate_simple_fallback_response(prompt, context, politician_identity, should_deflect)
 
 def generate_response(state: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
     """
@@ -221,6 +391,8 @@ def generate_response(state: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
     Returns:
         Generated response text or a dictionary containing the response
     """
+    import torch
+    
     # Extract input parameters
     user_input = state.get("user_input", "")
     politician_identity = state.get("politician_identity", "")
@@ -231,36 +403,65 @@ def generate_response(state: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
     max_new_tokens = state.get("max_new_tokens", 1024)  # Default to 1024
     max_length = state.get("max_length", 1536)  # Default to 1536
     
-    # Load base model with personality adapter
-    model, tokenizer = _get_model_and_tokenizer(politician_identity)
+    # Stream text to the caller's callback as it is generated, timing the first chunk
+    on_token = state.get("on_token")
+    stop_event = state.get("stop_event")
+    start = time.perf_counter()
+    first_token_time = []
     
-    # Generate the prompt
-    prompt = generate_prompt(user_input, context, politician_identity, should_deflect)
+    def emit(text: str):
+        if not first_token_time:
+            first_token_time.append(time.perf_counter() - start)
+        on_token(text)
     
-    # Generate response
-    try:
-        response = generate(
-            model=model,
-            tokenizer=tokenizer,
-            prompt=prompt,
-            max_new_tokens=max_new_tokens,
-            max_length=max_length
-        )
-    except torch.cuda.OutOfMemoryError:
-        # Fallback to a smaller generation if we run out of memory
-        print("GPU memory error, attempting reduced generation parameters")
-        response = generate(
-            model=model,
-            tokenizer=tokenizer,
-            prompt=prompt,
-            max_new_tokens=min(max_new_tokens, 512),
-            max_length=min(max_length, 1024),
-            temperature=0.7,  # Lower temperature for more focused output
-            top_p=0.9  # Slightly more focused sampling
-        )
+    # Keep the politician's adapter active for the whole generation, since the
+    # base model is shared between identities, and hold the model so it is not
+    # evicted. Generations for the same politician run concurrently.
+    with _adapter_gate.use(_adapter_name_for(politician_identity)), \
+            _use_model_and_tokenizer(politician_identity) as (model, tokenizer):
+        # Generate the prompt
+        prompt = generate_prompt(user_input, context, politician_identity, should_deflect)
     
-    # Return the result
-    return {"response": response, "prompt": prompt}
+        # Generate response
+        try:
+            response = generate(
+                model=model,
+                tokenizer=tokenizer,
+                prompt=prompt,
+                max_new_tokens=max_new_tokens,
+                max_length=max_length,
+                on_token=emit if on_token else None,
+                stop_event=stop_event
+            )
+        except torch.cuda.OutOfMemoryError:
+            # Streamed text cannot be taken back, and a retry samples a different
+            # response, so once anything was sent the caller gets the error instead
+            if first_token_time:
+                print("GPU memory error after streaming started; not retrying")
+                raise
+            
+            # Fallback to a smaller generation if we run out of memory
+            print("GPU memory error, attempting reduced generation parameters")
+            response = generate(
+                model=model,
+                tokenizer=tokenizer,
+                prompt=prompt,
+                max_new_tokens=min(max_new_tokens, 512),
+                max_length=min(max_length, 1024),
+                temperature=0.7,  # Lower temperature for more focused output
+                top_p=0.9,  # Slightly more focused sampling
+                on_token=emit if on_token else None,
+                stop_event=stop_event
+            )
+    
+    if not on_token:
+        return {"response": response, "prompt": prompt}
+    
+    # Responses that were not generated token by token arrive as a single chunk
+    if not first_token_time:
+        emit(response)
+    timings = {"time_to_first_token": first_token_time[0], "total": time.perf_counter() - start}
+    return {"response": response, "prompt": prompt, "response_timings": timings}
 
 def generate_prompt(
     user_input: str, 
@@ -305,6 +506,117 @@ def generate_prompt(
     
     return prompt
 
+class StreamCleaner:
+    """
+    Streaming version of the response cleanup.
+    
+    Removes prompt markers from text as it arrives, holding back any trailing
+    characters that could be the start of a marker until the next chunk shows
+    whether they are, and drops leading whitespace. Unlike the non-streaming
+    cleanup, text before a marker the model emits is kept, since it has
+    already been shown to the user.
+    """
+    
+    def __init__(self, markers=_STREAM_MARKERS):
+        self.markers = markers
+        self._pending = ""
+        self._started = False
+    
+    def feed(self, text: str) -> str:
+        """Add generated text; returns the part that is safe to show."""
+        pending = self._pending + text
+        for marker in self.markers:
+            pending = pending.replace(marker, "")
+        
+        hold = 0
+        for marker in self.markers:
+            for length in range(min(len(marker) - 1, len(pending)), hold, -1):
+                if pending.endswith(marker[:length]):
+                    hold = length
+                    break
+        
+        self._pending = pending[len(pending) - hold:] if hold else ""
+        return self._emit(pending[:len(pending) - hold])
+    
+    def flush(self) -> str:
+        """Return any held-back text once generation has finished."""
+        pending, self._pending = self._pending, ""
+        return self._emit(pending)
+    
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+def _stop_criteria(*events: threading.Event):
+    """Stopping criteria that end generation as soon as any of ``events`` is set."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+    
+    class StopOnEvent(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            stop = any(event.is_set() for event in events)
+            return torch.full((input_ids.shape[0],), stop, dtype=torch.bool, device=input_ids.device)
+    
+    return StoppingCriteriaList([StopOnEvent()])
+
+def _stream_generate(
+    model,
+    tokenizer,
+    inputs,
+    generation_kwargs: Dict[str, Any],
+    on_token: Callable[[str], None],
+    stop_event: Optional[threading.Event] = None
+) -> str:
+    """
+    Run ``model.generate`` on a worker thread, passing cleaned text to ``on_token`` as it arrives.
+    
+    Generation stops early when ``stop_event`` is set or when ``on_token``
+    raises; either way the worker has finished with the model by the time this
+    returns, so the caller can safely release it.
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+    
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    reader_done = threading.Event()
+    events = (reader_done, stop_event) if stop_event is not None else (reader_done,)
+    generation_kwargs = {**generation_kwargs, "stopping_criteria": _stop_criteria(*events)}
+    errors = []
+    
+    def run():
+        try:
+            with torch.no_grad():
+                model.generate(**inputs, **generation_kwargs, streamer=streamer)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()  # Unblock the reader
+    
+    thread = threading.Thread(target=run, name="response-generate", daemon=True)
+    thread.start()
+    
+    cleaner = StreamCleaner()
+    chunks: List[str] = []
+    try:
+        for text in streamer:
+            cleaned = cleaner.feed(text)
+            if cleaned:
+                chunks.append(cleaned)
+                on_token(cleaned)
+        tail = cleaner.flush()
+        if tail:
+            chunks.append(tail)
+            on_token(tail)
+    finally:
+        # If the reader stopped early, stop generating before the model is released
+        reader_done.set()
+        thread.join()
+    
+    if errors:
+        raise errors[0]
+    return "".join(chunks).strip()
+
 def generate(
     model, 
     tokenizer, 
@@ -312,12 +624,22 @@ def generate(
     max_new_tokens: int = 1024, 
     max_length: int = 1536,
     temperature: float = None, 
-    top_p: float = None
+    top_p: float = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    stop_event: Optional[threading.Event] = None
 ) -> str:
-    """Generate text using the model and tokenizer."""
+    """
+    Generate text using the model and tokenizer.
+    
+    When ``on_token`` is given, text is streamed to it as it is generated and
+    cleaned with ``StreamCleaner``; the full response is still returned.
+    Setting ``stop_event`` ends generation early with the text produced so far.
+    """
     if model is None or tokenizer is None:
         return "Error: Model or tokenizer not available."
     
+    import torch
+    
     # Use provided parameters or defaults from current configuration
     temperature = temperature or DEFAULT_TEMPERATURE
     
@@ -332,17 +654,24 @@ def generate(
     
     # Generate the response
     inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    generation_kwargs = {
+        "max_new_tokens": max_new_tokens,
+        "max_length": max_length,
+        "do_sample": True,
+        "temperature": temperature,
+        "top_p": top_p,
+        "pad_token_id": tokenizer.pad_token_id,
+        "use_cache": True
+    }
+    
+    if on_token is not None:
+        return _stream_generate(model, tokenizer, inputs, generation_kwargs, on_token, stop_event)
+    
+    if stop_event is not None:
+        generation_kwargs["stopping_criteria"] = _stop_criteria(stop_event)
+    
     with torch.no_grad():
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=max_new_tokens,
-            max_length=max_length,
-            do_sample=True,
-            temperature=temperature,
-            top_p=top_p,
-            pad_token_id=tokenizer.pad_token_id,
-            use_cache=True
-        )
+        outputs = model.generate(**inputs, **generation_kwargs)
     
     # Decode and clean up
     response = tokenizer.decode(outputs[0], skip_special_tokens=True)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Fast Topic and Entity Extractor for the AI Politician system.
+
+A deterministic alternative to asking TinyLlama for a topic list. A policy
+taxonomy (phrases and synonyms per policy area) and a gazetteer of people,
+places, bills and organizations are compiled once into an Aho-Corasick
+automaton, so a request is scanned in a single pass over its characters
+regardless of how many patterns there are. Matches only count on word
+boundaries, and overlapping matches keep the longest phrase
+("inflation reduction act" wins over "inflation").
+
+``extract_topics`` returns structured ``main_topics``, ``policy_areas`` and
+``entities`` and typically runs well under a millisecond.
+"""
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# Policy area -> phrases and synonyms that indicate it
+POLICY_TAXONOMY = {
+    "economy": [
+        "economy", "economic", "inflation", "recession", "jobs", "job growth", "unemployment",
+        "wages", "minimum wage", "cost of living", "prices", "gas prices", "interest rates",
+        "federal reserve", "the fed", "stock market", "gdp", "deficit", "national debt",
+        "debt ceiling", "budget", "spending", "stimulus", "bidenomics", "supply chain",
+        "manufacturing", "small business", "middle class", "student loans", "student debt",
+    ],
+    "taxes": [
+        "tax", "taxes", "taxation", "tax cuts", "tax cut", "tax hike", "tax increase", "irs",
+        "corporate tax", "income tax", "capital gains", "billionaire tax", "wealth tax",
+    ],
+    "trade": [
+        "trade", "tariff", "tariffs", "trade war", "trade deal", "trade deficit", "nafta",
+        "usmca", "imports", "exports", "outsourcing",
+    ],
+    "healthcare": [
+        "healthcare", "health care", "health insurance", "medicare", "medicaid", "obamacare",
+        "affordable care act", "aca", "prescription drugs", "drug prices", "insulin",
+        "pre-existing conditions", "public option", "hospitals", "opioid", "opioids",
+        "fentanyl", "covid", "covid-19", "pandemic", "vaccine", "vaccines", "mental health",
+    ],
+    "immigration": [
+        "immigration", "immigrants", "immigrant", "border", "southern border", "border wall",
+        "the wall", "border security", "asylum", "migrants", "migrant", "illegal immigration",
+        "undocumented", "deportation", "deportations", "daca", "dreamers", "ice",
+        "border patrol", "title 42", "sanctuary cities", "refugees",
+    ],
+    "climate and energy": [
+        "climate", "climate change", "global warming", "green new deal", "renewable energy",
+        "clean energy", "solar", "wind power", "electric vehicles", "evs", "fossil fuels",
+        "oil", "drilling", "fracking", "coal", "natural gas", "keystone pipeline", "pipeline",
+        "paris agreement", "paris climate accord", "emissions", "carbon", "energy independence",
+        "energy",
+    ],
+    "education": [
+        "education", "schools", "school", "teachers", "college", "universities", "tuition",
+        "school choice", "charter schools", "student loan forgiveness", "head start",
+    ],
+    "gun policy": [
+        "gun", "guns", "gun control", "gun violence", "second amendment", "2nd amendment",
+        "assault weapons", "background checks", "nra", "mass shooting", "mass shootings",
+        "red flag laws",
+    ],
+    "abortion": [
+        "abortion", "pro-life", "pro-choice", "roe", "roe v. wade", "roe v wade",
+        "reproductive rights", "planned parenthood", "dobbs",
+    ],
+    "foreign policy": [
+        "foreign policy", "foreign", "diplomacy", "allies", "sanctions", "war", "ceasefire",
+        "middle east", "hamas", "hezbollah", "iran nuclear deal", "north korea", "isis",
+        "terrorism", "afghanistan withdrawal",
+    ],
+    "defense": [
+        "defense", "military", "troops", "veterans", "pentagon", "armed forces",
+        "national security", "nuclear weapons", "space force",
+    ],
+    "crime and justice": [
+        "crime", "police", "policing", "defund the police", "criminal justice", "prisons",
+        "law and order", "violent crime", "death penalty", "supreme court", "justice department",
+        "doj", "fbi", "indictment", "indictments", "prosecution",
+    ],
+    "elections and democracy": [
+        "election", "elections", "voting", "voter id", "voting rights", "mail-in ballots",
+        "election fraud", "rigged election", "stolen election", "january 6", "jan 6",
+        "capitol riot", "democracy", "electoral college", "impeachment",
+    ],
+    "social security and retirement": [
+        "social security", "retirement", "pensions", "seniors",
+    ],
+    "infrastructure": [
+        "infrastructure", "roads", "bridges", "broadband", "railways", "amtrak", "public transit",
+    ],
+    "technology": [
+        "technology", "big tech", "social media", "artificial intelligence", "ai", "tiktok",
+        "semiconductors", "chips", "antitrust", "censorship", "cybersecurity",
+    ],
+    "civil rights": [
+        "civil rights", "racial justice", "racism", "lgbtq", "transgender", "same-sex marriage",
+        "equal pay", "affirmative action", "diversity", "dei",
+    ],
+    "housing": [
+        "housing", "rent", "mortgage", "mortgages", "homelessness", "affordable housing",
+    ],
+}
+
+# Entity type -> canonical name -> aliases (the canonical name is always matched)
+ENTITIES = {
+    "person": {
+        "Joe Biden": ["biden", "joe biden", "president biden", "sleepy joe"],
+        "Donald Trump": ["trump", "donald trump", "president trump", "the donald"],
+        "Kamala Harris": ["kamala harris", "harris", "vice president harris"],
+        "Barack Obama": ["obama", "barack obama"],
+        "Hillary Clinton": ["hillary clinton", "hillary"],
+        "Bill Clinton": ["bill clinton"],
+        "Mike Pence": ["pence", "mike pence"],
+        "Vladimir Putin": ["putin", "vladimir putin"],
+        "Xi Jinping": ["xi jinping", "president xi"],
+        "Volodymyr Zelensky": ["zelensky", "zelenskyy", "volodymyr zelensky"],
+        "Benjamin Netanyahu": ["netanyahu", "bibi"],
+        "Kim Jong Un": ["kim jong un", "kim jong-un"],
+        "Nancy Pelosi": ["pelosi", "nancy pelosi"],
+        "Mitch McConnell": ["mcconnell", "mitch mcconnell"],
+        "Ron DeSantis": ["desantis", "ron desantis"],
+        "Bernie Sanders": ["bernie", "bernie sanders"],
+        "Hunter Biden": ["hunter biden", "hunter"],
+        "Elon Musk": ["elon musk", "musk"],
+        "Jerome Powell": ["jerome powell", "powell"],
+        "JD Vance": ["jd vance", "j.d. vance", "vance"],
+    },
+    "place": {
+        "United States": ["america", "united states", "usa", "u.s."],
+        "China": ["china", "chinese", "beijing"],
+        "Russia": ["russia", "russian", "moscow", "kremlin"],
+        "Ukraine": ["ukraine", "ukrainian", "kyiv"],
+        "Israel": ["israel", "israeli"],
+        "Gaza": ["gaza", "palestine", "palestinian", "west bank"],
+        "Iran": ["iran", "iranian", "tehran"],
+        "Mexico": ["mexico", "mexican"],
+        "Canada": ["canada", "canadian"],
+        "Afghanistan": ["afghanistan", "kabul"],
+        "North Korea": ["north korea", "pyongyang"],
+        "Taiwan": ["taiwan"],
+        "Europe": ["europe", "european union", "eu"],
+        "Washington": ["washington", "washington dc", "d.c."],
+        "Texas": ["texas"],
+        "Florida": ["florida"],
+        "California": ["california"],
+        "Pennsylvania": ["pennsylvania", "scranton"],
+        "Arizona": ["arizona"],
+        "Georgia": ["georgia"],
+        "Michigan": ["michigan"],
+        "Wisconsin": ["wisconsin"],
+    },
+    "bill": {
+        "Inflation Reduction Act": ["inflation reduction act", "ira"],
+        "Infrastructure Investment and Jobs Act": [
+            "infrastructure investment and jobs act", "bipartisan infrastructure law",
+            "infrastructure bill", "infrastructure law",
+        ],
+        "CHIPS and Science Act": ["chips act", "chips and science act"],
+        "American Rescue Plan": ["american rescue plan", "rescue plan"],
+        "Tax Cuts and Jobs Act": ["tax cuts and jobs act", "trump tax cuts"],
+        "Affordable Care Act": ["affordable care act", "obamacare", "aca"],
+        "Build Back Better": ["build back better"],
+        "First Step Act": ["first step act"],
+        "CARES Act": ["cares act"],
+        "Bipartisan Safer Communities Act": ["bipartisan safer communities act", "safer communities act"],
+        "PACT Act": ["pact act"],
+        "Green New Deal": ["green new deal"],
+        "Paris Agreement": ["paris agreement", "paris climate accord", "paris accord"],
+        "USMCA": ["usmca"],
+        "NAFTA": ["nafta"],
+    },
+    "organization": {
+        "NATO": ["nato"],
+        "United Nations": ["united nations", "u.n."],
+        "Federal Reserve": ["federal reserve", "the fed"],
+        "Congress": ["congress", "senate", "house of representatives"],
+        "Supreme Court": ["supreme court", "scotus"],
+        "Democratic Party": ["democrats", "democratic party", "dems"],
+        "Republican Party": ["republicans", "republican party", "gop", "maga"],
+        "FBI": ["fbi"],
+        "IRS": ["irs"],
+        "Hamas": ["hamas"],
+        "World Health Organization": ["world health organization", "who"],
+    },
+}
+
+# Aliases that are also common English words: acronyms must be written in
+# capitals ("IRA", not "ira") and names must be capitalized ("Hunter")
+ACRONYM_ALIASES = {"who", "ira", "ice", "aca", "ai", "eu", "dei", "evs"}
+PROPER_NOUN_ALIASES = {"hunter", "georgia", "vance", "harris", "powell", "musk", "bibi"}
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over lowercase patterns, each carrying a payload."""
+
+    def __init__(self, patterns: List[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, payload in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(pattern), payload))
+
+        # Breadth-first pass to link each state to its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, payload) for every pattern occurrence in ``text``."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._output[state]:
+                yield index - length + 1, index + 1, payload
+
+
+def _build_automaton() -> AhoCorasick:
+    patterns = []
+    for area, phrases in POLICY_TAXONOMY.items():
+        for phrase in phrases:
+            patterns.append((phrase.lower(), ("policy", area)))
+    for entity_type, entities in ENTITIES.items():
+        for name, aliases in entities.items():
+            for alias in set([name.lower()] + [alias.lower() for alias in aliases]):
+                patterns.append((alias, (entity_type, name)))
+    return AhoCorasick(patterns)
+
+
+# Compiled once at import; building takes a few milliseconds
+_automaton = _build_automaton()
+
+
+def _on_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not _WORD_CHAR.match(before) and not _WORD_CHAR.match(after)
+
+
+def _lower_same_length(text: str) -> str:
+    """
+    Lowercase ``text`` one character at a time, keeping any character whose
+    lowercase form has a different length (e.g. "İ"), so offsets found in the
+    result index the same characters in ``text``.
+    """
+    return "".join(lower if len(lower) == 1 else char for char, lower in ((c, c.lower()) for c in text))
+
+
+def _longest_matches(text: str, lowered: str) -> List[Tuple[int, int, Tuple[str, str]]]:
+    """Whole-word matches, keeping the longest where matches overlap."""
+    candidates = []
+    for start, end, payload in _automaton.iter_matches(lowered):
+        if not _on_word_boundary(lowered, start, end):
+            continue
+        alias = lowered[start:end]
+        if alias in ACRONYM_ALIASES and not text[start:end].rstrip("s").isupper():
+            continue
+        if alias in PROPER_NOUN_ALIASES and not text[start].isupper():
+            continue
+        candidates.append((start, end, payload))
+
+    candidates.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+    selected = []
+    covered_until = 0
+    for start, end, payload in candidates:
+        if start >= covered_until:
+            selected.append((start, end, payload))
+            covered_until = end
+        elif selected and (start, end) == selected[-1][:2]:
+            # Same span, different payload (e.g. a phrase that is both a policy and a bill)
+            selected.append((start, end, payload))
+    return selected
+
+
+def extract_topics(prompt: str, max_topics: int = 3) -> Dict[str, Any]:
+    """
+    Extract policy areas and named entities from a user prompt.
+
+    Args:
+        prompt: The user input
+        max_topics: Maximum number of main topics to report
+
+    Returns:
+        Dict with ``main_topics`` (most mentioned policy areas, falling back to
+        entities), ``policy_areas`` (every matched area, most mentioned first)
+        and ``entities`` (dicts with name and type, in order of appearance)
+    """
+    area_counts: Dict[str, int] = {}
+    first_seen: Dict[str, int] = {}
+    entities: List[Dict[str, str]] = []
+    seen_entities = set()
+
+    for start, _, (kind, value) in _longest_matches(prompt, _lower_same_length(prompt)):
+        if kind == "policy":
+            area_counts[value] = area_counts.get(value, 0) + 1
+            first_seen.setdefault(value, start)
+        elif value not in seen_entities:
+            seen_entities.add(value)
+            entities.append({"name": value, "type": kind})
+
+    policy_areas = sorted(area_counts, key=lambda area: (-area_counts[area], first_seen[area]))
+    main_topics = policy_areas[:max_topics] or [entity["name"] for entity in entities[:max_topics]]
+
+    return {
+        "main_topics": main_topics,
+        "policy_areas": policy_areas,
+        "entities": entities,
+    }
+
+
+def format_topics(topics: Dict[str, Any]) -> str:
+    """Render extracted topics as the text block placed in the prompt context."""
+    lines = [f"Main topic(s): {', '.join(topics['main_topics']) or 'general question'}"]
+    if topics["policy_areas"]:
+        lines.append(f"Policy areas: {', '.join(topics['policy_areas'])}")
+    if topics["entities"]:
+        lines.append("Key entities: " + ", ".join(f"{e['name']} ({e['type']})" for e in topics["entities"]))
+    return "\n".join(lines)
+
+
+def has_topics(topics: Optional[Dict[str, Any]]) -> bool:
+    """Whether the extractor found anything to go on."""
+    return bool(topics and (topics["policy_areas"] or topics["entities"]))
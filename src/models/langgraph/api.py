@@ -5,9 +5,15 @@ This module exposes the LangGraph workflow as a REST API.
 """
 import sys
 import os
+import json
+import time
+import asyncio
+import threading
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
+from typing import Any
 from dotenv import load_dotenv
 
 # Add the project root to the Python path
@@ -18,6 +24,21 @@ sys.path.insert(0, str(root_dir))
 load_dotenv()
 
 from src.models.langgraph.workflow import process_user_input, PoliticianInput, PoliticianOutput
+from src.models.langgraph.utils.model_registry import model_registry
+from src.models.langgraph.utils.bounded_executor import BoundedExecutor
+
+# Load every model at startup so the readiness endpoint only reports ready once they are resident
+PRELOAD_MODELS = os.environ.get("AI_POLITICIAN_PRELOAD_MODELS", "0") == "1"
+
+# Chat requests run on a bounded worker pool so inference never blocks the event loop
+MAX_CONCURRENCY = int(os.environ.get("AI_POLITICIAN_MAX_CONCURRENCY", "2"))
+MAX_QUEUE = int(os.environ.get("AI_POLITICIAN_MAX_QUEUE", "16"))
+REQUEST_TIMEOUT = float(os.environ.get("AI_POLITICIAN_REQUEST_TIMEOUT", "120"))
+
+# Seconds between checks for a disconnected streaming client
+DISCONNECT_POLL_INTERVAL = 1.0
+
+chat_executor = BoundedExecutor(max_workers=MAX_CONCURRENCY, max_queue=MAX_QUEUE, name="chat-worker")
 
 # Create FastAPI app
 app = FastAPI(
@@ -35,22 +56,159 @@ async def root():
         "docs": "/docs"
     }
 
+@app.on_event("startup")
+def preload_models():
+    """Start loading the models in the background when preloading is enabled."""
+    if PRELOAD_MODELS:
+        threading.Thread(target=model_registry.preload, name="model-preload", daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_chat_executor():
+    """Drop queued chat requests when the server stops."""
+    chat_executor.shutdown()
+
+@app.get("/api/ready")
+async def ready():
+    """
+    Readiness check based on the state of each model.
+    
+    Returns 503 while a model is loading or after one failed to load (and, when
+    models are preloaded, until all of them are ready), along with per-model
+    state, load time and memory.
+    """
+    is_ready = model_registry.is_ready(require_loaded=PRELOAD_MODELS)
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "models": model_registry.status()}
+    )
+
+@app.get("/api/models")
+async def models():
+    """Resident models and adapters with their sizes, against the configured memory budgets."""
+    return model_registry.residency_report()
+
+@app.get("/api/capacity")
+async def capacity():
+    """Chat concurrency limit, running and queued requests, and outcome counts."""
+    return {**chat_executor.status(), "request_timeout": REQUEST_TIMEOUT}
+
 @app.post("/api/politician/chat", response_model=PoliticianOutput)
 async def chat(input_data: PoliticianInput):
     """
     Process a chat input through the AI Politician workflow.
     
+    The workflow runs on the chat worker pool. Returns 503 when every worker is
+    busy and the queue is full, and 504 when the request takes longer than the
+    configured timeout (a request that already started still finishes in the
+    background and holds its worker until then).
+    
     Args:
         input_data: The user input and configuration
         
     Returns:
         The politician's response and metadata
     """
+    future = chat_executor.submit(process_user_input, input_data)
+    if future is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is at capacity, try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    
     try:
-        return process_user_input(input_data)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        chat_executor.record_timeout()
+        raise HTTPException(status_code=504, detail=f"Request timed out after {REQUEST_TIMEOUT:g} seconds")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/politician/chat/stream")
+async def chat_stream(input_data: PoliticianInput, request: Request):
+    """
+    Stream a chat response as Server-Sent Events.
+    
+    Emits a ``token`` event for each piece of the response as it is generated,
+    then a ``done`` event with the full output, the time to the first token and
+    the total time (both measured from when the request arrived), or an
+    ``error`` event. Runs on the same worker pool and limits as the chat endpoint.
+    The timeout applies to the wait for the first token and to each gap between
+    tokens, not to the whole answer. Generation stops when the client
+    disconnects or the stream times out.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    stop_event = threading.Event()
+    start = time.perf_counter()
+    
+    def put(kind: str, payload: Any):
+        loop.call_soon_threadsafe(events.put_nowait, (kind, payload))
+    
+    def run():
+        try:
+            put("done", process_user_input(
+                input_data, on_token=lambda text: put("token", text), stop_event=stop_event
+            ))
+        except Exception as e:
+            put("error", str(e))
+            raise  # Count the request as failed in the executor stats
+    
+    future = chat_executor.submit(run)
+    if future is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is at capacity, try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    
+    async def event_stream():
+        first_token_time = None
+        last_event = loop.time()
+        try:
+            while True:
+                if await request.is_disconnected():
+                    return
+                try:
+                    kind, payload = await asyncio.wait_for(events.get(), timeout=DISCONNECT_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    if loop.time() - last_event < REQUEST_TIMEOUT:
+                        continue
+                    chat_executor.record_timeout()
+                    yield _sse("error", {"detail": f"No output for {REQUEST_TIMEOUT:g} seconds"})
+                    return
+                last_event = loop.time()
+                
+                if kind == "token":
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter() - start
+                    yield _sse("token", {"text": payload})
+                elif kind == "done":
+                    yield _sse("done", {
+                        **payload.dict(),
+                        "time_to_first_token": first_token_time,
+                        "total_time": time.perf_counter() - start
+                    })
+                    return
+                else:
+                    yield _sse("error", {"detail": payload})
+                    return
+        finally:
+            # Runs on completion, timeout and disconnect (including when the
+            # server closes the generator): free the worker as soon as possible
+            future.cancel()
+            stop_event.set()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/politician/identities")
 async def get_identities():
     """Get available politician identities."""
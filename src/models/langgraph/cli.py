@@ -3,6 +3,7 @@
 Command-line interface for the AI Politician LangGraph system.
 """
 import sys
+import time
 import argparse
 import json
 import logging
@@ -77,12 +78,21 @@ def chat_loop(politician_identity: str, use_rag: bool = True, debug: bool = Fals
                 trace=trace
             )
             
-            # For clean chat mode (not trace or debug), show a loading indicator
-            if not trace and not debug:
+            # Outside trace mode, print the response as it is generated
+            first_token_time = []
+            start = time.perf_counter()
+            
+            def print_token(text: str):
+                if not first_token_time:
+                    first_token_time.append(time.perf_counter() - start)
+                print(text, end="", flush=True)
+            
+            if not trace:
                 print(f"\n{politician_identity.title()}: ", end="", flush=True)
             
             # Process through the graph
-            result = process_user_input(input_data)
+            result = process_user_input(input_data, on_token=None if trace else print_token)
+            total_time = time.perf_counter() - start
             
             # Print the response based on mode
             if trace:
@@ -92,17 +102,20 @@ def chat_loop(politician_identity: str, use_rag: bool = True, debug: bool = Fals
                 print(result.response)
                 print("---------------------")
             elif debug:
-                # Debug mode - show response plus debug info
-                print(f"\n{politician_identity.title()}: {result.response}")
+                # Debug mode - the response was streamed; show debug info and latency
+                print()
                 print("\nDebug Information:")
                 print("-----------------")
                 print(format_sentiment_analysis(result.sentiment_analysis))
                 print(f"Relevant Knowledge Found: {'Yes' if result.has_knowledge else 'No'}")
                 print(f"Deflection Used: {'Yes' if result.should_deflect else 'No'}")
+                if first_token_time:
+                    print(f"Time to First Token: {first_token_time[0]:.2f}s")
+                print(f"Total Time: {total_time:.2f}s")
                 print("-----------------")
             else:
-                # Clean chat mode - just show the response like a normal conversation
-                print(result.response)
+                # Clean chat mode - the response was streamed; end the line
+                print()
             
         except KeyboardInterrupt:
             print("\nExiting chat...")
@@ -34,26 +34,70 @@ CONTEXT_LLM_MODEL_ID = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"  # Small, fast model
 
 USE_4BIT_QUANTIZATION = True  # Set to True to reduce VRAM usage
 
+# Topic extraction strategy for the context agent:
+# - "fast": compiled keyword/entity matcher only (sub-millisecond)
+# - "llm": the context LLM above
+# - "cascade": fast matcher, escalating to the LLM when it finds nothing
+CONTEXT_EXTRACTOR = os.environ.get("CONTEXT_EXTRACTOR", "fast")
+
 # Flag for using OpenAI (now disabled by default)
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 HAS_OPENAI = False  # Explicitly disabled regardless of API key presence
 
+# Context extraction and RAG retrieval run concurrently on a bounded executor
+CONTEXT_MAX_WORKERS = int(os.environ.get("CONTEXT_MAX_WORKERS", "4"))
+
+# Sentiment classifier backend: "torch" (eager PyTorch) or "onnx" (onnxruntime,
+# dynamically quantized to int8 unless SENTIMENT_ONNX_QUANTIZE=0)
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "torch")
+SENTIMENT_ONNX_MODEL_DIR = os.environ.get("SENTIMENT_ONNX_MODEL_DIR", "/opt/models/sentiment_onnx")
+SENTIMENT_ONNX_QUANTIZE = os.environ.get("SENTIMENT_ONNX_QUANTIZE", "1") != "0"
+SENTIMENT_ONNX_THREADS = int(os.environ.get("SENTIMENT_ONNX_THREADS", "0")) or None
+
+# Sentiment analysis mode:
+# - "model": run the transformer classifier on every input
+# - "cascade": lexicon rules first, the classifier only when the rules are not confident
+SENTIMENT_MODE = os.environ.get("SENTIMENT_MODE", "model")
+
+# Sentiment inference batching across concurrent requests
+SENTIMENT_BATCHING = os.environ.get("SENTIMENT_BATCHING", "1") == "1"
+SENTIMENT_MAX_BATCH_SIZE = int(os.environ.get("SENTIMENT_MAX_BATCH_SIZE", "16"))
+SENTIMENT_MAX_WAIT_MS = float(os.environ.get("SENTIMENT_MAX_WAIT_MS", "5"))
+
+# Inputs longer than one classifier window are scored as overlapping windows
+# (in one batch) instead of being truncated; the window cap bounds the cost
+SENTIMENT_WINDOWING = os.environ.get("SENTIMENT_WINDOWING", "1") == "1"
+SENTIMENT_WINDOW_TOKENS = int(os.environ.get("SENTIMENT_WINDOW_TOKENS", "510"))  # RoBERTa's 512 minus special tokens
+SENTIMENT_WINDOW_OVERLAP = int(os.environ.get("SENTIMENT_WINDOW_OVERLAP", "128"))
+SENTIMENT_MAX_WINDOWS = int(os.environ.get("SENTIMENT_MAX_WINDOWS", "8"))
+
 # Sentiment analysis thresholds
 SENTIMENT_DEFLECTION_THRESHOLD = -0.3  # Sentiment score below which deflection is triggered
 
 # RAG Configurations
 ENABLE_RAG = True
-try:
-    from src.data.db.utils.rag_utils import integrate_with_chat
-    HAS_RAG = True
-except ImportError:
-    HAS_RAG = False
+
+# Probe for the RAG libraries without importing them, so config-only commands
+# do not pay for loading sentence-transformers and torch
+from src.data.db.utils.rag_utils import rag_dependencies_available
+HAS_RAG = rag_dependencies_available()
+if not HAS_RAG:
     print("RAG database system not available. Running with synthetic responses.")
 
 # Paths to fine-tuned models
 BIDEN_ADAPTER_PATH = os.environ.get("BIDEN_ADAPTER_PATH", "nnat03/biden-mistral-adapter")
 TRUMP_ADAPTER_PATH = os.environ.get("TRUMP_ADAPTER_PATH", "nnat03/trump-mistral-adapter")
 
+# Named LoRA adapters attached to the shared base model (adapter name -> path)
+ADAPTER_PATHS = {
+    PoliticianIdentity.BIDEN.value: BIDEN_ADAPTER_PATH,
+    PoliticianIdentity.TRUMP.value: TRUMP_ADAPTER_PATH,
+}
+
+# Maximum LoRA adapters attached to the shared base model at once (0 for all);
+# the least recently used adapter is detached to make room for another identity
+MAX_RESIDENT_ADAPTERS = int(os.environ.get("MAX_RESIDENT_ADAPTERS", "0"))
+
 # Mistral base model
 BASE_MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.2"
 
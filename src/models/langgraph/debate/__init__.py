@@ -5,7 +5,14 @@ AI Politician Debate System
 A LangGraph-based system for simulating debates between AI politicians.
 """
 
-from src.models.langgraph.debate.workflow import run_debate, DebateInput, DebateFormat
-from src.models.langgraph.debate.cli import main as run_cli
+__all__ = ['run_debate', 'DebateInput', 'DebateFormat', 'run_cli']
 
-__all__ = ['run_debate', 'DebateInput', 'DebateFormat', 'run_cli'] 
\ No newline at end of file
+def __getattr__(name):
+    """Import the workflow lazily so importing the package (e.g. for the CLI) stays cheap."""
+    if name in ('run_debate', 'DebateInput', 'DebateFormat'):
+        from src.models.langgraph.debate import workflow
+        return getattr(workflow, name)
+    if name == 'run_cli':
+        from src.models.langgraph.debate.cli import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
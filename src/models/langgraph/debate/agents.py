@@ -20,7 +20,8 @@ sys.path.insert(0, str(root_dir))
 
 from src.models.langgraph.config import PoliticianIdentity
 from src.models.langgraph.agents.response_agent import generate_response
-from src.models.langgraph.agents.context_agent import retrieve_knowledge
+from src.models.langgraph.agents.context_agent import retrieve_knowledge, aretrieve_knowledge, retrieve_knowledge_batch
+from src.data.db.utils.context_packer import DEBATE_CONTEXT_TOKEN_BUDGET
 
 
 def moderate_debate(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -99,12 +100,17 @@ def politician_turn(state: Dict[str, Any]) -> Dict[str, Any]:
     
     # Check if we should provide knowledge for this turn
     if state["use_rag"]:
-        # Get relevant knowledge
-        knowledge = retrieve_knowledge_for_debate(
-            state["topic"], 
-            state["current_subtopic"], 
-            current_speaker
-        )
+        # Knowledge is normally prefetched for every subtopic in initialize_debate
+        knowledge_cache = result.setdefault("knowledge_cache", {})
+        speaker_knowledge = knowledge_cache.setdefault(current_speaker, {})
+        knowledge = speaker_knowledge.get(state["current_subtopic"])
+        if knowledge is None:
+            knowledge = retrieve_knowledge_for_debate(
+                state["topic"], 
+                state["current_subtopic"], 
+                current_speaker
+            )
+            speaker_knowledge[state["current_subtopic"]] = knowledge
         # Update the politician's knowledge
         result["debater_states"][current_speaker]["knowledge"] = knowledge
     
@@ -486,7 +492,41 @@ def retrieve_knowledge_for_debate(main_topic: str, subtopic: str, identity: str)
     try:
         # Combine main topic and subtopic for retrieval
         query = f"{main_topic}: {subtopic}"
-        return retrieve_knowledge(query, identity)
+        # Debate prompts already carry the transcript, so knowledge gets a smaller budget
+        return retrieve_knowledge(query, identity, token_budget=DEBATE_CONTEXT_TOKEN_BUDGET)
+    except Exception as e:
+        print(f"Error retrieving knowledge: {e}")
+        return ""
+
+
+def prefetch_debate_knowledge(main_topic: str, subtopics: List[str], participants: List[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Retrieve knowledge for every (participant, subtopic) pair up front.
+    
+    Each participant's subtopics are fetched in one batched query, so later
+    turns read knowledge from the debate state instead of retrieving it.
+    
+    Returns:
+        Dict mapping participant -> subtopic -> knowledge
+    """
+    knowledge_cache = {}
+    for identity in participants:
+        try:
+            queries = [f"{main_topic}: {subtopic}" for subtopic in subtopics]
+            knowledge = retrieve_knowledge_batch(queries, identity, token_budget=DEBATE_CONTEXT_TOKEN_BUDGET)
+            knowledge_cache[identity] = {subtopic: knowledge[query] for subtopic, query in zip(subtopics, queries)}
+        except Exception as e:
+            # Turns fall back to retrieving their own knowledge
+            print(f"Error prefetching knowledge for {identity}: {e}")
+            knowledge_cache[identity] = {}
+    return knowledge_cache
+
+
+async def aretrieve_knowledge_for_debate(main_topic: str, subtopic: str, identity: str) -> str:
+    """Async version of ``retrieve_knowledge_for_debate`` that does not block the event loop."""
+    try:
+        query = f"{main_topic}: {subtopic}"
+        return await aretrieve_knowledge(query, identity, token_budget=DEBATE_CONTEXT_TOKEN_BUDGET)
     except Exception as e:
         print(f"Error retrieving knowledge: {e}")
         return ""
@@ -20,12 +20,8 @@ import traceback
 root_dir = Path(__file__).parent.parent.parent.parent.parent.absolute()
 sys.path.insert(0, str(root_dir))
 
-from src.models.langgraph.debate.workflow import (
-    DebateInput, 
-    DebateFormat, 
-    run_debate,
-    run_simplified_debate
-)
+# The debate workflow (LangGraph and the model agents) is imported by the
+# commands that need it, so config commands start instantly
 
 
 def parse_args():
@@ -398,6 +394,13 @@ DEBATE SUMMARY:
 
 def run_command(args):
     """Run a debate session with the given arguments."""
+    from src.models.langgraph.debate.workflow import (
+        DebateInput,
+        DebateFormat,
+        run_debate,
+        run_simplified_debate
+    )
+    
     try:
         # If trace is enabled, set it in the environment
         if args.trace:
@@ -29,7 +29,8 @@ from src.models.langgraph.debate.agents import (
     manage_topic,
     generate_introduction,
     generate_transition,
-    generate_subtopics
+    generate_subtopics,
+    prefetch_debate_knowledge
 )
 
 
@@ -89,6 +90,7 @@ class DebateState(TypedDict):
     moderator_notes: List[str]
     interruption_requested: bool
     current_subtopic: str
+    knowledge_cache: Dict[str, Dict[str, str]]
 
 
 def create_debate_graph() -> StateGraph:
@@ -254,6 +256,16 @@ def initialize_debate(state: DebateState) -> DebateState:
     result["interruption_requested"] = state.get("interruption_requested", False)
     result["use_rag"] = state.get("use_rag", True)
     
+    # Prefetch knowledge for every participant and candidate subtopic, so no
+    # retrieval sits on a turn's critical path
+    result["knowledge_cache"] = state.get("knowledge_cache") or {}
+    if result["use_rag"] and not result["knowledge_cache"]:
+        subtopics = [result["current_subtopic"]] + [
+            subtopic for subtopic in generate_subtopics(result["topic"], result["current_subtopic"])
+            if subtopic != result["current_subtopic"]
+        ]
+        result["knowledge_cache"] = prefetch_debate_knowledge(result["topic"], subtopics, result["participants"])
+    
     # Add a starting timestamp if not present
     if not result.get("debate_start_time"):
         result["debate_start_time"] = datetime.now().isoformat()
@@ -346,7 +358,8 @@ def run_debate(input_data: DebateInput) -> Dict[str, Any]:
         "fact_checks": [],
         "moderator_notes": [],
         "interruption_requested": False,
-        "current_subtopic": input_data.topic
+        "current_subtopic": input_data.topic,
+        "knowledge_cache": {}
     }
     
     # Try to run the debate using LangGraph with minimal output
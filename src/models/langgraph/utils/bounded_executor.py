@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Bounded worker pool with admission control for blocking inference calls.
+
+A fixed number of worker threads run the calls; at most ``max_queue`` more
+wait for a free worker. Submissions beyond that are refused immediately so the
+caller can shed load instead of piling up requests that would time out
+anyway. Queued calls can be cancelled before they start; a call that is
+already running keeps its worker until it returns.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BoundedExecutor:
+    """Thread pool that refuses work once its workers and queue are full."""
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 16, name: str = "inference-worker"):
+        """
+        Args:
+            max_workers: Calls that may run at the same time
+            max_queue: Calls that may wait for a worker
+            name: Prefix for the worker thread names
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "cancelled": 0, "rejected": 0, "timed_out": 0}
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+        """Schedule ``fn``; returns None if every worker is busy and the queue is full."""
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                return None
+            self._admitted += 1
+
+        def run():
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        future = self._executor.submit(run)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._admitted -= 1
+            if future.cancelled():
+                self._stats["cancelled"] += 1
+            elif future.exception() is not None:
+                self._stats["failed"] += 1
+            else:
+                self._stats["completed"] += 1
+
+    def record_timeout(self):
+        """Count a call whose caller stopped waiting for it."""
+        with self._lock:
+            self._stats["timed_out"] += 1
+
+    def status(self) -> Dict[str, int]:
+        """Limits, running and queued calls, and outcome counters."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                **self._stats
+            }
+
+    def shutdown(self):
+        """Cancel queued calls and stop accepting new ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Model registry for the AI Politician LangGraph system.
+
+The context, sentiment and response agents load their models through one
+shared registry instead of each keeping a global "loading" flag. Loading is
+single-flight per model key: the first caller runs the loader and every
+concurrent caller waits on the same future, so a request that arrives while
+a model is loading gets the model rather than a fallback response.
+
+Each model is in one of four states (not_loaded, loading, ready, failed), and
+the registry records how long each load took and how much memory it used.
+``get_model_status`` feeds the API's readiness endpoint.
+
+The registry also manages residency. With a RAM and/or VRAM budget set, the
+least recently used models are unloaded to make room before (and after) a
+load, and models idle for longer than the idle timeout are unloaded by a
+background thread. An unloaded model is reloaded transparently on next use.
+Callers that run a model hold it with ``acquire``; a held model is never
+evicted, and its memory stays counted against the budgets until the last
+holder releases it.
+``residency_report`` lists what is resident and how big each item is.
+
+Configuration (environment variables):
+    MODEL_RETRY_INTERVAL: Seconds before a failed load is retried (default 30)
+    MODEL_RAM_BUDGET_MB: RAM allowed for resident models, 0 for no limit (default 0)
+    MODEL_VRAM_BUDGET_MB: GPU memory allowed for resident models, 0 for no limit (default 0)
+    MODEL_IDLE_TIMEOUT: Seconds unused before a model is unloaded, 0 to never unload (default 0)
+"""
+import gc
+import os
+import sys
+import time
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Seconds before a failed load is attempted again; callers get None until then
+MODEL_RETRY_INTERVAL = float(os.environ.get("MODEL_RETRY_INTERVAL", "30"))
+
+# Residency limits
+MB = 1024 * 1024
+MODEL_RAM_BUDGET = int(float(os.environ.get("MODEL_RAM_BUDGET_MB", "0")) * MB)
+MODEL_VRAM_BUDGET = int(float(os.environ.get("MODEL_VRAM_BUDGET_MB", "0")) * MB)
+MODEL_IDLE_TIMEOUT = float(os.environ.get("MODEL_IDLE_TIMEOUT", "0"))
+
+
+class ModelState(str, Enum):
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes, or 0 if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _gpu_allocated() -> int:
+    """Bytes allocated on CUDA devices, without importing torch if no model has."""
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            return sum(torch.cuda.memory_allocated(i) for i in range(torch.cuda.device_count()))
+    except Exception:
+        pass
+    return 0
+
+
+def _memory_footprint(value: Any) -> int:
+    """Parameter and buffer bytes reported by Hugging Face models in ``value``."""
+    items = value if isinstance(value, (tuple, list)) else (value,)
+    total = 0
+    for item in items:
+        footprint = getattr(item, "get_memory_footprint", None)
+        if callable(footprint):
+            try:
+                total += int(footprint())
+            except Exception:
+                pass
+    return total
+
+
+def _release_memory():
+    """Return freed model memory to the system (and the CUDA allocator's cache to the device)."""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+class _ModelEntry:
+    def __init__(self, key: str, loader: Optional[Callable[[], Any]] = None):
+        self.key = key
+        self.loader = loader
+        self.unloader: Optional[Callable[[Any], None]] = None
+        self.state = ModelState.NOT_LOADED
+        self.future: Optional[Future] = None
+        self.value = None
+        self.error: Optional[str] = None
+        self.failed_at = 0.0
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.memory: Dict[str, int] = {}
+        self.last_used = 0.0
+        self.in_use = 0  # holders inside ``acquire``
+        self.components: Dict[str, int] = {}  # e.g. adapter name -> bytes
+
+    @property
+    def ram_bytes(self) -> int:
+        """Estimated RAM held by the model (kept after unloading to plan the next load)."""
+        if self.memory.get("gpu_delta_bytes"):
+            return self.memory.get("rss_delta_bytes", 0)
+        return max(self.memory.get("rss_delta_bytes", 0), self.memory.get("footprint_bytes", 0))
+
+    @property
+    def vram_bytes(self) -> int:
+        """Estimated GPU memory held by the model."""
+        gpu = self.memory.get("gpu_delta_bytes", 0)
+        return max(gpu, self.memory.get("footprint_bytes", 0)) if gpu else 0
+
+    def status(self) -> Dict[str, Any]:
+        resident = self.state == ModelState.READY
+        return {
+            "state": self.state.value,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "memory": dict(self.memory),
+            "ram_bytes": self.ram_bytes if resident else 0,
+            "vram_bytes": self.vram_bytes if resident else 0,
+            "idle_seconds": time.monotonic() - self.last_used if resident else None,
+            "in_use": self.in_use,
+            "components": dict(self.components) if resident else {},
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """Thread-safe, single-flight cache of loaded models keyed by name."""
+
+    def __init__(
+        self,
+        retry_interval: float = MODEL_RETRY_INTERVAL,
+        ram_budget: int = MODEL_RAM_BUDGET,
+        vram_budget: int = MODEL_VRAM_BUDGET,
+        idle_timeout: float = MODEL_IDLE_TIMEOUT
+    ):
+        self.retry_interval = retry_interval
+        self.ram_budget = ram_budget
+        self.vram_budget = vram_budget
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, key: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None):
+        """
+        Declare a model and its loader so it shows up in readiness checks before first use.
+
+        ``unloader`` is called with the model when it is evicted, to drop any
+        references the owning agent keeps to it.
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _ModelEntry(key))
+            entry.loader = loader
+            entry.unloader = unloader
+
+    def get(self, key: str, loader: Optional[Callable[[], Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Get a loaded model, loading it if needed.
+
+        If another thread is already loading the model, wait for that load
+        instead of starting a second one.
+
+        Args:
+            key: Model name
+            loader: Callable that loads and returns the model (defaults to the registered loader)
+            timeout: Maximum seconds to wait for a load already in progress
+
+        Returns:
+            The loaded model, or None if loading failed
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _ModelEntry(key, loader))
+            if loader is not None:
+                entry.loader = loader
+
+            if entry.state == ModelState.READY:
+                entry.last_used = time.monotonic()
+                return entry.value
+            if entry.state == ModelState.FAILED and time.monotonic() - entry.failed_at < self.retry_interval:
+                return None
+
+            owner = entry.state != ModelState.LOADING
+            if owner:
+                if entry.loader is None:
+                    raise KeyError(f"No loader registered for model '{key}'")
+                entry.state = ModelState.LOADING
+                entry.error = None
+                entry.future = Future()
+            future = entry.future
+
+        if owner:
+            # Make room for the model based on its size the last time it was loaded
+            self._enforce_budget(protect=entry, incoming=entry)
+            self._load(entry, future)
+            self._enforce_budget(protect=entry)
+
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    @contextmanager
+    def acquire(
+        self,
+        key: str,
+        loader: Optional[Callable[[], Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Any]:
+        """
+        Get a loaded model and keep it resident until the block exits.
+
+        The model is skipped by budget eviction, idle unloading and ``unload``
+        while any caller holds it. Evictions that were skipped are retried once
+        the last holder releases it.
+
+        Args:
+            key: Model name
+            loader: Callable that loads and returns the model (defaults to the registered loader)
+            timeout: Maximum seconds to wait for a load already in progress
+
+        Yields:
+            The loaded model, or None if loading failed
+        """
+        entry = None
+        value = None
+        while True:
+            value = self.get(key, loader, timeout)
+            if value is None:
+                break
+            with self._lock:
+                candidate = self._entries[key]
+                # The model may have been evicted between the load and the pin
+                if candidate.state == ModelState.READY and candidate.value is value:
+                    entry = candidate
+                    entry.in_use += 1
+                    break
+
+        try:
+            yield value
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry.in_use -= 1
+                    entry.last_used = time.monotonic()
+                    released = entry.in_use == 0
+                if released:
+                    self._enforce_budget()
+
+    def _load(self, entry: _ModelEntry, future: Future):
+        rss_before = _current_rss()
+        gpu_before = _gpu_allocated()
+        start = time.perf_counter()
+
+        try:
+            value = entry.loader()
+            if value is None:
+                raise RuntimeError("loader returned no model")
+        except BaseException as e:
+            # Waiters must be released even if the load is interrupted
+            with self._lock:
+                entry.state = ModelState.FAILED
+                entry.error = str(e)
+                entry.failed_at = time.monotonic()
+                entry.load_seconds = time.perf_counter() - start
+            print(f"Model '{entry.key}' failed to load: {str(e)}")
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        load_seconds = time.perf_counter() - start
+        memory = {
+            "footprint_bytes": _memory_footprint(value),
+            "rss_delta_bytes": max(0, _current_rss() - rss_before),
+            "gpu_delta_bytes": max(0, _gpu_allocated() - gpu_before),
+        }
+        with self._lock:
+            entry.value = value
+            entry.state = ModelState.READY
+            entry.loaded_at = time.time()
+            entry.load_seconds = load_seconds
+            entry.memory = memory
+            entry.last_used = time.monotonic()
+        print(f"Model '{entry.key}' ready in {load_seconds:.1f}s")
+        future.set_result(value)
+        self._start_reaper()
+
+    def _resident_bytes(self, exclude: Optional[_ModelEntry] = None) -> Dict[str, int]:
+        resident = [e for e in self._entries.values() if e.state == ModelState.READY and e is not exclude]
+        return {
+            "ram": sum(e.ram_bytes for e in resident),
+            "vram": sum(e.vram_bytes for e in resident),
+        }
+
+    def _over_budget(self, incoming: Optional[_ModelEntry]) -> bool:
+        resident = self._resident_bytes(exclude=incoming)
+        if incoming is not None:
+            resident["ram"] += incoming.ram_bytes
+            resident["vram"] += incoming.vram_bytes
+        return bool(
+            (self.ram_budget and resident["ram"] > self.ram_budget)
+            or (self.vram_budget and resident["vram"] > self.vram_budget)
+        )
+
+    def _enforce_budget(self, protect: Optional[_ModelEntry] = None, incoming: Optional[_ModelEntry] = None):
+        """Unload least recently used models until resident memory fits the budgets."""
+        if not self.ram_budget and not self.vram_budget:
+            return
+
+        while True:
+            with self._lock:
+                if not self._over_budget(incoming):
+                    return
+                resident = [e for e in self._entries.values() if e.state == ModelState.READY and e is not protect]
+                candidates = [e for e in resident if not e.in_use]
+                if not candidates:
+                    held = [e.key for e in resident if e.in_use]
+                    if held:
+                        print(f"Over the memory budget; models in use ({', '.join(held)}) are unloaded once released")
+                    elif protect is not None and incoming is None:
+                        print(f"Model '{protect.key}' alone exceeds the memory budget; keeping it resident")
+                    return
+                victim = min(candidates, key=lambda e: e.last_used)
+            self.unload(victim.key, reason="memory budget")
+
+    def unload(self, key: str, reason: str = "requested") -> bool:
+        """
+        Unload a resident model; it is reloaded on next use.
+
+        A model held through ``acquire`` is left resident.
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.state != ModelState.READY or entry.in_use:
+                return False
+            value = entry.value
+            entry.value = None
+            entry.future = None
+            entry.state = ModelState.NOT_LOADED
+            entry.components = {}
+            unloader = entry.unloader
+
+        if unloader is not None:
+            try:
+                unloader(value)
+            except Exception as e:
+                print(f"Error unloading model '{key}': {str(e)}")
+        del value
+        _release_memory()
+        print(f"Unloaded model '{key}' ({reason})")
+        return True
+
+    def unload_idle(self, idle_timeout: Optional[float] = None) -> List[str]:
+        """Unload models not used for ``idle_timeout`` seconds; returns their keys."""
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        if not idle_timeout:
+            return []
+
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key for key, e in self._entries.items()
+                if e.state == ModelState.READY and not e.in_use and now - e.last_used > idle_timeout
+            ]
+        return [key for key in idle if self.unload(key, reason="idle")]
+
+    def _start_reaper(self):
+        """Start the background thread that unloads idle models (once, if an idle timeout is set)."""
+        if not self.idle_timeout:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_idle, name="model-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_idle(self):
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while True:
+            time.sleep(interval)
+            self.unload_idle()
+
+    def set_components(self, key: str, components: Dict[str, int]):
+        """Record the sizes of parts of a resident model (e.g. attached adapters) for reporting."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.state == ModelState.READY:
+                entry.components = dict(components)
+
+    def residency_report(self) -> Dict[str, Any]:
+        """Budgets, resident totals and per-model sizes, largest first."""
+        with self._lock:
+            totals = self._resident_bytes()
+            models = [
+                {"key": key, **entry.status()}
+                for key, entry in self._entries.items()
+            ]
+        models.sort(key=lambda m: m["ram_bytes"] + m["vram_bytes"], reverse=True)
+        return {
+            "budget": {"ram_bytes": self.ram_budget or None, "vram_bytes": self.vram_budget or None},
+            "resident": {"ram_bytes": totals["ram"], "vram_bytes": totals["vram"]},
+            "idle_timeout": self.idle_timeout or None,
+            "models": models,
+        }
+
+    def peek(self, key: str) -> Any:
+        """Return a model only if it is already loaded, without loading it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry and entry.state == ModelState.READY else None
+
+    def state(self, key: str) -> ModelState:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.state if entry else ModelState.NOT_LOADED
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State, load time and memory of every known model."""
+        with self._lock:
+            return {key: entry.status() for key, entry in self._entries.items()}
+
+    def is_ready(self, require_loaded: bool = False) -> bool:
+        """
+        Whether the models can serve requests without falling back.
+
+        Models that are loading or failed make the registry not ready. Models
+        that have never been loaded only count when ``require_loaded`` is set
+        (i.e. when they are preloaded at startup rather than loaded on first
+        use); models unloaded by the residency manager reload on next use.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        if require_loaded:
+            return bool(entries) and all(
+                e.state == ModelState.READY or (e.state == ModelState.NOT_LOADED and e.loaded_at is not None)
+                for e in entries
+            )
+        return all(e.state in (ModelState.READY, ModelState.NOT_LOADED) for e in entries)
+
+    def preload(self, keys: Optional[list] = None) -> Dict[str, bool]:
+        """Load registered models (all of them by default); returns whether each is ready."""
+        with self._lock:
+            keys = list(self._entries) if keys is None else keys
+        return {key: self.get(key) is not None for key in keys}
+
+
+# Registry shared by all agents in this process
+model_registry = ModelRegistry()
+
+
+def get_model_status() -> Dict[str, Dict[str, Any]]:
+    """Status of every model known to the shared registry."""
+    return model_registry.status()
+
+
+def get_residency_report() -> Dict[str, Any]:
+    """What the shared registry holds in memory and how big each item is."""
+    return model_registry.residency_report()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime backend for the sentiment classifier.
+
+Exports the RoBERTa sentiment model to ONNX, optionally applies dynamic int8
+quantization, and runs it with onnxruntime on CPU. ``OnnxSequenceClassifier``
+returns softmax probabilities for a batch of texts, padded to the longest
+text in the batch, in the same label order as the PyTorch model.
+
+Configuration (environment variables, read in config.py):
+    SENTIMENT_BACKEND: "torch" (default) or "onnx"
+    SENTIMENT_ONNX_MODEL_DIR: Where the exported model lives
+    SENTIMENT_ONNX_QUANTIZE: Set to "0" to run the fp32 export instead of int8
+    SENTIMENT_ONNX_THREADS: Intra-op threads for the session (default: all cores)
+
+Requires ``onnxruntime`` (and ``onnx`` plus ``torch`` for the export step).
+"""
+import os
+from typing import List, Optional
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+MAX_SEQ_LENGTH = 512  # RoBERTa's position limit
+
+
+def export_onnx_classifier(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Export a Hugging Face sequence classifier to ONNX.
+
+    Args:
+        model_name: Hugging Face id of the classifier
+        output_dir: Directory for the ONNX files, tokenizer and config
+        quantize: Also write a dynamically int8-quantized copy
+
+    Returns:
+        Path to the model file the classifier should load
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = os.path.join(output_dir, FP32_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    print(f"Exported {model_name} to {fp32_path}")
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    int8_path = os.path.join(output_dir, INT8_FILENAME)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Wrote int8-quantized classifier to {int8_path}")
+    return int8_path
+
+
+class OnnxSequenceClassifier:
+    """Sequence classifier running on onnxruntime, returning label probabilities."""
+
+    def __init__(self, model_dir: str, quantized: bool = True, threads: Optional[int] = None):
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_path = os.path.join(model_dir, INT8_FILENAME if quantized else FP32_FILENAME)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.config = AutoConfig.from_pretrained(model_dir)
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+    def predict_proba(self, texts: List[str]) -> "np.ndarray":
+        """Softmax probabilities with shape (len(texts), num_labels)."""
+        encoded = self.tokenizer(
+            texts,
+            padding="longest",
+            truncation=True,
+            max_length=MAX_SEQ_LENGTH,
+            return_tensors="np"
+        )
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+        logits = self.session.run(None, feeds)[0]
+
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def load_onnx_classifier(
+    model_name: str,
+    model_dir: str,
+    quantized: bool = True,
+    threads: Optional[int] = None
+) -> Optional[OnnxSequenceClassifier]:
+    """
+    Load the ONNX classifier, exporting it first if the model file is missing.
+
+    Returns:
+        OnnxSequenceClassifier or None if onnxruntime or the export is unavailable
+    """
+    if not HAS_ONNXRUNTIME:
+        print("onnxruntime not installed; using the PyTorch sentiment model")
+        return None
+
+    try:
+        filename = INT8_FILENAME if quantized else FP32_FILENAME
+        if not os.path.exists(os.path.join(model_dir, filename)):
+            export_onnx_classifier(model_name, model_dir, quantize=quantized)
+        return OnnxSequenceClassifier(model_dir, quantized=quantized, threads=threads)
+    except Exception as e:
+        print(f"Error loading ONNX sentiment classifier: {str(e)}")
+        return None
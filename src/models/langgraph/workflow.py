@@ -4,8 +4,9 @@ LangGraph workflow for the AI Politician system.
 This module defines the main workflow that connects all the agents.
 """
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Any, TypedDict, Annotated, Literal, List
+from typing import Dict, Any, TypedDict, Annotated, Literal, List, Tuple, Callable, Optional
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
 
@@ -13,9 +14,9 @@ from langgraph.graph import StateGraph, END
 root_dir = Path(__file__).parent.parent.parent.parent.absolute()
 sys.path.insert(0, str(root_dir))
 
-from src.models.langgraph.config import PoliticianIdentity
-from src.models.langgraph.agents.context_agent import extract_context
-from src.models.langgraph.agents.sentiment_agent import analyze_sentiment
+from src.models.langgraph.config import PoliticianIdentity, SENTIMENT_MODE
+from src.models.langgraph.agents.context_agent import extract_context, aextract_context
+from src.models.langgraph.agents.sentiment_agent import analyze_sentiment, get_cascade_stats
 from src.models.langgraph.agents.response_agent import generate_response
 
 # Define input/output schemas
@@ -42,32 +43,53 @@ class WorkflowState(TypedDict):
     trace: bool
     context: str
     has_knowledge: bool
+    context_timings: Dict[str, float]
+    main_topics: List[str]
+    policy_areas: List[str]
+    entities: List[Dict[str, str]]
     sentiment_analysis: Dict[str, Any]
     should_deflect: bool
+    on_token: Optional[Callable[[str], None]]
+    stop_event: Optional[threading.Event]
     response: str
+    response_timings: Dict[str, float]
 
 # Wrap agent functions to add tracing
 def trace_context_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """Extract context with tracing."""
+    _trace_context_start(state)
+    result = extract_context(state)
+    _trace_context_result(state, result)
+    return result
+
+async def atrace_context_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract context with tracing, awaiting retrieval instead of blocking."""
+    _trace_context_start(state)
+    result = await aextract_context(state)
+    _trace_context_result(state, result)
+    return result
+
+def _trace_context_start(state: Dict[str, Any]):
     if state.get("trace", False):
         print("\n🔎 TRACE: Context Agent - Starting")
         print("=====================================")
         print(f"Input: \"{state['user_input']}\"")
         print("-------------------------------------")
-    
-    result = extract_context(state)
-    
+
+def _trace_context_result(state: Dict[str, Any], result: Dict[str, Any]):
     if state.get("trace", False):
         print("\n🔎 TRACE: Context Agent - Results")
         print("=====================================")
         print(f"Main Topics: {result.get('main_topics', 'None')}")
         print(f"Policy Areas: {result.get('policy_areas', 'None')}")
+        print(f"Entities: {', '.join(e['name'] for e in result.get('entities', [])) or 'None'}")
         print(f"Knowledge Retrieved: {'Yes' if result.get('has_knowledge', False) else 'No'}")
         print(f"Context Length: {len(result.get('context', ''))} characters")
+        timings = result.get('context_timings') or {}
+        if timings:
+            print(f"Stage Timings: extraction {timings.get('extraction', 0):.2f}s, retrieval {timings.get('retrieval', 0):.2f}s, total {timings.get('total', 0):.2f}s")
         print("Context Preview: " + result.get('context', 'None')[:100] + "..." if len(result.get('context', '')) > 100 else result.get('context', 'None'))
         print("-------------------------------------")
-    
-    return result
 
 def trace_sentiment_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze sentiment with tracing."""
@@ -84,6 +106,11 @@ def trace_sentiment_agent(state: Dict[str, Any]) -> Dict[str, Any]:
         print("=====================================")
         print(f"Sentiment Score: {result.get('sentiment_analysis', {}).get('sentiment_score', 0):.2f} / 1.0")
         print(f"Sentiment Category: {result.get('sentiment_analysis', {}).get('sentiment_category', 'unknown')}")
+        windows = result.get('sentiment_analysis', {}).get('windows')
+        if windows:
+            print(f"Long Input Windows: {windows['scored']} scored of {windows['total']}")
+        if SENTIMENT_MODE == "cascade":
+            print(f"Cascade Escalation Rate: {get_cascade_stats()['escalation_rate']:.0%}")
         
         if 'emotion_scores' in result and result['emotion_scores']:
             print("\nEmotion Breakdown:")
@@ -115,20 +142,38 @@ def trace_response_agent(state: Dict[str, Any]) -> Dict[str, Any]:
         print("=====================================")
         print(f"Response Generated: {len(result['response'])} characters")
         print("Response Preview: " + result['response'][:50] + "..." if len(result['response']) > 50 else result['response'])
+        timings = result.get("response_timings")
+        if timings:
+            print(f"Time to First Token: {timings['time_to_first_token']:.2f}s (generation total {timings['total']:.2f}s)")
         print("\n📝 Complete response will be displayed after all processing completes.")
         print("-------------------------------------")
     
     return result
 
-def create_politician_graph() -> StateGraph:
-    """Create the LangGraph workflow for the AI Politician."""
+# Compiled graphs keyed by (use_async, trace); built once per process and shared across requests
+_compiled_graphs: Dict[Tuple[bool, bool], Any] = {}
+_compiled_graphs_lock = threading.Lock()
+
+def create_politician_graph(use_async: bool = False, trace: bool = True) -> StateGraph:
+    """
+    Create the LangGraph workflow for the AI Politician.
+    
+    Args:
+        use_async: Use the awaitable context node; the compiled graph must then be run with ``ainvoke``
+        trace: Wrap the agents with the trace printers (which print only when the state asks for tracing)
+    """
     # Initialize the state graph with the appropriate state type
     workflow = StateGraph(WorkflowState)
     
     # Add nodes for each agent
-    workflow.add_node("context_agent", trace_context_agent)
-    workflow.add_node("sentiment_agent", trace_sentiment_agent)
-    workflow.add_node("response_agent", trace_response_agent)
+    if trace:
+        workflow.add_node("context_agent", atrace_context_agent if use_async else trace_context_agent)
+        workflow.add_node("sentiment_agent", trace_sentiment_agent)
+        workflow.add_node("response_agent", trace_response_agent)
+    else:
+        workflow.add_node("context_agent", aextract_context if use_async else extract_context)
+        workflow.add_node("sentiment_agent", analyze_sentiment)
+        workflow.add_node("response_agent", generate_response)
     
     # Define the edges (flow) of the graph
     # Start -> Context Agent
@@ -145,39 +190,82 @@ def create_politician_graph() -> StateGraph:
     
     return workflow
 
-def process_user_input(input_data: PoliticianInput) -> PoliticianOutput:
+def get_compiled_graph(use_async: bool = False, trace: bool = False):
+    """
+    Get the compiled workflow for a configuration variant, building it on first use.
+    
+    The compiled graph holds no per-request state, so one instance serves
+    every request in the process.
+    """
+    key = (use_async, trace)
+    with _compiled_graphs_lock:
+        if key not in _compiled_graphs:
+            _compiled_graphs[key] = create_politician_graph(use_async=use_async, trace=trace).compile()
+        return _compiled_graphs[key]
+
+def process_user_input(
+    input_data: PoliticianInput,
+    on_token: Optional[Callable[[str], None]] = None,
+    stop_event: Optional[threading.Event] = None
+) -> PoliticianOutput:
     """
     Process user input through the AI Politician workflow.
     
     Args:
         input_data: User input and configuration
+        on_token: Called with each piece of the response as it is generated
+        stop_event: Set to end response generation early (e.g. when a streaming client disconnects)
         
     Returns:
         PoliticianOutput: The politician's response and metadata
     """
-    # Create the graph
-    graph = create_politician_graph()
+    # Reuse the compiled graph for this variant
+    politician_chain = get_compiled_graph(trace=input_data.trace)
     
-    # Convert to runnable
-    politician_chain = graph.compile()
+    # Run the workflow
+    result = politician_chain.invoke(_initial_state(input_data, on_token, stop_event))
     
-    # Create initial state
-    initial_state: WorkflowState = {
+    return _to_output(result)
+
+async def aprocess_user_input(input_data: PoliticianInput) -> PoliticianOutput:
+    """
+    Async version of ``process_user_input``.
+    
+    Retrieval is awaited on the bounded RAG executor and the synchronous
+    agents run in LangGraph's executor, so the event loop stays free for
+    other requests.
+    """
+    politician_chain = get_compiled_graph(use_async=True, trace=input_data.trace)
+    result = await politician_chain.ainvoke(_initial_state(input_data))
+    return _to_output(result)
+
+def _initial_state(
+    input_data: PoliticianInput,
+    on_token: Optional[Callable[[str], None]] = None,
+    stop_event: Optional[threading.Event] = None
+) -> WorkflowState:
+    """Create the initial workflow state for a request."""
+    return {
         "user_input": input_data.user_input,
         "politician_identity": input_data.politician_identity,
         "use_rag": input_data.use_rag,
         "trace": input_data.trace,
         "context": "",
         "has_knowledge": False,
+        "context_timings": {},
+        "main_topics": [],
+        "policy_areas": [],
+        "entities": [],
         "sentiment_analysis": {},
         "should_deflect": False,
-        "response": ""
+        "on_token": on_token,
+        "stop_event": stop_event,
+        "response": "",
+        "response_timings": {}
     }
-    
-    # Run the workflow
-    result = politician_chain.invoke(initial_state)
-    
-    # Return formatted output
+
+def _to_output(result: Dict[str, Any]) -> PoliticianOutput:
+    """Return formatted output from the final workflow state."""
     return PoliticianOutput(
         response=result["response"],
         sentiment_analysis=result["sentiment_analysis"],